@@ -2,11 +2,22 @@ import yt_dlp
 import os
 import re
 import subprocess
+import sys
 import pysrt
-from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime, timedelta
 from googletrans import Translator
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCaptionDedup import CCaptionDedup
+from lib_srt.CCueTrack import CCueTrack
+from lib_util.CFrameDedup import CFrameDedup
+from lib_util.CFrameExtractor import CFrameExtractor
+from lib_util.CImageBook import CImageBook
+
 # 初始化翻譯器
 translator = Translator()
 
@@ -17,12 +28,16 @@ ORIGINAL_SRT = os.path.join(BASE_DIR, "a.srt")  # 純英文
 BILINGUAL_SRT = os.path.join(BASE_DIR, "b.srt")  # 英中雙語
 CHINESE_SRT = os.path.join(BASE_DIR, "c.srt")  # 純中文
 ADJUSTED_SRT = os.path.join(BASE_DIR, "d.srt")  # 調整後英中雙語
+PAGES_SRT = os.path.join(BASE_DIR, "e.srt")  # 合併重複畫面後每頁的字幕
 RESULT_DIR = os.path.join(BASE_DIR, "result")  # 轉換圖片的輸出目錄
 RESULTX_DIR = os.path.join(BASE_DIR, "resultx")  # 加入字幕的圖片
 FINAL_PDF = os.path.join(BASE_DIR, "result.pdf")  # 最終PDF
 
 TIME_FORMAT = "%H:%M:%S,%f"
 
+# 相鄰畫面 64 bits dHash 漢明距離小於等於此值時合併為同一頁，0 表示不合併
+DEDUP_THRESHOLD = 6
+
 
 def ensure_directories():
     """確保所有必要目錄存在"""
@@ -76,64 +91,10 @@ def clean_subtitle_content(content):
 
 
 def remove_duplicate_subtitles(srt_content):
-    """移除重複的字幕條目"""
-    subtitle_blocks = re.split(r"\n\s*\n", srt_content.strip())
-    cleaned_subtitles = []
-    previous_content = ""
-    previous_end_time = None
-
-    for block in subtitle_blocks:
-        if not block.strip():
-            continue
-
-        lines = block.strip().split("\n")
-        if len(lines) < 3:
-            continue
-
-        try:
-            subtitle_id = lines[0]
-            time_line = lines[1]
-            content_lines = lines[2:]
-
-            time_match = re.match(
-                r"(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})", time_line
-            )
-            if not time_match:
-                continue
-
-            start_time_str, end_time_str = time_match.groups()
-            start_time = parse_srt_time(start_time_str)
-            end_time = parse_srt_time(end_time_str)
-
-            content = " ".join(content_lines)
-            content = clean_subtitle_content(content)
-
-            if content == previous_content:
-                continue
-
-            if previous_end_time and start_time < previous_end_time:
-                start_time = previous_end_time + timedelta(milliseconds=1)
-                if start_time >= end_time:
-                    continue
-
-            duration = end_time - start_time
-            if duration.total_seconds() < 0.1:
-                continue
-
-            start_time_str = format_srt_time(start_time)
-            end_time_str = format_srt_time(end_time)
-
-            cleaned_block = f"{len(cleaned_subtitles) + 1}\n{start_time_str} --> {end_time_str}\n{content}"
-            cleaned_subtitles.append(cleaned_block)
-
-            previous_content = content
-            previous_end_time = end_time
-
-        except Exception as e:
-            print(f"處理字幕塊時出錯: {e}")
-            continue
-
-    return "\n\n".join(cleaned_subtitles)
+    """移除重複的字幕條目 (滾動式自動字幕只保留每條新增的內容)"""
+    track = CCueTrack.from_string(srt_content)
+    track.texts = [clean_subtitle_content(text) for text in track.texts]
+    return CCaptionDedup().dedupe(track).to_srt()
 
 
 # ===== 步驟1：下載影片和字幕 =====
@@ -435,55 +396,58 @@ def extract_images_from_video():
         print(f"❌ 讀取字幕檔失敗：{e}")
         return False
 
-    success_count = 0
-
-    for idx, sub in enumerate(subs, start=1):
-        try:
-            start = srt_time_to_seconds(sub.start)
-            end = srt_time_to_seconds(sub.end)
-            midpoint = (start + end) / 2
-
-            output_file = os.path.join(RESULT_DIR, f"{idx:04d}.jpg")
-
-            cmd = [
-                "ffmpeg",
-                "-ss",
-                f"{midpoint:.3f}",
-                "-i",
-                VIDEO_PATH,
-                "-frames:v",
-                "1",
-                "-q:v",
-                "2",
-                "-y",
-                output_file,
-            ]
+    # 所有時間點在一次解碼中擷取，不再每筆字幕啟動一次 ffmpeg
+    midpoints = [
+        (srt_time_to_seconds(sub.start) + srt_time_to_seconds(sub.end)) / 2
+        for sub in subs
+    ]
+    results = CFrameExtractor().extract_to_dir(VIDEO_PATH, midpoints, RESULT_DIR)
 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    for idx, ok in enumerate(results, start=1):
+        if not ok:
+            print(f"❌ 第 {idx} 張圖片擷取失敗")
+    success_count = sum(results)
 
-            if result.returncode == 0 and os.path.exists(output_file):
-                success_count += 1
-                if idx % 10 == 0:
-                    print(
-                        f"⏳ 擷取進度: {idx}/{len(subs)} ({(idx/len(subs))*100:.1f}%)"
-                    )
-            else:
-                print(f"❌ 第 {idx} 張圖片擷取失敗")
+    print(f"✅ 圖片擷取完成：{success_count} 張")
+    if success_count == 0:
+        return False
 
-        except Exception as e:
-            print(f"❌ 第 {idx} 張圖片處理異常：{e}")
+    return dedupe_images(subs)
 
-    print(f"✅ 圖片擷取完成：{success_count} 張")
-    return success_count > 0
 
+def dedupe_images(subs):
+    """合併連續且幾乎相同的畫面，並寫出每頁對應的字幕"""
+    img_files = sorted(
+        f for f in os.listdir(RESULT_DIR) if f.lower().endswith((".jpg", ".jpeg"))
+    )
+    count = min(len(img_files), len(subs))
+    img_files = img_files[:count]
+    subs = subs[:count]
+
+    dedup = CFrameDedup(threshold=DEDUP_THRESHOLD)
+    groups = dedup.group_images([os.path.join(RESULT_DIR, f) for f in img_files])
+    texts = dedup.merge_texts([sub.text for sub in subs], groups)
+
+    # 每組只保留第一張圖片，字幕時間取整組範圍
+    pages = pysrt.SubRipFile()
+    for page_idx, (group, text) in enumerate(zip(groups, texts), start=1):
+        for i in group[1:]:
+            os.remove(os.path.join(RESULT_DIR, img_files[i]))
+        pages.append(
+            pysrt.SubRipItem(
+                index=page_idx,
+                start=subs[group[0]].start,
+                end=subs[group[-1]].end,
+                text=text,
+            )
+        )
+    pages.save(PAGES_SRT, encoding="utf-8")
 
-# ===== 步驟4：圖片加字幕 =====
-def split_chinese_english(text):
-    chinese = "".join(re.findall(r"[\u4e00-\u9fff，。！？；：「」、《》（）]", text))
-    english = "".join(re.findall(r"[^\u4e00-\u9fff，。！？；：「」、《》（）]+", text))
-    return chinese.strip(), english.strip()
+    print(f"✅ 畫面去重完成：{count} 張 → {len(groups)} 頁")
+    return True
 
 
+# ===== 步驟4：圖片加字幕 =====
 def add_subtitles_to_images():
     """為圖片添加字幕"""
     print("🖼️ 步驟4：為圖片添加字幕...")
@@ -491,7 +455,7 @@ def add_subtitles_to_images():
     clean_directory(RESULTX_DIR)
 
     try:
-        subs = pysrt.open(ADJUSTED_SRT, encoding="utf-8")
+        subs = pysrt.open(PAGES_SRT, encoding="utf-8")
     except Exception as e:
         print(f"❌ 讀取字幕檔失敗：{e}")
         return False
@@ -510,80 +474,15 @@ def add_subtitles_to_images():
         img_files = img_files[:min_count]
         subs = subs[:min_count]
 
-    # 字體設定
-    font_path = r"C:\Windows\Fonts\msjh.ttc"  # 微軟正黑體
-    if not os.path.exists(font_path):
-        font_path = r"C:\Windows\Fonts\arial.ttf"  # 備用字體
-
-    try:
-        font = ImageFont.truetype(font_path, 28)
-    except:
-        font = ImageFont.load_default()
-
-    for idx, (img_file, sub) in enumerate(zip(img_files, subs), start=1):
-        try:
-            img_path = os.path.join(RESULT_DIR, img_file)
-            img = Image.open(img_path).convert("RGB")
-            draw = ImageDraw.Draw(img)
-
-            # 處理字幕內容
-            text = sub.text.strip().replace("\n", " ")
-            zh, en = split_chinese_english(text)
-            lines = [en, zh] if zh and en else [text]
-
-            # 計算文字大小
-            line_sizes = []
-            total_height = 0
-            max_width = 0
-            for line in lines:
-                if line:
-                    bbox = draw.textbbox((0, 0), line, font=font)
-                    w = bbox[2] - bbox[0]
-                    h = bbox[3] - bbox[1]
-                    line_sizes.append((line, w, h))
-                    total_height += h
-                    max_width = max(max_width, w)
-
-            if not line_sizes:
-                continue
-
-            total_height += (len(line_sizes) - 1) * 10
-
-            # 框框座標與設定
-            padding = 16
-            x = (img.width - max_width) / 2 - padding
-            y = img.height - total_height - 40 - padding
-            box_w = max_width + 2 * padding
-            box_h = total_height + 2 * padding
-
-            # 畫圓角背景框
-            draw.rounded_rectangle(
-                [x, y, x + box_w, y + box_h],
-                radius=20,
-                fill=(0, 34, 68, 200),  # 半透明藍色
-            )
-
-            # 畫每一行文字（置中）
-            text_y = y + padding
-            for line, w, h in line_sizes:
-                text_x = (img.width - w) / 2
-                draw.text((text_x, text_y), line, font=font, fill="white")
-                text_y += h + 10
-
-            # 儲存圖片
-            output_path = os.path.join(RESULTX_DIR, img_file)
-            img.save(output_path)
+    jobs = [
+        (os.path.join(RESULT_DIR, f), os.path.join(RESULTX_DIR, f), sub.text)
+        for f, sub in zip(img_files, subs)
+    ]
 
-            if idx % 20 == 0:
-                print(
-                    f"⏳ 字幕添加進度: {idx}/{len(img_files)} ({(idx/len(img_files))*100:.1f}%)"
-                )
+    # 多行程平行處理，每個行程只載入一次字型
+    success_count = CImageBook(font_size=28).add_captions(jobs)
 
-        except Exception as e:
-            print(f"❌ 處理第 {idx} 張圖片時出錯：{e}")
-            continue
-
-    print(f"✅ 字幕添加完成：{len(img_files)} 張")
+    print(f"✅ 字幕添加完成：{success_count} 張")
     return True
 
 
@@ -602,25 +501,16 @@ def images_to_pdf():
         return False
 
     try:
-        images = []
-        for fname in img_files:
-            path = os.path.join(RESULTX_DIR, fname)
-            img = Image.open(path).convert("RGB")
-            images.append(img)
-
-        # 儲存為PDF
-        if images:
-            first_img = images[0]
-            rest_imgs = images[1:] if len(images) > 1 else []
-            first_img.save(FINAL_PDF, save_all=True, append_images=rest_imgs)
-            print(f"✅ PDF已儲存：{FINAL_PDF}")
-            return True
+        # 逐頁寫入，JPEG 直接嵌入不重新壓縮
+        CImageBook.images_to_pdf(
+            [os.path.join(RESULTX_DIR, f) for f in img_files], FINAL_PDF
+        )
+        print(f"✅ PDF已儲存：{FINAL_PDF}")
+        return True
     except Exception as e:
         print(f"❌ PDF轉換失敗：{e}")
         return False
 
-    return False
-
 
 # ===== 主程式 =====
 def main():
@@ -630,7 +520,7 @@ def main():
     print("功能：下載影片 → 下載字幕 → 翻譯字幕 → 擷取圖片 → 添加字幕 → 生成PDF")
     print("輸出目錄：")
     print(f"  影片檔案: {VIDEO_PATH}")
-    print(f"  字幕檔案: {BASE_DIR}\\[a.srt, b.srt, c.srt, d.srt]")
+    print(f"  字幕檔案: {BASE_DIR}\\[a.srt, b.srt, c.srt, d.srt, e.srt]")
     print(f"  原始圖片: {RESULT_DIR}")
     print(f"  字幕圖片: {RESULTX_DIR}")
     print(f"  最終PDF: {FINAL_PDF}")
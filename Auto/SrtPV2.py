@@ -1,7 +1,21 @@
+import os
 import re
-from deepmultilingualpunctuation import PunctuationModel
+import sys
+import tempfile
 from typing import List
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCueTrack import format_srt_time, iter_srt_numbered
+from lib_srt.CSrtLoader import CSrtLoader
+from lib_srt.CPunctuator import CPunctuator
+
+# 標點結果快取 (字幕未變動時不重新推論)
+PUNCT_CACHE = os.path.join(tempfile.gettempdir(), "srt_punct_cache.json")
+
 
 class SubtitleEntry:
     def __init__(self, index: int, start: str, end: str, text: str):
@@ -12,19 +26,19 @@ class SubtitleEntry:
 
 
 def read_srt_file(file_path: str) -> List[SubtitleEntry]:
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
     entries = []
-    blocks = re.split(r"\n{2,}", content.strip())
-    for block in blocks:
-        lines = block.splitlines()
-        if len(lines) >= 3:
-            index = int(lines[0])
-            times = lines[1]
-            text = " ".join(lines[2:])
-            start, end = times.split(" --> ")
-            entries.append(SubtitleEntry(index, start, end, text.strip()))
+    cues = iter_srt_numbered(CSrtLoader.read_lines(file_path))
+    for position, (index, start, end, text) in enumerate(cues, start=1):
+        # 略過沒有文字的字幕，保留檔案中的序號
+        if text:
+            entries.append(
+                SubtitleEntry(
+                    index or position,
+                    format_srt_time(start),
+                    format_srt_time(end),
+                    " ".join(text.splitlines()),
+                )
+            )
     return entries
 
 
@@ -36,43 +50,20 @@ def write_srt_file(file_path: str, entries: List[SubtitleEntry]):
             f.write(f"{entry.text}\n\n")
 
 
-def capitalize_first_letter(text: str) -> str:
-    # 將每個句子的第一個英文單字首字母大寫
-    sentences = re.split(r"(?<=[.!?]) +", text)
-    return " ".join(s.capitalize() for s in sentences)
-
-
 def punctuate_subtitles(entries: List[SubtitleEntry]) -> List[SubtitleEntry]:
-    model = PunctuationModel()
-
-    result_entries = []
-
-    # 逐個處理每個字幕條目，保持時間軸不變
-    for entry in entries:
-        # 清理文字，移除多餘的空格和換行
-        clean_text = re.sub(r"\s+", " ", entry.text.strip())
-
-        # 跳過音樂標記和空白內容
-        if clean_text.lower() in ["[music]", "", "[音樂]"] or not clean_text:
-            result_entries.append(
-                SubtitleEntry(entry.index, entry.start, entry.end, clean_text)
-            )
-            continue
-
-        # 對單個字幕條目進行標點修復
-        try:
-            punctuated = model.restore_punctuation(clean_text)
-            punctuated = capitalize_first_letter(punctuated)
-        except Exception as e:
-            print(f"處理第 {entry.index} 條字幕時發生錯誤: {e}")
-            punctuated = clean_text  # 如果處理失敗，使用原文
-
-        # 保持原始的時間軸
-        result_entries.append(
-            SubtitleEntry(entry.index, entry.start, entry.end, punctuated)
-        )
-
-    return result_entries
+    # 模型只載入一次，所有字幕合併成帶上下文的視窗批次推論，再依原字幕邊界拆回
+    texts = [entry.text for entry in entries]
+    try:
+        punctuated = CPunctuator(cache_path=PUNCT_CACHE).punctuate(texts)
+    except Exception as e:
+        print(f"標點處理時發生錯誤: {e}")
+        punctuated = [re.sub(r"\s+", " ", t.strip()) for t in texts]  # 處理失敗時使用原文
+
+    # 保持原始的時間軸
+    return [
+        SubtitleEntry(entry.index, entry.start, entry.end, text)
+        for entry, text in zip(entries, punctuated)
+    ]
 
 
 def process_srt_file(input_path: str, output_path: str):
@@ -1,6 +1,14 @@
 import pysrt
 import os
 import subprocess
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CFrameExtractor import CFrameExtractor
 
 
 def ensure_output_dir(path):
@@ -50,74 +58,24 @@ def extract_images_from_srt_midpoints(mp4_path, srt_path, output_dir="output_ima
         print(f"❌ 讀取字幕檔失敗：{e}")
         return False
 
-    success_count = 0
-    error_count = 0
-
-    for idx, sub in enumerate(subs, start=1):
-        try:
-            start = srt_time_to_seconds(sub.start)
-            end = srt_time_to_seconds(sub.end)
-            midpoint = (start + end) / 2
-
-            output_file = os.path.join(output_dir, f"{idx:04d}.jpg")
-
-            cmd = [
-                "ffmpeg",
-                "-ss",
-                f"{midpoint:.3f}",  # 精準到毫秒
-                "-i",
-                mp4_path,
-                "-frames:v",
-                "1",
-                "-q:v",
-                "2",  # 高品質
-                "-y",  # 覆蓋舊檔
-                output_file,
-            ]
-
-            print(f"📸 擷取第 {idx:04d} 張圖片 @ {midpoint:.2f}s")
-            print(f"   字幕內容：{sub.text.strip()[:50]}...")
-
-            # 執行命令並捕獲輸出
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-            if result.returncode == 0:
-                if os.path.exists(output_file):
-                    file_size = os.path.getsize(output_file)
-                    print(f"   ✅ 成功生成 ({file_size} bytes)")
-                    success_count += 1
-                else:
-                    print(f"   ❌ 命令執行成功但檔案不存在")
-                    error_count += 1
-            else:
-                print(f"   ❌ FFmpeg 錯誤 (返回碼: {result.returncode})")
-                # 顯示關鍵錯誤訊息
-                if result.stderr:
-                    stderr_lines = result.stderr.split("\n")
-                    for line in stderr_lines:
-                        if any(
-                            keyword in line.lower()
-                            for keyword in [
-                                "error",
-                                "invalid",
-                                "failed",
-                                "no such file",
-                            ]
-                        ):
-                            print(f"   錯誤詳情: {line.strip()}")
-                            break
-                error_count += 1
-
-                # 如果是前幾個就失敗，顯示命令供除錯
-                if idx <= 3:
-                    print(f"   除錯命令: {' '.join(cmd)}")
-
-        except subprocess.TimeoutExpired:
-            print(f"   ❌ 第 {idx} 張圖片處理超時")
-            error_count += 1
-        except Exception as e:
-            print(f"   ❌ 第 {idx} 張圖片處理異常：{e}")
-            error_count += 1
+    midpoints = [
+        (srt_time_to_seconds(sub.start) + srt_time_to_seconds(sub.end)) / 2
+        for sub in subs
+    ]
+
+    # 一次解碼擷取所有字幕中點的畫面
+    try:
+        results = CFrameExtractor().extract_to_dir(mp4_path, midpoints, output_dir)
+    except Exception as e:
+        print(f"❌ 圖片擷取異常：{e}")
+        return False
+
+    for idx, (sub, ok) in enumerate(zip(subs, results), start=1):
+        if not ok:
+            print(f"   ❌ 第 {idx:04d} 張擷取失敗：{sub.text.strip()[:50]}...")
+
+    success_count = sum(results)
+    error_count = len(results) - success_count
 
     print(f"\n📊 處理完成！成功：{success_count} 張，失敗：{error_count} 張")
 
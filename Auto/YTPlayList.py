@@ -1,16 +1,35 @@
-from pytube import Playlist
+import asyncio
+import os
+import sys
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_yt.YTHandler.CPlaylistIngester import CPlaylistIngester, expand_playlist
+
+# 用法: python YTPlayList.py [播放清單網址] [--ingest 輸出目錄]
+# 加上 --ingest 時略過資料庫已有的影片，其餘並行下載資訊 / 音訊 / 縮圖並寫入資料庫
 playlist_url = (
     "https://www.youtube.com/playlist?list=PLmVd2BGjSEsg-P9a4KqHTGnZCeH7CNOlq"
 )
+args = sys.argv[1:]
+if args and not args[0].startswith("--"):
+    playlist_url = args.pop(0)
 
 try:
-    playlist = Playlist(playlist_url)
+    if "--ingest" in args:
+        i = args.index("--ingest")
+        output_dir = args[i + 1] if len(args) > i + 1 else "c:/ytdb/ingest"
+        asyncio.run(CPlaylistIngester(output_dir).ingest(playlist_url))
+    else:
+        entries = expand_playlist(playlist_url)
 
-    print(f"✅ 共有 {len(playlist.video_urls)} 部影片：\n")
+        print(f"✅ 共有 {len(entries)} 部影片：\n")
 
-    for i, url in enumerate(playlist.video_urls, start=1):
-        print(f"{i}. {url}")
+        for i, entry in enumerate(entries, start=1):
+            print(f"{i}. {entry['url']}")
 
 except Exception as e:
     print(f"❌ 無法獲取播放清單: {e}")
@@ -1,6 +1,17 @@
+import os
 import re
+import sys
 from typing import List
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCaptionDedup import CCaptionDedup
+from lib_srt.CCueTrack import CCueTrack, iter_srt_numbered
+from lib_srt.CSrtLoader import CSrtLoader
+
 
 class SubtitleEntry:
     def __init__(self, index: int, start: str, end: str, text: str):
@@ -29,19 +40,24 @@ def ms_to_time(ms: int) -> str:
     return f"{h:02}:{m:02}:{s:02},{ms:03}"
 
 
-def parse_srt(path: str) -> List[SubtitleEntry]:
-    with open(path, encoding="utf-8") as f:
-        blocks = re.split(r"\n{2,}", f.read().strip())
-
-    entries = []
-    for block in blocks:
-        lines = block.strip().split("\n")
-        if len(lines) >= 3:
-            index = int(lines[0])
-            start, end = re.split(r"\s-->\s", lines[1])
-            text = " ".join(lines[2:]).strip()
-            entries.append(SubtitleEntry(index, start, end, text))
-    return entries
+def parse_srt(path: str, auto_captions: bool = False) -> List[SubtitleEntry]:
+    cues = list(iter_srt_numbered(CSrtLoader.read_lines(path)))
+    if auto_captions:
+        # YouTube 自動字幕的滾動重複先去除，避免合併句子時同一段文字出現多次；
+        # 一般字幕不處理 (句尾與下一句開頭相同是正常的內容)。去重會合併字幕，
+        # 此時序號改依位置編排；一般字幕沿用檔案中的序號
+        track = CCaptionDedup().dedupe(CCueTrack.from_cues(c[1:] for c in cues))
+        cues = [(None, start, end, text) for start, end, text in track]
+    return [
+        SubtitleEntry(
+            number or i,
+            ms_to_time(start),
+            ms_to_time(end),
+            " ".join(text.splitlines()),
+        )
+        for i, (number, start, end, text) in enumerate(cues, start=1)
+        if text
+    ]
 
 
 def merge_and_split_sentences(subs: List[SubtitleEntry]) -> List[SubtitleEntry]:
@@ -1,5 +1,25 @@
+import os
 import re
-from typing import List
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCaptionDedup import CCaptionDedup
+from lib_srt.CCueTrack import (
+    CCueTrack,
+    format_srt_time,
+    iter_srt_numbered,
+    parse_time_ms,
+    times_to_ms,
+)
+from lib_srt.CSrtLoader import CSrtLoader
 
 
 class SubtitleEntry:
@@ -12,36 +32,31 @@ class SubtitleEntry:
 
 def time_to_ms(t: str) -> int:
     # t 例如 "00:00:01,680"
-    parts = t.split(":")
-    s_part, ms = parts[2].split(",")
-    h = int(parts[0])
-    m = int(parts[1])
-    s = int(s_part)
-    ms = int(ms)
-    return h * 3600000 + m * 60000 + s * 1000 + ms
+    return parse_time_ms(t)
 
 
 def ms_to_time(ms: int) -> str:
-    h = ms // 3600000
-    m = (ms % 3600000) // 60000
-    s = (ms % 60000) // 1000
-    ms = ms % 1000
-    return f"{h:02}:{m:02}:{s:02},{ms:03}"
-
-
-def parse_srt(path: str) -> List[SubtitleEntry]:
-    with open(path, encoding="utf-8") as f:
-        blocks = re.split(r"\n{2,}", f.read().strip())
-
-    entries = []
-    for block in blocks:
-        lines = block.strip().split("\n")
-        if len(lines) >= 3:
-            index = int(lines[0])
-            start, end = re.split(r"\s-->\s", lines[1])
-            text = " ".join(lines[2:]).strip()
-            entries.append(SubtitleEntry(index, start, end, text))
-    return entries
+    return format_srt_time(ms)
+
+
+def parse_srt(path: str, auto_captions: bool = False) -> List[SubtitleEntry]:
+    cues = list(iter_srt_numbered(CSrtLoader.read_lines(path)))
+    if auto_captions:
+        # YouTube 自動字幕的滾動重複先去除，避免合併句子時同一段文字出現多次；
+        # 一般字幕不處理 (句尾與下一句開頭相同是正常的內容)。去重會合併字幕，
+        # 此時序號改依位置編排；一般字幕沿用檔案中的序號
+        track = CCaptionDedup().dedupe(CCueTrack.from_cues(c[1:] for c in cues))
+        cues = [(None, start, end, text) for start, end, text in track]
+    return [
+        SubtitleEntry(
+            number or i,
+            ms_to_time(start),
+            ms_to_time(end),
+            " ".join(text.splitlines()),
+        )
+        for i, (number, start, end, text) in enumerate(cues, start=1)
+        if text
+    ]
 
 
 def calculate_sentence_weight(sentence: str) -> float:
@@ -145,6 +160,25 @@ def merge_and_split_sentences(
     return merged
 
 
+def to_track(subs: List[SubtitleEntry]) -> CCueTrack:
+    return CCueTrack(
+        times_to_ms([sub.start for sub in subs]),
+        times_to_ms([sub.end for sub in subs]),
+        [sub.text for sub in subs],
+    )
+
+
+def from_track(
+    track: CCueTrack, indices: Optional[List[int]] = None
+) -> List[SubtitleEntry]:
+    if indices is None:
+        indices = range(1, len(track) + 1)
+    return [
+        SubtitleEntry(i, ms_to_time(start), ms_to_time(end), text)
+        for i, (start, end, text) in zip(indices, track)
+    ]
+
+
 def adjust_timing_globally(
     subs: List[SubtitleEntry], offset_seconds: float
 ) -> List[SubtitleEntry]:
@@ -155,69 +189,124 @@ def adjust_timing_globally(
         subs: 字幕條目列表
         offset_seconds: 時間偏移(秒)，正數延後，負數提前
     """
-    offset_ms = int(offset_seconds * 1000)
+    track = to_track(subs).shift(int(offset_seconds * 1000))
+    # 確保時間不會是負數
+    np.maximum(track.starts, 0, out=track.starts)
+    np.maximum(track.ends, 0, out=track.ends)
+    return [
+        SubtitleEntry(sub.index, ms_to_time(start), ms_to_time(end), sub.text)
+        for sub, (start, end, _) in zip(subs, track)
+    ]
 
-    adjusted = []
-    for sub in subs:
-        start_ms = time_to_ms(sub.start) + offset_ms
-        end_ms = time_to_ms(sub.end) + offset_ms
-
-        # 確保時間不會是負數
-        start_ms = max(0, start_ms)
-        end_ms = max(0, end_ms)
-
-        adjusted.append(
-            SubtitleEntry(
-                index=sub.index,
-                start=ms_to_time(start_ms),
-                end=ms_to_time(end_ms),
-                text=sub.text,
-            )
-        )
 
-    return adjusted
+def repair_timing(
+    subs: List[SubtitleEntry],
+    min_duration: Optional[int] = 800,
+    max_duration: Optional[int] = None,
+    max_gap: Optional[int] = 300,
+) -> List[SubtitleEntry]:
+    """
+    修正時間軸：補上短空檔、修正重疊、限制單句長度 (毫秒)
+
+    Args:
+        min_duration: 單句最短顯示時間 (不超過下一句開始)，None 表示不限制
+        max_duration: 單句最長顯示時間，None 表示不限制
+        max_gap: 不超過此長度的空檔併入前一句，None 表示不處理
+    """
+    track = to_track(subs)
+    order = np.argsort(track.starts, kind="stable")
+    track.sort()
+    if max_gap is not None:
+        track.close_gaps(max_gap)
+    # 被後一句完全蓋住的字幕保留為 0 長度，不刪除內容
+    track.fix_overlaps(drop_empty=False)
+    track.enforce_duration(min_duration, max_duration)
+    # 不會刪除字幕，依排序後的順序沿用原本的序號
+    return from_track(track, [subs[i].index for i in order.tolist()])
 
 
 def write_srt(subs: List[SubtitleEntry], output_path: str):
+    content = "".join(
+        f"{sub.index}\n{sub.start} --> {sub.end}\n{sub.text.strip()}\n\n"
+        for sub in subs
+    )
     with open(output_path, "w", encoding="utf-8") as f:
-        for sub in subs:
-            f.write(f"{sub.index}\n")
-            f.write(f"{sub.start} --> {sub.end}\n")
-            f.write(f"{sub.text.strip()}\n\n")
+        f.write(content)
 
 
 def validate_timing(subs: List[SubtitleEntry]) -> List[str]:
     """
     驗證時間軸是否有問題並返回警告訊息
     """
-    warnings = []
-
-    for i, sub in enumerate(subs):
-        start_ms = time_to_ms(sub.start)
-        end_ms = time_to_ms(sub.end)
-        duration = end_ms - start_ms
+    if not subs:
+        return []
+    track = to_track(subs)
+    durations = track.durations
 
+    warnings = []
+    too_short = durations < 500
+    too_long = durations > 8000
+    overlaps = np.zeros(len(subs), dtype=bool)
+    overlaps[:-1] = track.overlap_mask()
+
+    # 只對有問題的字幕組訊息
+    for i in np.flatnonzero(too_short | too_long | overlaps).tolist():
+        sub = subs[i]
+        duration = int(durations[i])
         # 檢查持續時間是否過短
-        if duration < 500:
+        if too_short[i]:
             warnings.append(
                 f"第 {sub.index} 句持續時間過短 ({duration}ms): {sub.text[:20]}..."
             )
-
         # 檢查持續時間是否過長
-        if duration > 8000:
+        if too_long[i]:
             warnings.append(
                 f"第 {sub.index} 句持續時間過長 ({duration}ms): {sub.text[:20]}..."
             )
-
         # 檢查是否與下一句重疊
-        if i < len(subs) - 1:
-            next_start = time_to_ms(subs[i + 1].start)
-            if end_ms > next_start:
-                warnings.append(f"第 {sub.index} 句與第 {subs[i + 1].index} 句時間重疊")
+        if overlaps[i]:
+            warnings.append(f"第 {sub.index} 句與第 {subs[i + 1].index} 句時間重疊")
 
     return warnings
 
 
+def normalize_file(
+    input_path: str,
+    output_path: str,
+    min_duration: int = 800,
+    max_duration: int = 6000,
+    time_adjustment: float = 0.0,
+    auto_captions: bool = False,
+) -> int:
+    """正規化單一字幕檔，回傳輸出的句數 (auto_captions: 是否為 YouTube 自動字幕)"""
+    normalized = merge_and_split_sentences(
+        parse_srt(input_path, auto_captions),
+        min_duration=min_duration,
+        max_duration=max_duration,
+        time_adjustment=time_adjustment,
+    )
+    normalized = repair_timing(normalized, min_duration)
+    write_srt(normalized, output_path)
+    return len(normalized)
+
+
+def normalize_folder(input_dir: str, output_dir: str, **kwargs):
+    """批次正規化資料夾內所有 .srt"""
+    os.makedirs(output_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(".srt"))
+    total = 0
+    for name in files:
+        try:
+            total += normalize_file(
+                os.path.join(input_dir, name), os.path.join(output_dir, name), **kwargs
+            )
+        except Exception as e:
+            print(f"❌ {name} 處理失敗: {e}")
+    elapsed = time.perf_counter() - t0
+    print(f"✅ 已正規化 {len(files)} 個檔案，共 {total} 句，耗時 {elapsed:.2f} 秒")
+
+
 if __name__ == "__main__":
     input_path = "c:/temp/c.srt"
     output_path = "c:/temp/normalized.srt"
@@ -228,6 +317,17 @@ if __name__ == "__main__":
     TIME_ADJUSTMENT = 0.0  # 整體時間調整(秒)，可設定如 -0.5 或 +1.2
     GLOBAL_OFFSET = 0.0  # 全域時間偏移(秒)
 
+    # 批次模式: python normalize_srt_C.py <輸入資料夾> <輸出資料夾>
+    if len(sys.argv) == 3 and os.path.isdir(sys.argv[1]):
+        normalize_folder(
+            sys.argv[1],
+            sys.argv[2],
+            min_duration=MIN_DURATION,
+            max_duration=MAX_DURATION,
+            time_adjustment=TIME_ADJUSTMENT,
+        )
+        sys.exit(0)
+
     parsed = parse_srt(input_path)
     print(f"📖 讀取了 {len(parsed)} 個字幕條目")
 
@@ -238,6 +338,7 @@ if __name__ == "__main__":
         max_duration=MAX_DURATION,
         time_adjustment=TIME_ADJUSTMENT,
     )
+    normalized = repair_timing(normalized, MIN_DURATION)
     print(f"🔄 正規化後共 {len(normalized)} 個句子")
 
     # 如果需要全域時間調整
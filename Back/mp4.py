@@ -7,6 +7,13 @@ import os
 import re
 import textwrap
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CSrtLoader import CSrtLoader
+
 
 def parse_srt_time(time_str):
     """解析 SRT 時間格式 (HH:MM:SS,mmm)"""
@@ -22,18 +29,8 @@ def parse_srt_time(time_str):
 def parse_subtitle_file(file_path):
     """解析字幕檔案"""
     try:
-        # 嘗試不同編碼
-        encodings = ["utf-8", "utf-8-sig", "big5", "gbk", "cp950"]
-        content = None
-
-        for encoding in encodings:
-            try:
-                with open(file_path, "r", encoding=encoding) as f:
-                    content = f.read()
-                print(f"成功使用 {encoding} 編碼讀取 {file_path}")
-                break
-            except:
-                continue
+        # 一次讀入並自動判斷編碼
+        content = CSrtLoader.read_text(file_path)
 
         if not content:
             raise Exception("無法讀取檔案")
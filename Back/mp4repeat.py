@@ -1,12 +1,15 @@
-from moviepy.editor import VideoFileClip, concatenate_videoclips
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CMp4Concat import CMp4Concat
 
 inputmp4 = r"C:\英語\Earth02.mp4"
 outputmp4 = r"C:\英語\Earth02_10.mp4"
-# 讀入原始 MP4 檔案
-clip = VideoFileClip(inputmp4)
-
-# 重複播放 3 次
-repeated_clip = concatenate_videoclips([clip] * 5)
 
-# 儲存為新影片
-repeated_clip.write_videofile(outputmp4, codec="libx264", audio_codec="aac")
+# 重複播放 5 次 (stream copy，不重新編碼)
+CMp4Concat().repeat(inputmp4, outputmp4, 5)
@@ -5,10 +5,19 @@ SRT字幕校正程序
 使用原文来校正SRT字幕中的错误文字
 """
 
+import os
 import re
-import difflib
+import sys
 from typing import List, Tuple, Dict
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCueTrack import format_srt_time, iter_srt_numbered
+from lib_srt.CTextCorrector import CTextCorrector
+
 
 class SRTCorrector:
     def __init__(self):
@@ -61,24 +70,19 @@ class SRTCorrector:
     def parse_srt(self, srt_content: str) -> List[Dict]:
         """解析SRT文件内容"""
         entries = []
-        blocks = re.split(r"\n\s*\n", srt_content.strip())
-
-        for block in blocks:
-            lines = block.strip().split("\n")
-            if len(lines) >= 3:
-                # 序号
-                sequence = int(lines[0])
-
-                # 时间码
-                timecode = lines[1]
-
-                # 字幕文本（可能多行）
-                text = " ".join(lines[2:])
-
-                entries.append(
-                    {"sequence": sequence, "timecode": timecode, "text": text}
-                )
-
+        cues = iter_srt_numbered(srt_content.strip().splitlines())
+        for position, (sequence, start, end, text) in enumerate(cues, start=1):
+            # 没有文字的字幕不处理，序号沿用原文件
+            if not text:
+                continue
+            entries.append(
+                {
+                    "sequence": sequence or position,
+                    "timecode": f"{format_srt_time(start)} --> {format_srt_time(end)}",
+                    # 字幕文本（可能多行）
+                    "text": " ".join(text.splitlines()),
+                }
+            )
         return entries
 
     def extract_time_parts(self, timecode: str) -> Tuple[str, str]:
@@ -86,38 +90,33 @@ class SRTCorrector:
         start, end = timecode.split(" --> ")
         return start.strip(), end.strip()
 
+    @property
+    def engine(self) -> CTextCorrector:
+        """错误映射表编译成的校正引擎 (映射表变动时重新编译)"""
+        key = tuple(self.common_errors.items())
+        if getattr(self, "_engine_key", None) != key:
+            self._engine = CTextCorrector(self.common_errors)
+            self._engine_key = key
+        return self._engine
+
     def correct_text(
-        self, text: str, reference_text: str = None
+        self, text: str, reference_text: str = None, apply_errors: bool = True
     ) -> Tuple[str, List[str]]:
-        """校正文本"""
-        original_text = text
+        """
+        校正文本 (reference_text 为对齐后对应的原文片段)
+
+        apply_errors 为 False 时不再套用错误映射表 (调用端已套用过)
+        """
         corrections = []
+        # 1. 使用错误映射表进行基本校正 (Aho-Corasick 一次扫描)
+        if apply_errors:
+            text, applied = self.engine.replace_errors(text)
+            corrections = [f"'{wrong}' → '{correct}'" for wrong, correct in applied]
 
-        # 1. 使用错误映射表进行基本校正
-        for wrong, correct in self.common_errors.items():
-            if wrong in text:
-                text = text.replace(wrong, correct)
-                corrections.append(f"'{wrong}' → '{correct}'")
-
-        # 2. 如果提供了参考文本，进行更精确的校正
-        if reference_text:
-            # 使用序列匹配找到最相似的部分
-            matcher = difflib.SequenceMatcher(None, text, reference_text)
-            similarity = matcher.ratio()
-
-            if similarity < 0.8:  # 相似度低于80%时进行进一步分析
-                # 找到最匹配的部分
-                matches = matcher.get_matching_blocks()
-                if matches:
-                    # 提取可能的正确文本片段
-                    for match in matches:
-                        if match.size > 5:  # 只考虑较长的匹配
-                            ref_part = reference_text[match.b : match.b + match.size]
-                            text_part = text[match.a : match.a + match.size]
-                            if ref_part != text_part:
-                                corrections.append(
-                                    f"片段校正: '{text_part}' → '{ref_part}'"
-                                )
+        # 2. 如果有对应的原文片段，直接采用原文
+        if reference_text and reference_text != text:
+            corrections.append(f"片段校正: '{text}' → '{reference_text}'")
+            text = reference_text
 
         # 3. 标点符号校正
         text = self.correct_punctuation(text)
@@ -137,35 +136,9 @@ class SRTCorrector:
         self, srt_text: str, reference_text: str, min_length: int = 10
     ) -> str:
         """在参考文本中找到最佳匹配"""
-        # 清理文本
-        clean_srt = re.sub(r"[，。！？；：\s]", "", srt_text)
-        clean_ref = re.sub(r"[，。！？；：\s]", "", reference_text)
-
-        # 如果SRT文本太短，直接返回
-        if len(clean_srt) < min_length:
+        if len(re.sub(r"[，。！？；：\s]", "", srt_text)) < min_length:
             return srt_text
-
-        # 在参考文本中搜索最相似的片段
-        best_match = ""
-        best_ratio = 0
-
-        # 滑动窗口搜索
-        window_size = len(clean_srt)
-        for i in range(len(clean_ref) - window_size + 1):
-            window = clean_ref[i : i + window_size]
-            ratio = difflib.SequenceMatcher(None, clean_srt, window).ratio()
-
-            if ratio > best_ratio:
-                best_ratio = ratio
-                # 从参考文本中提取对应的带标点版本
-                start_pos = reference_text.find(window[:10])  # 找到开始位置
-                if start_pos != -1:
-                    # 尝试提取完整的句子或短语
-                    end_pos = start_pos + len(srt_text)
-                    if end_pos <= len(reference_text):
-                        best_match = reference_text[start_pos:end_pos]
-
-        return best_match if best_ratio > 0.7 else srt_text
+        return self.engine.align([srt_text], reference_text)[0] or srt_text
 
     def correct_srt(
         self, srt_content: str, reference_text: str = None
@@ -175,20 +148,30 @@ class SRTCorrector:
         corrected_entries = []
         all_corrections = []
 
+        # 先用错误映射表校正，再将整份字幕与原文一次对齐
+        texts = []
+        dict_corrections = []
         for entry in entries:
+            text, applied = self.engine.replace_errors(entry["text"])
+            texts.append(text)
+            dict_corrections.append(
+                [f"'{wrong}' → '{correct}'" for wrong, correct in applied]
+            )
+        if reference_text:
+            matches = self.engine.align(texts, reference_text)
+        else:
+            matches = [None] * len(entries)
+
+        for entry, text, corrections, match in zip(
+            entries, texts, dict_corrections, matches
+        ):
             original_text = entry["text"]
 
-            # 校正文本
-            if reference_text:
-                # 先尝试在参考文本中找到最佳匹配
-                best_match = self.find_best_match_in_reference(
-                    original_text, reference_text
-                )
-                corrected_text, corrections = self.correct_text(
-                    original_text, best_match
-                )
-            else:
-                corrected_text, corrections = self.correct_text(original_text)
+            # 校正文本 (错误映射表已套用，不再重复替换)
+            corrected_text, ref_corrections = self.correct_text(
+                text, match, apply_errors=False
+            )
+            corrections = corrections + ref_corrections
 
             # 记录修正信息
             if corrections:
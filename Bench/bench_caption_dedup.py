@@ -0,0 +1,130 @@
+import os
+import random
+import re
+import sys
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCaptionDedup import CCaptionDedup
+from lib_srt.CCueTrack import CCueTrack, format_srt_time, parse_time_ms
+
+# 比較 CCaptionDedup 與舊版去重複寫法的速度與結果
+# 用法: python Bench/bench_caption_dedup.py [自動字幕.srt ...]
+# 未指定檔案時產生模擬的 YouTube 滾動式自動字幕
+
+WORDS = (
+    "so today we are going to talk about how the model learns from data and "
+    "why it matters when you want to build something that actually works"
+).split()
+
+
+def make_rolling_srt(count: int, seed: int = 0) -> str:
+    """模擬 yt-dlp 轉出的自動字幕：每條 = 上一行 + 新的一行，中間夾 10ms 過場字幕"""
+    rng = random.Random(seed)
+    blocks = []
+    prev_line = ""
+    t = 0
+    for _ in range(count):
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 9)))
+        text = f"{prev_line}\n{line}" if prev_line else line
+        blocks.append((t, t + 10, prev_line or line))
+        blocks.append((t + 10, t + 2000, text))
+        prev_line = line
+        t += 2000
+    return "\n".join(
+        f"{i}\n{format_srt_time(s)} --> {format_srt_time(e)}\n{text}\n"
+        for i, (s, e, text) in enumerate(blocks, start=1)
+    )
+
+
+def legacy_exact(srt_content: str):
+    """舊版寫法：區塊 regex，只略過與上一條完全相同的內容"""
+    cleaned = []
+    prev_content = ""
+    prev_end = None
+    for block in re.split(r"\n\s*\n", srt_content.strip()):
+        lines = block.strip().split("\n")
+        if len(lines) < 3:
+            continue
+        start, end = (parse_time_ms(t) for t in lines[1].split(" --> "))
+        content = re.sub(r"\s+", " ", " ".join(lines[2:])).strip()
+        if content == prev_content:
+            continue
+        if prev_end is not None and start < prev_end:
+            start = prev_end + 1
+            if start >= end:
+                continue
+        if end - start < 100:
+            continue
+        cleaned.append((start, end, content))
+        prev_content, prev_end = content, end
+    return cleaned
+
+
+def legacy_nested(srt_content: str):
+    """逐一嘗試每個重疊長度並反覆串接字串的寫法 (O(n²))"""
+    track = CCueTrack.from_string(srt_content)
+    output = ""
+    result = []
+    for start, end, raw in track:
+        text = re.sub(r"\s+", " ", raw).strip()
+        words = text.split()
+        new_words = words
+        for k in range(len(words), 0, -1):
+            if output.endswith(" ".join(words[:k])):
+                new_words = words[k:]
+                break
+        if new_words:
+            output += " " + " ".join(new_words)
+            result.append((start, end, " ".join(new_words)))
+    return result
+
+
+def timeit(label: str, func, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    print(f"  {label:<24} {best * 1000:9.1f} ms", end="")
+    return result
+
+
+def word_count(cues) -> int:
+    return sum(len(text.split()) for _, _, text in cues)
+
+
+def bench(name: str, content: str, nested: bool = True):
+    track = CCueTrack.from_string(content)
+    print(f"📊 {name}: {len(track)} 條字幕，{word_count(track)} 個字詞")
+
+    result = timeit("legacy exact", lambda: legacy_exact(content))
+    print(f"  → {len(result)} 條 / {word_count(result)} 字詞")
+    if nested:
+        result = timeit("legacy nested", lambda: legacy_nested(content), repeat=1)
+        print(f"  → {len(result)} 條 / {word_count(result)} 字詞")
+    result = timeit("CCaptionDedup", lambda: CCaptionDedup().dedupe(track))
+    print(f"  → {len(result)} 條 / {word_count(result)} 字詞")
+
+    overlaps = int((result.ends[:-1] > result.starts[1:]).sum()) if len(result) else 0
+    print(f"  時間重疊的字幕: {overlaps}")
+
+
+def main():
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            with open(path, encoding="utf-8") as f:
+                bench(os.path.basename(path), f.read())
+        return
+
+    for count in (1_000, 5_000, 20_000):
+        content = make_rolling_srt(count)
+        bench(f"模擬自動字幕 x{count}", content, nested=count <= 5_000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCueTrack import CCueTrack, format_srt_time
+
+# 比較 CCueTrack 與舊版 SRT 解析方式 (區塊 regex + datetime / split) 的速度
+# 用法: python Bench/bench_srt_parse.py [字幕數量]
+
+
+def make_srt(path: str, count: int):
+    # 控制在 24 小時內，datetime.strptime 才能解析
+    step = min(2500, 86_000_000 // count)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            start = i * step
+            f.write(
+                f"{i + 1}\n{format_srt_time(start)} --> {format_srt_time(start + step - 100)}\n"
+                f"This is subtitle line number {i + 1}.\n這是第 {i + 1} 句字幕\n\n"
+            )
+
+
+def legacy_block_split(path: str):
+    """舊版寫法：整檔讀入、以空行切區塊、split 轉秒數"""
+    with open(path, encoding="utf-8") as f:
+        blocks = re.split(r"\n\s*\n", f.read().strip())
+
+    result = []
+    for block in blocks:
+        lines = block.strip().split("\n")
+        if len(lines) < 3:
+            continue
+        start, end = lines[1].split(" --> ")
+        values = []
+        for t in (start, end):
+            time_part, ms = t.strip().split(",")
+            h, m, s = map(int, time_part.split(":"))
+            values.append(h * 3600 + m * 60 + s + int(ms) / 1000)
+        result.append((values[0], values[1], " ".join(lines[2:])))
+    return result
+
+
+def legacy_datetime(path: str):
+    """舊版寫法：整檔 regex 搭配 datetime.strptime"""
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+
+    pattern = re.compile(
+        r"(\d+)\s+(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})\s+(.*?)(?=\n\n|\Z)",
+        re.DOTALL,
+    )
+    base = datetime.strptime("00:00:00,000", "%H:%M:%S,%f")
+    result = []
+    for _, start, end, text in pattern.findall(content):
+        s = (datetime.strptime(start, "%H:%M:%S,%f") - base).total_seconds()
+        e = (datetime.strptime(end, "%H:%M:%S,%f") - base).total_seconds()
+        result.append((s, e, text.replace("\n", " ")))
+    return result
+
+
+def timeit(label: str, func, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    print(f"  {label:<28} {best * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "bench.srt")
+        out_path = os.path.join(temp_dir, "out.srt")
+        make_srt(path, count)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"📊 {count} 條字幕 ({size_mb:.1f} MB)")
+
+        print("解析：")
+        legacy = timeit("legacy split", lambda: legacy_block_split(path))
+        timeit("legacy datetime", lambda: legacy_datetime(path))
+        track = timeit("CCueTrack.from_file", lambda: CCueTrack.from_file(path))
+
+        print("時間運算 (平移 + 縮放 + 裁切)：")
+        timeit(
+            "legacy per-cue (不含解析)",
+            lambda: [
+                (max((s + 1.5) * 1.001, 0), max((e + 1.5) * 1.001, 0), t)
+                for s, e, t in legacy
+            ],
+        )
+        timeit(
+            "CCueTrack (不含解析)",
+            lambda: track.copy().shift(1500).scale(1.001).clip(0),
+        )
+
+        print("輸出：")
+        timeit("CCueTrack.save", lambda: track.save(out_path))
+
+
+if __name__ == "__main__":
+    main()
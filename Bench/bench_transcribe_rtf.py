@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_yt.Whisper.CChunkedTranscriber import CChunkedTranscriber
+
+# 比較單一模型循序轉錄與 CChunkedTranscriber 的即時率 (RTF = 耗時 / 音檔長度)
+# 用法: python Bench/bench_transcribe_rtf.py lecture.mp3 --workers 1 2 4 --chunk 60 120 300
+# RTF < 1 表示比即時快；每組設定另外列出區塊數
+
+
+def bench_sequential(path: str, model_size: str) -> float:
+    """原本的做法：整個檔案交給單一模型"""
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(model_size, device="cpu", compute_type="int8")
+    t0 = time.perf_counter()
+    segments, _ = model.transcribe(path, beam_size=5, word_timestamps=True)
+    count = sum(1 for _ in segments)
+    elapsed = time.perf_counter() - t0
+    print(f"sequential        : {count} 段，耗時 {elapsed:.1f} 秒")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="轉錄即時率測試")
+    parser.add_argument("audio", help="音檔路徑")
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk", type=float, nargs="+", default=[120.0])
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    from faster_whisper import decode_audio
+
+    duration = len(decode_audio(args.audio)) / 16000
+    print(f"音檔長度 {duration:.0f} 秒，CPU 核心 {os.cpu_count()}")
+
+    if not args.skip_sequential:
+        elapsed = bench_sequential(args.audio, args.model)
+        print(f"{'':18}  RTF {elapsed / duration:.3f}")
+
+    print(f"{'workers':>7} {'threads':>7} {'chunk_s':>7} {'chunks':>6} {'elapsed':>8} {'RTF':>6}")
+    for workers in args.workers:
+        for chunk in args.chunk:
+            transcriber = CChunkedTranscriber(
+                model_size=args.model, workers=workers, chunk_seconds=chunk
+            )
+            try:
+                # 先暖機讓每個行程載入模型，不把載入時間算進 RTF
+                list(transcriber.pool.map(abs, range(workers)))
+                _, stats = transcriber.transcribe(args.audio, use_cache=False)
+            finally:
+                transcriber.close()
+            print(
+                f"{workers:>7} {transcriber.cpu_threads:>7} {chunk:>7.0f} "
+                f"{stats['chunks']:>6} {stats['elapsed']:>8.1f} {stats['rtf']:>6.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
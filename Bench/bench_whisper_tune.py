@@ -0,0 +1,299 @@
+import argparse
+import glob
+import itertools
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCueTrack import CCueTrack
+from lib_yt.Whisper.whisper_profile import default_device, profile_path, save_profile
+
+# Whisper 設定調校
+# 以固定的本機語料 (音檔 + 同名的參考 SRT) 測試每組 (模型, 計算型別, beam, 執行緒)，
+# 記錄即時率 (RTF = 轉錄耗時 / 音檔長度)、峰值記憶體與 WER，挑出建議設定寫入設定檔，
+# model_pool 與轉錄端點之後會自動套用 (見 lib_yt/Whisper/whisper_profile.py)
+#
+# 用法:
+#   python Bench/bench_whisper_tune.py corpus/ --models small medium \
+#       --compute-types int8 float32 --beams 1 5 --threads 0 4 --write-profile
+#
+# 每組設定在獨立的行程執行，峰值記憶體只計算該組的模型；
+# 音訊先解碼好 (CAudioStore)，RTF 不含解碼與模型載入時間。
+# 建議設定：WER 不超過最佳值 + --wer-tolerance，且符合 --max-rtf / --max-rss 的設定中最快的一組
+# CPU 分塊轉錄 (CChunkedTranscriber) 以建議的執行緒數作為每個行程的執行緒數，行程數依核心數換算
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".webm", ".opus", ".flac", ".mp4")
+DEFAULT_COMPUTE_TYPES = {
+    "cpu": ["int8", "float32"],
+    "cuda": ["float16", "int8_float16"],
+}
+
+# 中日韓文字逐字計算 (等同 CER)，其他語言以詞計算
+_TOKEN_RE = re.compile(r"[぀-ヿ㐀-鿿가-힯]|[^\W_]+(?:'[^\W_]+)?")
+
+
+def load_corpus(corpus_dir: str) -> List[Tuple[str, str]]:
+    """找出有同名參考字幕的音檔，回傳 [(音檔, 參考文字)]"""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*"))):
+        stem, ext = os.path.splitext(path)
+        if ext.lower() not in AUDIO_EXTENSIONS or not os.path.exists(f"{stem}.srt"):
+            continue
+        track = CCueTrack.from_file(f"{stem}.srt")
+        text = " ".join(" ".join(t.splitlines()) for t in track.texts)
+        corpus.append((path, text))
+    return corpus
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def wer(reference: List[str], hypothesis: List[str]) -> float:
+    """詞錯誤率 = 編輯距離 / 參考詞數，逐列以 numpy 計算 (長音檔也很快)"""
+    if not reference:
+        return float(bool(hypothesis))
+    vocab: Dict[str, int] = {}
+    ref = np.array([vocab.setdefault(w, len(vocab)) for w in reference])
+    hyp = np.array([vocab.setdefault(w, len(vocab)) for w in hypothesis], dtype=int)
+    index = np.arange(len(hyp) + 1)
+    prev = index.copy()
+    for i, token in enumerate(ref, 1):
+        cur = np.empty_like(prev)
+        cur[0] = i
+        # 替換 / 刪除
+        cur[1:] = np.minimum(prev[:-1] + (hyp != token), prev[1:] + 1)
+        # 插入：cur[j] = min(cur[j], cur[j-1] + 1)
+        cur = np.minimum.accumulate(cur - index) + index
+        prev = cur
+    return float(prev[-1]) / len(ref)
+
+
+def peak_rss_mb() -> float:
+    """目前行程的峰值記憶體 (MB)"""
+    if sys.platform == "win32":
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 單位是 KB，macOS 是 bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _run_config(config: dict, paths: List[str], language: Optional[str], queue):
+    """子行程：載入模型並依序轉錄語料"""
+    try:
+        from faster_whisper import WhisperModel
+
+        from lib_util.CAudioStore import default_store
+
+        audios = [default_store().whisper_audio(path) for path in paths]
+        t0 = time.perf_counter()
+        model = WhisperModel(
+            config["model_size"],
+            device=config["device"],
+            compute_type=config["compute_type"],
+            cpu_threads=config["cpu_threads"],
+        )
+        load_seconds = time.perf_counter() - t0
+
+        texts = []
+        elapsed = 0.0
+        for audio in audios:
+            t0 = time.perf_counter()
+            segments, _ = model.transcribe(
+                audio,
+                language=language,
+                beam_size=config["beam_size"],
+                vad_filter=True,
+            )
+            texts.append(" ".join(s.text.strip() for s in segments))
+            elapsed += time.perf_counter() - t0
+
+        queue.put(
+            {
+                "texts": texts,
+                "elapsed": elapsed,
+                "duration": sum(len(a) for a in audios) / 16000,
+                "load_seconds": load_seconds,
+                "peak_rss_mb": peak_rss_mb(),
+            }
+        )
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def measure(
+    config: dict,
+    corpus: List[Tuple[str, str]],
+    language: Optional[str],
+    timeout: float = 3600,
+) -> dict:
+    """
+    在獨立行程執行一組設定，回傳 config 加上 rtf / wer / peak_rss_mb
+
+    子行程逾時或異常結束 (記憶體不足被終止、原生程式庫崩潰) 時回傳 error
+    """
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(
+        target=_run_config, args=(config, [p for p, _ in corpus], language, queue)
+    )
+    process.start()
+    # 先取結果再 join，避免子行程卡在寫入佇列；
+    # 定期檢查子行程是否還活著，崩潰時不會永遠等下去
+    deadline = time.monotonic() + timeout
+    output = None
+    while output is None:
+        try:
+            output = queue.get(timeout=1.0)
+        except queue_module.Empty:
+            if not process.is_alive():
+                # 結束前可能剛好放入結果
+                try:
+                    output = queue.get(timeout=1.0)
+                except queue_module.Empty:
+                    process.join()
+                    output = {"error": f"子行程異常結束 (exitcode {process.exitcode})"}
+            elif time.monotonic() > deadline:
+                process.terminate()
+                process.join()
+                output = {"error": f"逾時 ({timeout:.0f} 秒)"}
+    process.join()
+    if "error" in output:
+        return {**config, "error": output["error"]}
+
+    errors = [
+        wer(tokenize(ref), tokenize(hyp))
+        for (_, ref), hyp in zip(corpus, output["texts"])
+    ]
+    return {
+        **config,
+        "rtf": output["elapsed"] / max(output["duration"], 1e-9),
+        "wer": float(np.mean(errors)),
+        "peak_rss_mb": output["peak_rss_mb"],
+        "load_seconds": output["load_seconds"],
+    }
+
+
+def recommend(
+    results: List[dict],
+    wer_tolerance: float,
+    max_rtf: Optional[float] = None,
+    max_rss: Optional[float] = None,
+) -> Optional[dict]:
+    """
+    準確度夠好 (WER <= 最佳 + wer_tolerance) 且符合限制的設定中，RTF 最低者
+    (同分取記憶體較少)
+    """
+    ok = [r for r in results if "error" not in r]
+    if not ok:
+        return None
+    best_wer = min(r["wer"] for r in ok)
+    candidates = [
+        r
+        for r in ok
+        if r["wer"] <= best_wer + wer_tolerance
+        and (max_rtf is None or r["rtf"] <= max_rtf)
+        and (max_rss is None or r["peak_rss_mb"] <= max_rss)
+    ]
+    if not candidates:
+        print("⚠️ 沒有設定同時符合準確度與限制，改選 WER 最低者")
+        candidates = [r for r in ok if r["wer"] == best_wer]
+    return min(candidates, key=lambda r: (r["rtf"], r["peak_rss_mb"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper 設定調校")
+    parser.add_argument("corpus", help="語料目錄 (音檔 + 同名 .srt 參考字幕)")
+    parser.add_argument("--device", default=None, help="cpu / cuda，預設自動判斷")
+    parser.add_argument("--models", nargs="+", default=["base", "small", "medium"])
+    parser.add_argument("--compute-types", nargs="+", default=None)
+    parser.add_argument("--beams", type=int, nargs="+", default=[1, 5])
+    parser.add_argument(
+        "--threads", type=int, nargs="+", default=[0], help="0 表示自動"
+    )
+    parser.add_argument("--language", default=None)
+    parser.add_argument("--wer-tolerance", type=float, default=0.02)
+    parser.add_argument("--max-rtf", type=float, default=None)
+    parser.add_argument("--max-rss", type=float, default=None, help="MB")
+    parser.add_argument(
+        "--timeout", type=float, default=3600, help="每組設定的逾時秒數"
+    )
+    parser.add_argument("--out", default=None, help="完整結果存成 JSON")
+    parser.add_argument("--write-profile", action="store_true")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"❌ {args.corpus} 沒有找到音檔與同名的 .srt")
+        sys.exit(1)
+    device = args.device or default_device()
+    compute_types = args.compute_types or DEFAULT_COMPUTE_TYPES[device]
+    print(f"語料 {len(corpus)} 個檔案，裝置 {device}，CPU 核心 {os.cpu_count()}")
+
+    print(
+        f"{'model':>10} {'compute':>12} {'beam':>4} {'threads':>7} "
+        f"{'RTF':>6} {'WER':>6} {'RSS_MB':>7} {'load_s':>6}"
+    )
+    results = []
+    for model_size, compute_type, beam_size, cpu_threads in itertools.product(
+        args.models, compute_types, args.beams, args.threads
+    ):
+        config = {
+            "device": device,
+            "model_size": model_size,
+            "compute_type": compute_type,
+            "beam_size": beam_size,
+            "cpu_threads": cpu_threads,
+        }
+        result = measure(config, corpus, args.language, args.timeout)
+        results.append(result)
+        prefix = (
+            f"{model_size:>10} {compute_type:>12} {beam_size:>4} {cpu_threads:>7}"
+        )
+        if "error" in result:
+            print(f"{prefix}  ❌ {result['error']}")
+            continue
+        print(
+            f"{prefix} {result['rtf']:>6.3f} {result['wer']:>6.3f} "
+            f"{result['peak_rss_mb']:>7.0f} {result['load_seconds']:>6.1f}"
+        )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 結果已儲存：{args.out}")
+
+    best = recommend(results, args.wer_tolerance, args.max_rtf, args.max_rss)
+    if best is None:
+        print("❌ 所有設定都失敗")
+        sys.exit(1)
+    print(
+        f"🎯 建議設定：{best['model_size']} / {best['compute_type']} / "
+        f"beam {best['beam_size']} / threads {best['cpu_threads']} "
+        f"(RTF {best['rtf']:.3f}, WER {best['wer']:.3f}, {best['peak_rss_mb']:.0f} MB)"
+    )
+    if args.write_profile:
+        metrics = {k: best[k] for k in ("rtf", "wer", "peak_rss_mb")}
+        metrics["corpus_files"] = len(corpus)
+        save_profile(best, device, metrics)
+        print(f"✅ 已寫入 {profile_path()}")
+
+
+if __name__ == "__main__":
+    main()
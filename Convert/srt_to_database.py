@@ -1,9 +1,23 @@
 import json
 import psycopg2
+from psycopg2.extensions import make_dsn
 from psycopg2.extras import RealDictCursor
 import os
+import sys
 from typing import List, Dict, Any
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_dbconvert.bulk_import import (
+    SUBTITLES_TARGET,
+    CBulkImporter,
+    read_subtitle_json,
+    report,
+)
+
 
 def load_json_data(json_filepath: str) -> Dict[str, Any]:
     """載入 JSON 檔案"""
@@ -44,46 +58,15 @@ def insert_subtitles_to_db(json_filepath: str, db_config: Dict[str, str]):
     if not subtitles:
         raise ValueError("JSON 中缺少 subtitles 資料")
 
-    # 連接資料庫
-    conn = connect_to_database(**db_config)
-
+    # COPY 批次匯入 (同一影片同一序號已存在時更新)
+    importer = CBulkImporter(make_dsn(**db_config))
     try:
-        with conn.cursor() as cursor:
-            # 準備 INSERT 語句
-            insert_query = """
-                INSERT INTO subtitles (video_id, seq, start_time, end_time, en_text, zh_text) 
-                VALUES (%(video_id)s, %(seq)s, %(start_time)s, %(end_time)s, %(en_text)s, %(zh_text)s)
-            """
-
-            # 批次插入資料
-            insert_data = []
-            for subtitle in subtitles:
-                insert_data.append(
-                    {
-                        "video_id": video_id,
-                        "seq": subtitle.get("seq"),
-                        "start_time": subtitle.get("start_time"),
-                        "end_time": subtitle.get("end_time"),
-                        "en_text": subtitle.get("ex_text"),  # 注意：JSON 中是 ex_text
-                        "zh_text": subtitle.get("zh_text"),
-                    }
-                )
-
-            # 執行批次插入
-            cursor.executemany(insert_query, insert_data)
-
-            # 提交事務
-            conn.commit()
-
-            print(f"✅ 成功插入 {len(insert_data)} 筆字幕資料")
-            print(f"📹 影片 ID：{video_id}")
-
+        stats = importer.run(*SUBTITLES_TARGET, read_subtitle_json(json_filepath))
     except psycopg2.Error as e:
-        conn.rollback()
         raise RuntimeError(f"資料庫操作失敗：{e}")
 
-    finally:
-        conn.close()
+    report("subtitles", stats, dry_run=False)
+    print(f"📹 影片 ID：{video_id}")
 
 
 def create_table_if_not_exists(db_config: Dict[str, str]):
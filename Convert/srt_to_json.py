@@ -1,6 +1,16 @@
+import os
 import re
+import sys
 import json
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCueTrack import format_srt_time
+from lib_srt.CTrackAligner import CTrackAligner
+
 
 def parse_srt(filepath):
     with open(filepath, encoding="utf-8") as f:
@@ -25,21 +35,18 @@ def parse_srt(filepath):
 
 
 def combine_srt_to_json(english_path, chinese_path, output_path, video_id):
-    english_srt = parse_srt(english_path)
-    chinese_srt = parse_srt(chinese_path)
-
-    if len(english_srt) != len(chinese_srt):
-        raise ValueError("字幕數量不一致")
+    # 兩個字幕檔各自計時，依時間重疊對齊 (字幕數量或斷句不同也可以)
+    cues = CTrackAligner().align_files(english_path, chinese_path)
 
     subtitles = []
-    for en, zh in zip(english_srt, chinese_srt):
+    for seq, (start, end, en_text, zh_text) in enumerate(cues, start=1):
         subtitles.append(
             {
-                "seq": en["seq"],
-                "start_time": en["start_time"],
-                "end_time": en["end_time"],
-                "ex_text": en["text"],
-                "zh_text": zh["text"],
+                "seq": seq,
+                "start_time": format_srt_time(start),
+                "end_time": format_srt_time(end),
+                "ex_text": en_text,
+                "zh_text": zh_text,
             }
         )
 
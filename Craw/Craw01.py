@@ -1,11 +1,19 @@
-import requests
+import asyncio
+import httpx
 from bs4 import BeautifulSoup
 import os
-import time
+import sys
 import re
 from urllib.parse import urlparse, urljoin
 from pathlib import Path
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CHttpClient import close_client, get as http_get
+
 
 def sanitize_filename(filename):
     """
@@ -42,14 +50,50 @@ def get_page_title(soup):
     return "untitled"
 
 
-def download_html_from_links(input_file, output_dir="downloaded_html", delay=1):
+async def fetch_pages(links, headers, concurrency=4, delay=1):
+    """
+    以共用的 async HTTP client 並行下載頁面 (保持連線，失敗自動重試)
+
+    Args:
+        links (list): 網址
+        headers (dict): 請求標頭
+        concurrency (int): 同時進行的請求數
+        delay (int): 每個 worker 兩次請求間的延遲時間（秒）
+
+    Returns:
+        list: 與 links 對應的回應，失敗時為例外
+    """
+    results = [None] * len(links)
+    pending = list(enumerate(links))
+
+    async def worker():
+        while pending:
+            i, url = pending.pop(0)
+            try:
+                results[i] = await http_get(url, headers=headers)
+            except Exception as e:
+                results[i] = e
+            if pending:
+                await asyncio.sleep(delay)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        await close_client()
+    return results
+
+
+def download_html_from_links(
+    input_file, output_dir="downloaded_html", delay=1, concurrency=4
+):
     """
     從文字檔讀取連結並下載HTML檔案
 
     Args:
         input_file (str): 包含連結的文字檔路徑
         output_dir (str): 輸出目錄
-        delay (int): 每次請求間的延遲時間（秒）
+        delay (int): 每個連線兩次請求間的延遲時間（秒）
+        concurrency (int): 同時下載的連結數
     """
 
     # 建立輸出目錄
@@ -78,13 +122,17 @@ def download_html_from_links(input_file, output_dir="downloaded_html", delay=1):
     failed_count = 0
     failed_links = []
 
+    # 先並行下載所有頁面
+    print(f"並行下載中 (同時 {concurrency} 個連線)...")
+    responses = asyncio.run(fetch_pages(links, headers, concurrency, delay))
+
     # 處理每個連結
-    for i, url in enumerate(links, 1):
+    for i, (url, response) in enumerate(zip(links, responses), 1):
         print(f"\n處理第 {i}/{len(links)} 個連結: {url}")
 
         try:
-            # 發送請求
-            response = requests.get(url, headers=headers, timeout=30)
+            if isinstance(response, Exception):
+                raise response
             response.raise_for_status()
 
             # 專門針對繁體中文網站的編碼處理
@@ -679,7 +727,7 @@ def download_html_from_links(input_file, output_dir="downloaded_html", delay=1):
 
             success_count += 1
 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"  ✗ 請求失敗: {e}")
             failed_count += 1
             failed_links.append(url)
@@ -689,10 +737,6 @@ def download_html_from_links(input_file, output_dir="downloaded_html", delay=1):
             failed_count += 1
             failed_links.append(url)
 
-        # 延遲避免過於頻繁的請求
-        if i < len(links):
-            time.sleep(delay)
-
     # 總結報告
     print(f"\n{'='*50}")
     print(f"下載完成！")
@@ -774,6 +818,7 @@ if __name__ == "__main__":
     input_file = "minlun_links_simple.txt"  # 輸入檔案
     output_directory = "downloaded_html"  # 輸出目錄
     request_delay = 1  # 請求間隔（秒）
+    request_concurrency = 4  # 同時下載數
 
     print("開始批量下載HTML檔案...")
     print(f"輸入檔案: {input_file}")
@@ -781,7 +826,9 @@ if __name__ == "__main__":
     print(f"請求間隔: {request_delay} 秒")
 
     # 執行下載
-    download_html_from_links(input_file, output_directory, request_delay)
+    download_html_from_links(
+        input_file, output_directory, request_delay, request_concurrency
+    )
 
     # 建立索引檔案
     create_index_file(output_directory)
@@ -2,48 +2,40 @@ import asyncio
 import edge_tts
 import os
 import re
+import sys
 from pydub import AudioSegment
 import tempfile
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
-def parse_srt(file_path):
-    """解析 SRT 檔案，回傳 [(序號, 開始秒數, 結束秒數, 文字)] 的列表"""
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+from lib_srt.CCueTrack import format_srt_time, iter_srt_numbered, parse_time_ms
+from lib_srt.CSrtLoader import CSrtLoader
 
-    # 根據 SRT 檔格式分段
-    pattern = r"(\d+)\s+(\d{2}:\d{2}:\d{2},\d{3})\s-->\s(\d{2}:\d{2}:\d{2},\d{3})\s+(.*?)(?=\n\n|\Z)"
-    matches = re.findall(pattern, content, re.DOTALL)
 
+def parse_srt(file_path):
+    """解析 SRT 檔案，回傳 [(序號, 開始秒數, 結束秒數, 文字)] 的列表 (略過沒有文字的字幕)"""
     result = []
-    for index, start, end, text in matches:
+    cues = iter_srt_numbered(CSrtLoader.read_lines(file_path))
+    for position, (index, start, end, text) in enumerate(cues, start=1):
         # 清除行內換行
         clean_text = text.replace("\n", " ").strip()
-        # 轉換時間格式為秒數
-        start_seconds = time_to_seconds(start)
-        end_seconds = time_to_seconds(end)
-        result.append((int(index), start_seconds, end_seconds, clean_text))
-
+        if clean_text:
+            # 保留檔案中的序號，沒有序號時以位置代替
+            result.append((index or position, start / 1000, end / 1000, clean_text))
     return result
 
 
 def time_to_seconds(time_str):
     """將 SRT 時間格式 (HH:MM:SS,mmm) 轉換為秒數"""
-    time_part, ms_part = time_str.split(",")
-    hours, minutes, seconds = map(int, time_part.split(":"))
-    milliseconds = int(ms_part)
-
-    total_seconds = hours * 3600 + minutes * 60 + seconds + milliseconds / 1000
-    return total_seconds
+    return parse_time_ms(time_str) / 1000
 
 
 def seconds_to_time(seconds):
     """將秒數轉換為 SRT 時間格式"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    ms = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{ms:03d}"
+    return format_srt_time(round(seconds * 1000))
 
 
 async def generate_speech_segment(text, voice, temp_file):
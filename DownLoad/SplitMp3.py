@@ -1,8 +1,15 @@
 import os
+import sys
 import srt
-from pydub import AudioSegment
 from datetime import timedelta
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CAudioStore import default_store
+
 
 def get_file_path(file_type, extension):
     """取得檔案路徑的輔助函數"""
@@ -103,11 +110,11 @@ def split_mp3_by_srt(mp3_file_path, srt_file_path, output_dir):
         os.makedirs(output_dir)
         print(f"已建立輸出資料夾: {output_dir}")
 
-    # 讀取 MP3 檔案
+    # 讀取 MP3 檔案 (原始取樣率的 PCM 只解碼一次，之後直接 memmap)
     print(f"\n正在載入 MP3 檔案...")
     try:
-        audio = AudioSegment.from_mp3(mp3_file_path)
-        print(f"MP3 檔案載入成功 (長度: {len(audio)/1000:.2f} 秒)")
+        audio = default_store().open(mp3_file_path, sample_rate=None, channels=None)
+        print(f"MP3 檔案載入成功 (長度: {audio.duration:.2f} 秒)")
     except Exception as e:
         print(f"載入 MP3 檔案時發生錯誤: {e}")
         return False
@@ -131,19 +138,17 @@ def split_mp3_by_srt(mp3_file_path, srt_file_path, output_dir):
             start_ms = timedelta_to_ms(subtitle.start)
             end_ms = timedelta_to_ms(subtitle.end)
 
-            # 切割音訊片段
-            audio_segment = audio[start_ms:end_ms]
-
             # 輸出檔案名稱
             output_filename = f"{i+1:03d}.mp3"
             output_path = os.path.join(output_dir, output_filename)
 
-            # 匯出音訊片段
-            audio_segment.export(output_path, format="mp3")
+            # 切割並匯出音訊片段
+            if not audio.export(output_path, start_ms, end_ms):
+                continue
 
             success_count += 1
             print(
-                f"✓ {output_filename} ({subtitle.start} - {subtitle.end}) - {len(audio_segment)/1000:.2f}秒"
+                f"✓ {output_filename} ({subtitle.start} - {subtitle.end}) - {(end_ms - start_ms)/1000:.2f}秒"
             )
 
         except Exception as e:
@@ -2,7 +2,15 @@ import pysrt
 import os
 import subprocess
 import re
-import tempfile
+import sys
+from PIL import Image, ImageDraw, ImageFont
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CFrameExtractor import CFrameExtractor
 
 
 def ensure_output_dir(path):
@@ -53,20 +61,27 @@ def ultra_clean_subtitle_text(text):
     return text.strip()
 
 
-def create_safe_subtitle_file(text, index):
-    """建立安全的字幕檔案"""
+def load_font(font_path, size=28):
+    """載入字型，失敗時使用預設字型"""
     try:
-        # 使用系統暫存目錄
-        temp_dir = tempfile.gettempdir()
-        temp_file = os.path.join(temp_dir, f"ffmpeg_subtitle_{index}_{os.getpid()}.txt")
-
-        with open(temp_file, "w", encoding="utf-8", newline="\n") as f:
-            f.write(text)
-
-        return temp_file
-    except Exception as e:
-        print(f"   ⚠️ 無法建立暫存檔：{e}")
-        return None
+        return ImageFont.truetype(font_path, size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+def draw_subtitle(image_path, text, font):
+    """在圖片底部置中畫上白字黑框字幕"""
+    img = Image.open(image_path).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    bbox = draw.textbbox((0, 0), text, font=font, stroke_width=2)
+    text_w = bbox[2] - bbox[0]
+    x = (img.width - text_w) / 2
+    y = img.height - 50
+    draw.text(
+        (x, y), text, font=font, fill="white", stroke_width=2, stroke_fill="black"
+    )
+    img.save(image_path, quality=95)
+    return os.path.getsize(image_path)
 
 
 def get_video_info(mp4_path):
@@ -134,155 +149,42 @@ def extract_images_with_robust_subtitles(
         print(f"❌ 讀取字幕檔失敗：{e}")
         return False
 
+    font = load_font(selected_font)
+
+    # 一次解碼擷取所有字幕中點的畫面，再以 PIL 加上字幕
+    midpoints = [
+        (srt_time_to_seconds(sub.start) + srt_time_to_seconds(sub.end)) / 2
+        for sub in subs
+    ]
+    try:
+        results = CFrameExtractor().extract_to_dir(mp4_path, midpoints, output_dir)
+    except Exception as e:
+        print(f"❌ 圖片擷取異常：{e}")
+        return False
+
     success_count = 0
     error_count = 0
-    temp_files = []  # 追蹤暫存檔案
 
-    for idx, sub in enumerate(subs, start=1):
-        temp_file = None
-        try:
-            start = srt_time_to_seconds(sub.start)
-            end = srt_time_to_seconds(sub.end)
-            midpoint = (start + end) / 2
+    for idx, (sub, ok) in enumerate(zip(subs, results), start=1):
+        output_file = os.path.join(output_dir, f"{idx:04d}.jpg")
+        original_text = sub.text.strip()
 
-            output_file = os.path.join(output_dir, f"{idx:04d}.jpg")
+        print(f"📸 處理第 {idx:04d} 張 @ {midpoints[idx - 1]:.2f}s")
+        if not ok:
+            print(f"   ❌ 擷取失敗：{original_text[:30]}...")
+            error_count += 1
+            continue
 
+        try:
             # 超強清理字幕文字
-            original_text = sub.text.strip()
             clean_text = ultra_clean_subtitle_text(original_text)
-
-            print(f"📸 處理第 {idx:04d} 張 @ {midpoint:.2f}s")
-            print(f"   原始：{original_text[:30]}...")
             print(f"   清理：{clean_text}")
-
-            # 建立暫存檔案
-            temp_file = create_safe_subtitle_file(clean_text, idx)
-            if temp_file:
-                temp_files.append(temp_file)
-
-                # 使用 textfile 參數
-                drawtext_filter = (
-                    f"drawtext="
-                    f"fontfile='{selected_font}':"
-                    f"textfile='{temp_file.replace(chr(92), '/')}':"
-                    f"fontcolor=white:"
-                    f"fontsize=28:"
-                    f"borderw=2:"
-                    f"bordercolor=black:"
-                    f"x=(w-text_w)/2:"
-                    f"y=h-50"
-                )
-            else:
-                # 退回到最簡單的固定文字
-                drawtext_filter = (
-                    f"drawtext="
-                    f"fontfile='{selected_font}':"
-                    f"text='字幕 {idx:04d}':"
-                    f"fontcolor=white:"
-                    f"fontsize=28:"
-                    f"borderw=2:"
-                    f"bordercolor=black:"
-                    f"x=(w-text_w)/2:"
-                    f"y=h-50"
-                )
-
-            # 構建 FFmpeg 命令
-            cmd = [
-                "ffmpeg",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-ss",
-                f"{midpoint:.3f}",
-                "-i",
-                mp4_path,
-                "-frames:v",
-                "1",
-                "-vf",
-                drawtext_filter,
-                "-q:v",
-                "2",
-                "-y",
-                output_file,
-            ]
-
-            # 執行命令
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=45)
-
-            if result.returncode == 0:
-                if os.path.exists(output_file):
-                    file_size = os.path.getsize(output_file)
-                    if file_size > 1000:  # 確保不是空檔案
-                        print(f"   ✅ 成功 ({file_size} bytes)")
-                        success_count += 1
-                    else:
-                        print(f"   ❌ 檔案太小 ({file_size} bytes)")
-                        error_count += 1
-                else:
-                    print(f"   ❌ 檔案未生成")
-                    error_count += 1
-            else:
-                print(f"   ❌ FFmpeg 錯誤 (返回碼: {result.returncode})")
-
-                # 嘗試不加字幕的版本
-                print(f"   🔄 嘗試無字幕版本...")
-                fallback_cmd = [
-                    "ffmpeg",
-                    "-hide_banner",
-                    "-loglevel",
-                    "error",
-                    "-ss",
-                    f"{midpoint:.3f}",
-                    "-i",
-                    mp4_path,
-                    "-frames:v",
-                    "1",
-                    "-q:v",
-                    "2",
-                    "-y",
-                    output_file,
-                ]
-
-                fallback_result = subprocess.run(
-                    fallback_cmd, capture_output=True, text=True, timeout=30
-                )
-                if fallback_result.returncode == 0 and os.path.exists(output_file):
-                    file_size = os.path.getsize(output_file)
-                    print(f"   ✅ 無字幕版本成功 ({file_size} bytes)")
-                    success_count += 1
-                else:
-                    print(f"   ❌ 無字幕版本也失敗")
-                    if result.stderr:
-                        error_lines = [
-                            line
-                            for line in result.stderr.split("\n")
-                            if "error" in line.lower()
-                        ]
-                        if error_lines:
-                            print(f"   錯誤: {error_lines[0]}")
-                    error_count += 1
-
-        except subprocess.TimeoutExpired:
-            print(f"   ❌ 處理超時")
-            error_count += 1
+            file_size = draw_subtitle(output_file, clean_text, font)
+            print(f"   ✅ 成功 ({file_size} bytes)")
         except Exception as e:
-            print(f"   ❌ 異常：{e}")
-            error_count += 1
-
-        # 清理單個暫存檔
-        if temp_file and os.path.exists(temp_file):
-            try:
-                os.remove(temp_file)
-            except:
-                pass
-
-    # 清理所有暫存檔案
-    for temp_file in temp_files:
-        try:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-        except:
-            pass
+            # 加字幕失敗時保留無字幕版本
+            print(f"   ⚠️ 加字幕失敗，保留無字幕版本：{e}")
+        success_count += 1
 
     print(f"\n📊 處理完成！")
     print(f"✅ 成功：{success_count} 張")
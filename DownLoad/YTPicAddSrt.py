@@ -1,13 +1,13 @@
 import os
-from PIL import Image, ImageDraw, ImageFont
+import sys
 import pysrt
-import re
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
-def split_chinese_english(text):
-    chinese = "".join(re.findall(r"[\u4e00-\u9fff，。！？；：「」、《》（）]", text))
-    english = "".join(re.findall(r"[^\u4e00-\u9fff，。！？；：「」、《》（）]+", text))
-    return chinese.strip(), english.strip()
+from lib_util.CImageBook import CImageBook
 
 
 def draw_subtitles_on_images(
@@ -34,58 +34,15 @@ def draw_subtitles_on_images(
     # C:\Users\DINO\AppData\Local\Microsoft\Windows\Fonts\BpmfGenSenRounded-R.ttf
     font_path = r"C:\Users\DINO\AppData\Local\Microsoft\Windows\Fonts\BpmfGenSenRounded-R.ttf"  # 微軟正黑體
     font_size = 28
-    font = ImageFont.truetype(font_path, font_size)
 
-    for idx, (img_file, sub) in enumerate(zip(img_files, subs), start=1):
-        img_path = os.path.join(img_dir, img_file)
-        img = Image.open(img_path).convert("RGB")
-        draw = ImageDraw.Draw(img)
+    jobs = [
+        (os.path.join(img_dir, f), os.path.join(output_dir, f), sub.text)
+        for f, sub in zip(img_files, subs)
+    ]
+    book = CImageBook(font_paths=(font_path,), font_size=font_size)
+    success_count = book.add_captions(jobs)
 
-        # 處理字幕內容
-        text = sub.text.strip().replace("\n", " ")
-        zh, en = split_chinese_english(text)
-        lines = [en, zh] if zh and en else [text]
-
-        # 計算文字大小
-        line_sizes = []
-        total_height = 0
-        max_width = 0
-        for line in lines:
-            bbox = draw.textbbox((0, 0), line, font=font)
-            w = bbox[2] - bbox[0]
-            h = bbox[3] - bbox[1]
-            line_sizes.append((line, w, h))
-            total_height += h
-            max_width = max(max_width, w)
-        total_height += (len(lines) - 1) * 10  # 行間距
-
-        # 框框座標與設定
-        padding = 16
-        x = (img.width - max_width) / 2 - padding
-        y = img.height - total_height - 40 - padding
-        box_w = max_width + 2 * padding
-        box_h = total_height + 2 * padding
-
-        # 畫圓角背景框
-        draw.rounded_rectangle(
-            [x, y, x + box_w, y + box_h],
-            radius=20,
-            fill="#002244",
-        )
-
-        # 畫每一行文字（置中）
-        text_y = y + padding
-        for line, w, h in line_sizes:
-            text_x = (img.width - w) / 2
-            draw.text((text_x, text_y), line, font=font, fill="white")
-            text_y += h + 10
-
-        # 儲存圖片
-        output_path = os.path.join(output_dir, img_file)
-        img.save(output_path)
-        print(f"✅ 已儲存：{output_path}")
-
-    print(f"\n🎉 所有圖片字幕處理完成，共 {len(img_files)} 張")
+    print(f"\n🎉 所有圖片字幕處理完成，共 {success_count} 張")
 
 
 if __name__ == "__main__":
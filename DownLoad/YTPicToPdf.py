@@ -1,5 +1,12 @@
 import os
-from PIL import Image
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CImageBook import CImageBook
 
 
 def images_to_pdf(img_dir, output_pdf_path="output.pdf"):
@@ -15,17 +22,10 @@ def images_to_pdf(img_dir, output_pdf_path="output.pdf"):
         print("⚠️ 沒有找到圖片。")
         return
 
-    # 開啟所有圖片並轉為 RGB（PDF 不支援透明）
-    images = []
-    for fname in img_files:
-        path = os.path.join(img_dir, fname)
-        img = Image.open(path).convert("RGB")
-        images.append(img)
-
-    # 儲存為 PDF（第一張是主圖，其他為附加頁）
-    first_img = images[0]
-    rest_imgs = images[1:]
-    first_img.save(output_pdf_path, save_all=True, append_images=rest_imgs)
+    # 逐頁串流寫入 PDF，JPEG 直接嵌入不重新壓縮
+    CImageBook.images_to_pdf(
+        [os.path.join(img_dir, fname) for fname in img_files], output_pdf_path
+    )
     print(f"🎉 PDF 已儲存為：{output_pdf_path}")
 
 
@@ -1,5 +1,7 @@
+import asyncio
 import os
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
@@ -11,9 +13,9 @@ from lib_srt.CAdjSrt import CAdjSrt
 from lib_srt.CSrtTranslator import CSrtTranslator
 from lib_srt.CSrt2DB import CSrt2DB
 from lib_util.Auth import get_current_user
+from lib_util.CArtifactManifest import CArtifactManifest
 from lib_yt.Whisper import FasterWhisperTranscriber
 from lib_yt.YTHandler.YTInfo import fetch_info, save_video_to_db, query_video_byid
-from lib_yt.YTHandler.refine_srt_sentences import refine
 
 # 讀取設定檔
 from app.config import settings
@@ -23,17 +25,29 @@ from lib_yt.YTHandler.YTMp3 import (
     process_srt,
     transcribe_mp3_to_srt,
 )
+from lib_yt.YTHandler.CPlaylistIngester import CPlaylistIngester
+from lib_yt.YTHandler.YTAudio import download_asr_audio_from_info, ensure_mp3_async
 from lib_yt.YTHandler.YouTubeHandler import YouTubeHandler
+from api.routers.Subtitle import exporter
 
 YT_WATCH_URL = settings.YT_WATCH_URL
 SRT_DIR = settings.SRT_DIR
 BASE_DIR = settings.BASE_DIR
 THUMBNAILS_DIR = settings.THUMBNAILS_DIR
+DOWNLOAD_DIR = "C:/temp/0721"
+# /admin/download 的各階段，全部記錄在 manifest 才算完成
+PIPELINE_STAGES = ("audio", "thumbnail", "srt", "srt_translated", "subtitles_db")
 
 
 # 表單輸入格式
 class VideoRequest(BaseModel):
     video_id: str
+    # transcribe: 只下載轉錄用的小音訊串流，MP3 等需要時才產生；mp3: 下載並轉成 MP3
+    audio_mode: str = "transcribe"
+
+
+class PlaylistRequest(BaseModel):
+    playlist_url: str
 
 
 admin_router = APIRouter(prefix="/admin", tags=["admin"])
@@ -43,53 +57,118 @@ admin_router = APIRouter(prefix="/admin", tags=["admin"])
 async def download_video(
     req: VideoRequest, current_user: User = Depends(get_current_user)
 ):
-    output_dir = "C:/temp/0721"
+    output_dir = DOWNLOAD_DIR
     video_id = req.video_id
     url = f"{YT_WATCH_URL}{video_id}"
     print(current_user["id"])
     print(url)
+    output_dir = os.path.join(output_dir, video_id)
+    # 各階段完成後記錄在 manifest，重跑時略過仍有效的階段
+    manifest = CArtifactManifest(output_dir, video_id)
     query_result = await query_video_byid(video_id)
-    if query_result:
+    # 資料庫已有且不是中斷的下載 (沒有 manifest 或已全部完成)
+    if query_result and (
+        not manifest.exists()
+        or await asyncio.to_thread(manifest.complete, PIPELINE_STAGES)
+    ):
         return {"status": "資料已經存在", "video_id": video_id}
-    # 存到資料庫
 
     # print(query_result.category)
     info = await fetch_info(url)
-    video = await save_video_to_db(info, current_user["id"])
-    output_dir = os.path.join(output_dir, video_id)
+    if not query_result:
+        # 存到資料庫
+        video = await save_video_to_db(info, current_user["id"])
+        # 先建立 manifest，中斷後重跑才知道這部影片還沒處理完
+        manifest.record("video_db", title=info.get("title"))
     os.makedirs(output_dir, exist_ok=True)
-    # 下載 mp3
-    await download_mp3_from_info(info, output_dir)
+
+    # 下載音訊
+    if await asyncio.to_thread(manifest.valid, "audio"):
+        audio_file_name = manifest.file_path("audio")
+        print(f"⏭️ 略過音訊下載：{audio_file_name}")
+    else:
+        if req.audio_mode == "mp3":
+            audio_file_name = await download_mp3_from_info(info, output_dir)
+        else:
+            # 原始音訊直接轉錄，不轉成 MP3
+            audio_file_name = await download_asr_audio_from_info(info, output_dir)
+        if not audio_file_name:
+            raise HTTPException(status_code=500, detail="音訊下載失敗")
+        await asyncio.to_thread(
+            manifest.record, "audio", audio_file_name, mode=req.audio_mode
+        )
+
     # 下載封面
-    print("下載封面")
+    if not manifest.valid("thumbnail"):
+        print("下載封面")
+        thumbnail = await download_thumbnail_from_info(info, output_dir)
+        if thumbnail:
+            manifest.record("thumbnail", thumbnail, url=info.get("thumbnail"))
 
-    await download_thumbnail_from_info(info, output_dir)
     # 產生字幕
-    mp3_file_name = f"{output_dir}/{video_id}.mp3"
-    # mp3_source_srt = f"{output_dir}/{video_id}.0.srt"
     srt_file_name = f"{output_dir}/{video_id}.srt"
+    if not manifest.valid("srt"):
+        # 轉錄時已依逐字時間切成句子
+        await transcribe_mp3_to_srt(audio_file_name, srt_file_name)
+        manifest.record("srt", srt_file_name, inputs=("audio",))
 
-    await transcribe_mp3_to_srt(mp3_file_name, srt_file_name)
-    # 調整字幕
-    # refine(mp3_source_srt, srt_file_name)
     # 產生翻譯字幕
     srt_2_file_name = f"{output_dir}/{video_id}.2.srt"
+    if not manifest.valid("srt_translated"):
+        await process_srt(srt_file_name, srt_2_file_name, "zh-TW")
+        manifest.record(
+            "srt_translated", srt_2_file_name, inputs=("srt",), lang="zh-TW"
+        )
 
-    await process_srt(srt_file_name, srt_2_file_name, "zh-TW")
     # 新增到資料庫
-    processor = CSrt2DB()
-    print("將字幕新增到資料庫")
-    # 驗證檔案
-    if not CSrt2DB.validate_srt_file(srt_2_file_name):
-        print(f"❌ 檔案無效或不存在: {srt_2_file_name}")
-    # 將字幕檔新增到資料庫
-    success = processor.process_srt_file(srt_2_file_name, video_id)
+    if not manifest.valid("subtitles_db"):
+        processor = CSrt2DB()
+        print("將字幕新增到資料庫")
+        # 驗證檔案
+        if not CSrt2DB.validate_srt_file(srt_2_file_name):
+            print(f"❌ 檔案無效或不存在: {srt_2_file_name}")
+        # 將字幕檔新增到資料庫；重跑時取代原有字幕，不會重複寫入
+        success = processor.process_srt_file(srt_2_file_name, video_id, replace=True)
+        if success:
+            exporter.invalidate(video_id)
+            manifest.record("subtitles_db", inputs=("srt_translated",))
 
     # 處理檔案
 
     return {"status": "success", "video_id": req.video_id}
 
 
+@admin_router.post("/playlist")
+async def import_playlist(
+    req: PlaylistRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+):
+    """展開播放清單，一次查出已存在的影片，其餘在背景並行匯入"""
+    ingester = CPlaylistIngester(DOWNLOAD_DIR, user_id=current_user["id"])
+    try:
+        new, old = await ingester.plan(req.playlist_url)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"無法取得播放清單: {e}")
+    if new:
+        background_tasks.add_task(ingester.run, new)
+    return {
+        "status": "processing" if new else "資料已經存在",
+        "new": [e["id"] for e in new],
+        "existing": [e["id"] for e in old],
+    }
+
+
+@admin_router.get("/mp3/{video_id}")
+async def get_mp3(video_id: str, current_user: User = Depends(get_current_user)):
+    """取得收聽用 MP3，第一次請求時才由已下載的音訊轉出"""
+    output_dir = os.path.join(DOWNLOAD_DIR, video_id)
+    mp3_path = await ensure_mp3_async(output_dir, video_id)
+    if not mp3_path:
+        raise HTTPException(status_code=404, detail="找不到音訊")
+    return FileResponse(mp3_path, media_type="audio/mpeg", filename=f"{video_id}.mp3")
+
+
 @admin_router.post("/download_0721")
 async def download_video_0721(req: VideoRequest):
     url = f"{YT_WATCH_URL}{req.video_id}"
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, Response
 
 from lib_db.db.database import SessionLocal
 from lib_db.schemas.Subtitle import SubtitleCreate, SubtitleInDB, SubtitleUpdate
@@ -9,6 +11,11 @@ from lib_db.db.database import get_db
 
 # from lib_db.crud.subtitle_crud import subtitle_crud  # ✅ 匯入這個檔案（不是 Subtitle）
 import lib_db.crud.subtitle_crud as subtitle_crud
+from lib_srt.CSubtitleExporter import MEDIA_TYPES, CSubtitleExporter
+from app.config import settings
+
+# 匯出結果快取 (記憶體 + 磁碟)，鍵值含字幕版本，字幕修改後自動失效
+exporter = CSubtitleExporter(str(settings.BASE_DIR / "subtitle_cache"))
 
 
 subtitle_router = APIRouter(
@@ -42,9 +49,44 @@ def get_subtitle_json(video_id: str, db: Session = Depends(get_db)):
     # return result  # FastAPI 會自動回傳 JSON 格式
 
 
+@subtitle_router.get("/{video_id}/export")
+def export_subtitles(
+    video_id: str,
+    request: Request,
+    fmt: Literal["srt", "vtt", "ass", "json"] = Query("srt", alias="format"),
+    lang: Literal["en", "zh", "dual"] = "dual",
+    db: Session = Depends(get_db),
+):
+    """由資料庫字幕產生 SRT / VTT / ASS / JSON (en / zh / dual 中英對照)"""
+    revision = subtitle_crud.get_subtitle_revision(db, video_id)
+    if revision is None:
+        raise HTTPException(status_code=404, detail="No subtitles found for the video.")
+
+    etag = f'"{revision}-{fmt}-{lang}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        data = exporter.export(
+            video_id,
+            revision,
+            fmt,
+            lang,
+            lambda: get_subtitles_by_video(db, video_id),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    headers["Content-Disposition"] = f'inline; filename="{video_id}.{lang}.{fmt}"'
+    return Response(content=data, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
 @subtitle_router.post("/", response_model=SubtitleInDB)
 def create_sub(sub: SubtitleCreate, db: Session = Depends(get_db)):
-    return subtitle_crud.create_subtitle(db, sub)
+    created = subtitle_crud.create_subtitle(db, sub)
+    exporter.invalidate(created.video_id)
+    return created
 
 
 @subtitle_router.get("/video/{video_id}", response_model=list[SubtitleInDB])
@@ -76,6 +118,7 @@ def update_sub(
     updated = subtitle_crud.update_subtitle(db, subtitle_id, subtitle)
     if not updated:
         raise HTTPException(status_code=404, detail="Subtitle not found")
+    exporter.invalidate(updated.video_id)
     return updated
 
 
@@ -91,12 +134,17 @@ def update_sub_by_video_seq(
     updated = subtitle_crud.update_subtitle_by_video_seq(db, video_id, seq, subtitle)
     if not updated:
         raise HTTPException(status_code=404, detail="Subtitle not found")
+    exporter.invalidate(video_id)
+    exporter.invalidate(updated.video_id)
     return updated
 
 
 @subtitle_router.delete("/{subtitle_id}")
 def delete_sub(subtitle_id: int, db: Session = Depends(get_db)):
+    existing = subtitle_crud.get_subtitle(db, subtitle_id)
+    video_id = existing.video_id if existing else None
     success = subtitle_crud.delete_subtitle(db, subtitle_id)
     if not success:
         raise HTTPException(status_code=404, detail="Subtitle not found")
+    exporter.invalidate(video_id)
     return {"status": "deleted"}
@@ -1,37 +1,150 @@
-from fastapi import APIRouter, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.websockets import WebSocketState
 from pathlib import Path
+from typing import AsyncIterator, Optional
+import asyncio
+import json
 import tempfile
 import shutil
 import os
-import whisper
+
+from lib_srt.CCueTrack import CCueTrack
+from lib_yt.Whisper.CTranscriptCache import collect, default_cache
+from lib_yt.Whisper.model_pool import get_model, resolve
+from lib_yt.Whisper.whisper_profile import load_profile
 
 transcribe_router = APIRouter()
-model_name = "medium"
-print(f"[Whisper] 載入模型：{model_name} ...")
-model = whisper.load_model(model_name)
-print("[Whisper] ✓ 模型載入完成")
+# /transcribe 回傳的 segment 欄位 (與原本 whisper 的 result["segments"] 相同)
+SEGMENT_FIELDS = (
+    "id", "seek", "start", "end", "text", "tokens", "temperature",
+    "avg_logprob", "compression_ratio", "no_speech_prob",
+)  # fmt: skip
+# 本機沒有實測的建議設定 (Bench/bench_whisper_tune.py) 時使用的模型
+DEFAULT_MODEL = "medium"
 
 # 永久儲存 SRT 的資料夾
 OUTPUT_DIR = Path("c:/temp/output_srt")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def format_timestamp(seconds: float) -> str:
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds - int(seconds)) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+def save_upload(file: UploadFile, tmpdir: str) -> str:
+    temp_audio_path = os.path.join(tmpdir, Path(file.filename or "audio").name)
+    with open(temp_audio_path, "wb") as f:
+        shutil.copyfileobj(file.file, f)
+    return temp_audio_path
 
 
 def write_srt(segments, file_path):
-    with open(file_path, "w", encoding="utf-8") as f:
-        for i, segment in enumerate(segments, 1):
-            start = format_timestamp(segment["start"])
-            end = format_timestamp(segment["end"])
-            text = segment["text"].strip()
-            f.write(f"{i}\n{start} --> {end}\n{text}\n\n")
+    # 依 segment 的秒數組成字幕軌一次寫出
+    CCueTrack(
+        [round(s["start"] * 1000) for s in segments],
+        [round(s["end"] * 1000) for s in segments],
+        [s["text"].strip() for s in segments],
+    ).save(str(file_path), fmt="srt")
+
+
+def _segment_detail(segment) -> dict:
+    """faster-whisper Segment 的解碼資訊 (tokens / avg_logprob ...)"""
+    return {
+        "seek": segment.seek,
+        "tokens": list(segment.tokens),
+        "temperature": segment.temperature,
+        "avg_logprob": segment.avg_logprob,
+        "compression_ratio": segment.compression_ratio,
+        "no_speech_prob": segment.no_speech_prob,
+    }
+
+
+async def stream_segments(
+    audio_path: str, language: Optional[str], detail: bool = False
+) -> AsyncIterator[dict]:
+    """
+    逐段產生轉錄結果
+
+    faster-whisper 的 segments 是惰性產生的，每解出一段就送出，
+    模型推論放在執行緒中，不阻塞事件迴圈；
+    同一音檔轉錄過時直接送出快取的結果
+
+    Args:
+        detail: segment 另外附上 seek / tokens / temperature / avg_logprob /
+                compression_ratio / no_speech_prob
+                (快取只保存時間與文字，命中快取時沒有這些欄位)
+
+    Yields:
+        {"type": "language", "language"} 之後是多個
+        {"type": "segment", "id", "start", "end", "text"}
+    """
+    device, compute_type = resolve()
+    profile = load_profile(device, model_size=DEFAULT_MODEL)
+    model_name = profile["model_size"]
+    options = {"beam_size": profile["beam_size"], "vad_filter": True}
+    cache = default_cache()
+    key = await asyncio.to_thread(
+        cache.key, audio_path, model_name, compute_type, language, **options
+    )
+    transcript = await asyncio.to_thread(cache.get, key)
+    if transcript is not None:
+        yield {"type": "language", "language": transcript["language"]}
+        for index, (start, end, text) in enumerate(transcript["segments"], 1):
+            yield {
+                "type": "segment",
+                "id": index,
+                "start": start,
+                "end": end,
+                "text": text,
+            }
+        return
+
+    model = await asyncio.to_thread(get_model, model_name, device, compute_type)
+    # transcribe 在回傳前會先做語言偵測
+    segments, info = await asyncio.to_thread(
+        model.transcribe, audio_path, language=language, **options
+    )
+    yield {"type": "language", "language": info.language}
+
+    it = iter(segments)
+    decoded = []
+    while True:
+        segment = await asyncio.to_thread(next, it, None)
+        if segment is None:
+            break
+        decoded.append(segment)
+        event = {
+            "type": "segment",
+            "id": len(decoded),
+            "start": segment.start,
+            "end": segment.end,
+            "text": segment.text.strip(),
+        }
+        if detail:
+            event.update(_segment_detail(segment))
+        yield event
+    # 全部解完才寫入快取，中途斷線不會留下不完整的結果
+    await asyncio.to_thread(cache.put, key, collect(decoded, info))
+
+
+async def transcribe_events(
+    audio_path: str, filename: str, language: Optional[str], detail: bool = False
+) -> AsyncIterator[dict]:
+    """stream_segments 之後附上結束事件，並把完整 SRT 存檔"""
+    segments = []
+    detected = language
+    async for event in stream_segments(audio_path, language, detail):
+        if event["type"] == "language":
+            detected = event["language"]
+        else:
+            segments.append(event)
+        yield event
+
+    srt_path = OUTPUT_DIR / f"{Path(filename).stem}.srt"
+    await asyncio.to_thread(write_srt, segments, srt_path)
+    yield {
+        "type": "done",
+        "language_detected": detected,
+        "segments": len(segments),
+        "srt_file": str(srt_path),
+    }
 
 
 @transcribe_router.post("/transcribe", tags=["Whisper"])
@@ -39,26 +152,113 @@ async def transcribe_audio(file: UploadFile = File(...), language: str = Form("e
     try:
         # 建立臨時音訊檔案
         with tempfile.TemporaryDirectory() as tmpdir:
-            temp_audio_path = os.path.join(tmpdir, file.filename)
-            with open(temp_audio_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
-
-            # 語音辨識
-            result = model.transcribe(temp_audio_path, language=language)
-
-        # 組合永久 SRT 檔案路徑
-        srt_filename = f"{Path(file.filename).stem}.srt"
-        srt_path = OUTPUT_DIR / srt_filename
-
-        # 寫入字幕檔
-        write_srt(result["segments"], srt_path)
+            temp_audio_path = await asyncio.to_thread(save_upload, file, tmpdir)
+            segments = []
+            async for event in transcribe_events(
+                temp_audio_path, file.filename, language or None, detail=True
+            ):
+                if event["type"] == "segment":
+                    # 還原成原本 whisper segments 的格式 (id 從 0 開始，沒有 type)；
+                    # 命中轉錄快取時 tokens / avg_logprob 等欄位為 None
+                    segment = {key: event.get(key) for key in SEGMENT_FIELDS}
+                    segment["id"] = event["id"] - 1
+                    segments.append(segment)
+                elif event["type"] == "done":
+                    done = event
 
         return {
             "message": "轉錄成功",
-            "language_detected": result.get("language", language),
-            "segments": result["segments"],
-            "srt_file": str(srt_path),  # 絕對或相對路徑皆可
+            "language_detected": done["language_detected"],
+            "segments": segments,
+            "srt_file": done["srt_file"],  # 絕對或相對路徑皆可
         }
 
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
+
+
+@transcribe_router.post("/transcribe/stream", tags=["Whisper"])
+async def transcribe_audio_stream(
+    file: UploadFile = File(...), language: str = Form("")
+):
+    """
+    上傳音檔，以 Server-Sent Events 逐段回傳
+
+    事件: language / segment / done / error，data 為 JSON
+    """
+    tmpdir = tempfile.mkdtemp()
+    try:
+        temp_audio_path = await asyncio.to_thread(save_upload, file, tmpdir)
+    except Exception as e:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+    async def sse():
+        try:
+            async for event in transcribe_events(
+                temp_audio_path, file.filename, language or None
+            ):
+                data = json.dumps(event, ensure_ascii=False)
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+        except Exception as e:
+            print(f"❌ 串流轉錄錯誤: {e}")
+            data = json.dumps({"type": "error", "error": str(e)}, ensure_ascii=False)
+            yield f"event: error\ndata: {data}\n\n"
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@transcribe_router.websocket("/transcribe/ws")
+async def transcribe_ws(websocket: WebSocket):
+    """
+    WebSocket 串流轉錄
+
+    協定:
+        1. 用戶端送出 JSON {"filename": "talk.mp3", "language": "en"} (language 可省略)
+        2. 以二進位訊息分段送出音檔內容
+        3. 送出 JSON {"type": "end"}
+        伺服器逐段回傳 language / segment 訊息，最後送出 done (含 SRT 路徑)
+    """
+    await websocket.accept()
+    tmpdir = tempfile.mkdtemp()
+    try:
+        config = await websocket.receive_json()
+        filename = Path(config.get("filename") or "audio").name
+        language = config.get("language") or None
+        temp_audio_path = os.path.join(tmpdir, filename)
+
+        received = 0
+        with open(temp_audio_path, "wb") as f:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("bytes") is not None:
+                    f.write(message["bytes"])
+                    received += len(message["bytes"])
+                elif json.loads(message.get("text") or "{}").get("type") == "end":
+                    break
+        await websocket.send_json({"type": "received", "bytes": received})
+
+        async for event in transcribe_events(temp_audio_path, filename, language):
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        print("⚠️ 用戶端中斷串流轉錄")
+    except Exception as e:
+        print(f"❌ 串流轉錄錯誤: {e}")
+        # 連線可能已經關閉 (例如送出途中用戶端斷線)，只在仍連線時回報錯誤
+        if websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await websocket.send_json({"type": "error", "error": str(e)})
+                await websocket.close(code=1011)
+            except Exception:
+                pass
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Query
 from fastapi.responses import RedirectResponse, Response
 from sqlalchemy.orm import Session
-from google.oauth2 import id_token as google_id_token
-from google.auth.transport import requests as google_requests
+import asyncio
 import os
 from datetime import datetime, timedelta, timezone
+import httpx
 import jwt
-import requests
 
 # from lib_auth.jwt_utils import create_jwt
 
@@ -17,6 +16,7 @@ from lib_db.db.database import get_db
 from pydantic import BaseModel
 from urllib.parse import urlencode
 from app.config import settings
+from lib_util.CHttpClient import get_client, google_certs
 
 # 環境變數配置
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", settings.GOOGLE_CLIENT_ID)
@@ -77,8 +77,63 @@ def get_google_auth_url():
     return {"auth_url": auth_url}
 
 
+def upsert_google_user(db: Session, idinfo: dict) -> dict:
+    """
+    依 id_token 內容查詢或建立使用者，並更新登入資訊
+
+    Returns:
+        JWT 的內容
+    """
+    email = idinfo.get("email")
+    default_role_id = 6  # 預設角色 ID，根據實際情況調整
+    if email == ADMIN_EMAIL:
+        default_role_id = 1
+
+    name = idinfo.get("name", "")
+    avatar_url = idinfo.get("picture", "")
+    google_id = idinfo.get("sub")
+
+    # 查詢或建立使用者
+    # print("查詢或建立使用者")
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        user = User(
+            email=email,
+            name=name,
+            google_id=google_id,
+            avatar_url=avatar_url,
+            is_active=True,
+            role_id=default_role_id,  # 預設角色 ID，根據實際情況調整
+            created_at=datetime.now(),
+            last_login_at=datetime.now(),
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    else:
+        user.name = name
+        user.avatar_url = avatar_url
+        user.google_id = google_id
+        user.last_login_at = datetime.now()
+        db.commit()
+
+    # print(f"user:id = {user.id} , {user.email,user.name} , role_id: {user.role_id}")
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "avatar_url": avatar_url,
+        "sub": str(user.id),
+        "role_id": user.role_id,
+    }
+
+
 @auth_google.get("/google/callback")
-def google_callback(request: Request, db: Session = Depends(get_db)):
+async def google_callback(
+    request: Request,
+    db: Session = Depends(get_db),
+    client: httpx.AsyncClient = Depends(get_client),
+):
     """處理 Google OAuth 回調"""
     print("處理 Google OAuth 回調")
     code = request.query_params.get("code")
@@ -96,7 +151,8 @@ def google_callback(request: Request, db: Session = Depends(get_db)):
     try:
         # 交換授權碼為 access token 與 id_token
         print("交換授權碼為 access token 與 id_token")
-        token_resp = requests.post(
+        # 使用共用連線池 (lifespan 建立)，不阻塞事件迴圈
+        token_resp = await client.post(
             GOOGLE_TOKEN_URL,
             data={
                 "code": code,
@@ -116,10 +172,8 @@ def google_callback(request: Request, db: Session = Depends(get_db)):
         if not id_token_str:
             raise HTTPException(status_code=400, detail="No id_token in token response")
 
-        # 驗證 id_token
-        idinfo = google_id_token.verify_oauth2_token(
-            id_token_str, google_requests.Request(), GOOGLE_CLIENT_ID
-        )
+        # 驗證 id_token (Google 公鑰依 Cache-Control 快取，不必每次登入都下載)
+        idinfo = await google_certs().verify_id_token(id_token_str, GOOGLE_CLIENT_ID)
 
         # 讀取使用者資訊
         email = idinfo.get("email")
@@ -133,50 +187,11 @@ def google_callback(request: Request, db: Session = Depends(get_db)):
         if not email_verified:
             raise HTTPException(status_code=400, detail="Email not verified")
 
-        default_role_id = 6  # 預設角色 ID，根據實際情況調整
-        if email == ADMIN_EMAIL:
-            default_role_id = 1
-
-        name = idinfo.get("name", "")
-        avatar_url = idinfo.get("picture", "")
-        google_id = idinfo.get("sub")
-
-        # 查詢或建立使用者
-        # print("查詢或建立使用者")
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            user = User(
-                email=email,
-                name=name,
-                google_id=google_id,
-                avatar_url=avatar_url,
-                is_active=True,
-                role_id=default_role_id,  # 預設角色 ID，根據實際情況調整
-                created_at=datetime.now(),
-                last_login_at=datetime.now(),
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-        else:
-            user.name = name
-            user.avatar_url = avatar_url
-            user.google_id = google_id
-            user.last_login_at = datetime.now()
-            db.commit()
+        # 資料庫操作放到執行緒，不阻塞事件迴圈
+        token_data = await asyncio.to_thread(upsert_google_user, db, idinfo)
 
         # 產生 JWT
         # print("產生 JWT")
-        # print(f"user:id = {user.id} , {user.email,user.name} , role_id: {user.role_id}")
-        token_data = {
-            "user_id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "avatar_url": avatar_url,
-            "sub": str(user.id),
-            "role_id": user.role_id,
-        }
-
         jwt_token = create_access_token(data=token_data)
         # print("導回前端，帶上 JWT Token")
         # 導回前端，帶上 JWT Token
@@ -184,7 +199,7 @@ def google_callback(request: Request, db: Session = Depends(get_db)):
         # print("導回前端，帶上 JWT Token")
         # return RedirectResponse(f"http:/127.0.0.1:3000")
 
-    except requests.HTTPError as e:
+    except httpx.HTTPError as e:
         print("erorr 01")
         raise HTTPException(
             status_code=400, detail=f"Failed to exchange code for token: {str(e)}"
@@ -24,8 +24,8 @@ from api.routers.markdown import markdown_router
 from api.routers.Note import note_router
 from api.routers.mp4 import mp4_router
 
-# 這個會很耗資源 先 mark 起來
-# from api.routers.Transcribe import transcribe_router
+# 模型改為第一次轉錄時才載入
+from api.routers.Transcribe import transcribe_router
 
 #
 from app.start_message import lifespan  # ✅ 引入 lifespan 顯示 啟動訊息
@@ -72,8 +72,7 @@ app.include_router(create_router)
 # note
 app.include_router(note_router)
 app.include_router(mp4_router)
-# 這個會很耗資源 先 mark 起來
-# app.include_router(transcribe_router)
+app.include_router(transcribe_router)
 
 # 設定日誌
 logging.basicConfig(level=logging.INFO)
@@ -1,10 +1,13 @@
 # api/start_message.py
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 
 from app.config import settings
+from lib_util.CHttpClient import close_client, start_client
+from lib_yt.Whisper.CChunkedTranscriber import shutdown_shared
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +22,11 @@ async def lifespan(app: FastAPI):
     logger.info("📍 服務器地址: http://127.0.0.1:8000")
     logger.info("📖 API 文檔: http://127.0.0.1:8000/docs")
     logger.info(settings.JWT_SECRET_KEY)
+    # 共用 HTTP 連線池，端點以 Depends(get_client) 取得
+    app.state.http_client = await start_client()
     yield
     # 關閉時
+    await close_client()
+    # CPU 分塊轉錄的行程池 (有轉錄過才會啟動)，等進行中的轉錄結束後關閉
+    await asyncio.to_thread(shutdown_shared)
     logger.info("👋 FastAPI 服務器關閉")
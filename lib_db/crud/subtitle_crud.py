@@ -7,6 +7,8 @@ project_root = os.path.dirname(os.path.dirname(current_dir))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from lib_db.models.Subtitle import Subtitle
@@ -48,6 +50,25 @@ def get_subtitles_by_video(db: Session, video_id: str) -> list[SubtitleRead]:
     )
 
 
+def get_subtitle_revision(db: Session, video_id: str) -> str | None:
+    """
+    取得影片字幕的版本 (所有字幕內容的 md5，在資料庫端計算)
+
+    任何一條字幕被新增、修改或刪除，版本就會改變；沒有字幕時回傳 None
+    """
+    row = func.concat_ws(
+        "\x1f",
+        Subtitle.seq,
+        func.coalesce(Subtitle.start_time, ""),
+        func.coalesce(Subtitle.end_time, ""),
+        func.coalesce(Subtitle.en_text, ""),
+        func.coalesce(Subtitle.zh_text, ""),
+    )
+    ordered = aggregate_order_by(literal("\x1e"), Subtitle.seq)
+    digest = func.md5(func.string_agg(row, ordered))
+    return db.query(digest).filter(Subtitle.video_id == video_id).scalar()
+
+
 def update_subtitle(
     db: Session, subtitle_id: int, subtitle_update: SubtitleUpdate
 ) -> Subtitle | None:
@@ -244,6 +265,35 @@ def bulk_create_subtitles(
         raise e
 
 
+def replace_subtitles_by_video(
+    db: Session, video_id: str, subtitles: list[SubtitleCreate]
+) -> list[Subtitle]:
+    """
+    Replace all subtitles of a video in one transaction.
+
+    Re-importing the same file (e.g. a resumed download pipeline) must not
+    duplicate rows, so the old rows are deleted and the new ones inserted
+    with a single commit.
+    """
+    try:
+        db.query(Subtitle).filter(Subtitle.video_id == video_id).delete(
+            synchronize_session=False
+        )
+        db_subtitles = []
+        for subtitle in subtitles:
+            try:
+                subtitle_data = subtitle.model_dump()
+            except AttributeError:
+                subtitle_data = subtitle.dict()
+            db_subtitles.append(Subtitle(**subtitle_data))
+        db.add_all(db_subtitles)
+        db.commit()
+        return db_subtitles
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise e
+
+
 def delete_subtitles_by_video(db: Session, video_id: str) -> int:
     """Delete all subtitles for a specific video. Returns count of deleted records."""
     try:
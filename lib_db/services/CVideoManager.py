@@ -51,6 +51,18 @@ class VideoManager:
         """檢查影片是否存在"""
         return self.get_video(video_id) is not None
 
+    def existing_ids(self, video_ids: list) -> set:
+        """一次查詢多個影片 ID，回傳已存在的 ID"""
+        if not video_ids:
+            return set()
+        db_gen = get_db()
+        db: Session = next(db_gen)
+        try:
+            rows = db.query(Video.id).filter(Video.id.in_(list(video_ids))).all()
+            return {row[0] for row in rows}
+        finally:
+            db.close()
+
     def delete_video(self, video_id: str):
         """刪除影片"""
         db_gen = get_db()
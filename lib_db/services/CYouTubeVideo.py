@@ -4,6 +4,7 @@ import requests
 import os
 import subprocess
 from lib_db.services.CVideoManager import VideoManager
+from lib_yt.YTHandler.CInfoCache import default_info_cache
 
 
 class YouTubeVideo:
@@ -23,14 +24,9 @@ class YouTubeVideo:
         self.audio_path = audio_path
 
     # 使用 yt_dlp 的 extract_info 來取得影片完整的 metadata。 不下載影片，只取得 JSON 格式的資料。
-    def fetch_info(self):
-        ydl_opts = {
-            "quiet": True,
-            "skip_download": True,
-        }
-        with YoutubeDL(ydl_opts) as ydl:
-            self.info = ydl.extract_info(self.url, download=False)
-
+    # 同一部影片在快取有效期間內不重複連線
+    def fetch_info(self, refresh: bool = False):
+        self.info = default_info_cache().fetch(self.url, refresh)
         return self.info
 
     # 顯示基本影片資訊，如標題、ID、上傳者、觀看次數、縮圖網址等 有處理影片長度的格式化（轉成 hh:mm:ss）。
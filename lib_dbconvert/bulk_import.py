@@ -0,0 +1,362 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2 import sql
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+# 批次匯入工具：TXT / JSON / CSV 經由 PostgreSQL COPY 寫入暫存表，
+# 再以「更新已存在 + 新增不存在」一次合併到正式表 (不需要 UNIQUE 限制)
+#
+# 用法:
+#   python lib_dbconvert/bulk_import.py codes   mp3List.txt --category-id 13
+#   python lib_dbconvert/bulk_import.py voices  voices.txt  --category voice
+#   python lib_dbconvert/bulk_import.py subtitles a.json b.json
+#   python lib_dbconvert/bulk_import.py csv data.csv --table codes --key category_id,code_value
+# 共用參數: --batch-size 5000  --dry-run (執行後 rollback，只回報筆數)  --dsn postgresql://...
+
+Row = Tuple[Any, ...]
+
+# 內建來源對應的 (資料表, 欄位, 鍵值欄位)
+CODES_TARGET = (
+    "codes",
+    ["category_id", "code_value", "code_name", "description", "sort_order"],
+    ["category_id", "code_value"],
+)
+VOICES_TARGET = (
+    "code",
+    ["category", "code", "name", "description", "sort_order", "is_active"],
+    ["category", "code"],
+)
+SUBTITLES_TARGET = (
+    "subtitles",
+    ["video_id", "seq", "start_time", "end_time", "en_text", "zh_text"],
+    ["video_id", "seq"],
+)
+
+
+# ===== 來源格式 =====
+def read_code_list(path: str, category_id: int) -> Iterator[Row]:
+    """
+    代碼清單 (例如樣本語音檔名 01_xxx.mp3)，寫入 codes
+
+    Yields:
+        (category_id, code_value, code_name, description, sort_order)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for i, line in enumerate(f, start=1):
+            filename = line.strip()
+            if not filename:
+                continue
+            if "_" in filename:
+                code_value, rest = filename.split("_", 1)
+                code_name = rest.rsplit(".", 1)[0]
+            else:
+                code_value = f"{i:02d}"
+                code_name = filename.rsplit(".", 1)[0]
+            yield category_id, code_value, code_name, filename, i
+
+
+def read_voice_txt(path: str, category: str) -> Iterator[Row]:
+    """
+    Edge TTS 語音清單 (固定寬度欄位)，寫入 code
+
+    Yields:
+        (category, code, name, description, sort_order, is_active)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            voice_id = line[0:35].strip()
+            if not voice_id:
+                continue
+            gender = line[35:45].strip()
+            style = line[45:75].strip()
+            tone = line[75:].strip()
+            yield category, voice_id, gender, f"{style} - {tone}", 0, True
+
+
+def read_subtitle_json(path: str) -> Iterator[Row]:
+    """
+    combine_srt_to_json 產生的字幕 JSON，寫入 subtitles
+
+    Yields:
+        (video_id, seq, start_time, end_time, en_text, zh_text)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    video_id = data.get("video_id")
+    if not video_id:
+        raise ValueError(f"JSON 中缺少 video_id：{path}")
+    for s in data.get("subtitles", []):
+        yield (
+            video_id,
+            s.get("seq"),
+            s.get("start_time"),
+            s.get("end_time"),
+            # 舊版 JSON 的英文欄位名稱是 ex_text
+            s.get("en_text", s.get("ex_text")),
+            s.get("zh_text"),
+        )
+
+
+def read_csv(path: str) -> Tuple[List[str], Iterator[Row]]:
+    """CSV 第一列為欄位名稱，回傳 (欄位, 資料列)"""
+    f = open(path, "r", encoding="utf-8-sig", newline="")
+    reader = csv.reader(f)
+    columns = next(reader)
+
+    def rows() -> Iterator[Row]:
+        with f:
+            for row in reader:
+                # 空字串視為 NULL
+                yield tuple(v if v != "" else None for v in row)
+
+    return columns, rows()
+
+
+# ===== 匯入 =====
+def _csv_field(value: Any) -> str:
+    # NULL 不加引號，字串一律加引號 (區分 NULL 與空字串)
+    if value is None:
+        return ""
+    if isinstance(value, (int, float, bool)):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def batched(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CBulkImporter:
+    def __init__(self, dsn: str, batch_size: int = 5000, dry_run: bool = False):
+        """
+        Args:
+            dsn: PostgreSQL 連線字串
+            batch_size: 每次 COPY 的筆數
+            dry_run: 執行完整流程後 rollback，只回報會新增 / 更新的筆數
+        """
+        self.dsn = dsn
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+    def _copy_to_stage(
+        self, cursor, columns: Sequence[str], rows: Iterable[Row]
+    ) -> int:
+        """分批 COPY 到暫存表，回傳筆數"""
+        copy = sql.SQL(
+            "COPY _bulk_stage ({}, _line) FROM STDIN WITH (FORMAT csv)"
+        ).format(sql.SQL(", ").join(map(sql.Identifier, columns)))
+        copy = copy.as_string(cursor)
+
+        count = 0
+        for batch in batched(rows, self.batch_size):
+            buffer = io.StringIO()
+            for row in batch:
+                if len(row) != len(columns):
+                    raise ValueError(
+                        f"第 {count + 1} 筆有 {len(row)} 個值，應為 {len(columns)} 個"
+                    )
+                count += 1
+                buffer.write(",".join(map(_csv_field, row)))
+                buffer.write(f",{count}\n")
+            buffer.seek(0)
+            cursor.copy_expert(copy, buffer)
+        return count
+
+    def _merge(
+        self, cursor, table: str, columns: Sequence[str], keys: Sequence[str]
+    ) -> Tuple[int, int]:
+        """暫存表合併到正式表，回傳 (更新筆數, 新增筆數)"""
+        target = sql.Identifier(*table.split("."))
+        cols = sql.SQL(", ").join(map(sql.Identifier, columns))
+        key_cols = sql.SQL(", ").join(map(sql.Identifier, keys))
+        match = sql.SQL(" AND ").join(
+            sql.SQL("t.{0} = s.{0}").format(sql.Identifier(k)) for k in keys
+        )
+
+        # 同一個鍵出現多次時以最後一筆為準
+        cursor.execute(
+            sql.SQL(
+                "CREATE TEMP TABLE _bulk_latest ON COMMIT DROP AS "
+                "SELECT DISTINCT ON ({keys}) {cols} FROM _bulk_stage "
+                "ORDER BY {keys}, _line DESC"
+            ).format(keys=key_cols, cols=cols)
+        )
+
+        updated = 0
+        values = [c for c in columns if c not in keys]
+        if values:
+            assign = sql.SQL(", ").join(
+                sql.SQL("{0} = s.{0}").format(sql.Identifier(c)) for c in values
+            )
+            cursor.execute(
+                sql.SQL(
+                    "UPDATE {target} AS t SET {assign} "
+                    "FROM _bulk_latest AS s WHERE {match}"
+                ).format(target=target, assign=assign, match=match)
+            )
+            updated = cursor.rowcount
+
+        cursor.execute(
+            sql.SQL(
+                "INSERT INTO {target} ({cols}) SELECT {cols} FROM _bulk_latest AS s "
+                "WHERE NOT EXISTS (SELECT 1 FROM {target} AS t WHERE {match})"
+            ).format(target=target, cols=cols, match=match)
+        )
+        return updated, cursor.rowcount
+
+    def run(
+        self,
+        table: str,
+        columns: Sequence[str],
+        keys: Sequence[str],
+        rows: Iterable[Row],
+    ) -> Dict[str, Any]:
+        """
+        匯入資料
+
+        Args:
+            table: 目標資料表
+            columns: 每筆資料對應的欄位
+            keys: 判斷是否為同一筆的欄位 (已存在則更新，否則新增)
+            rows: 資料列 (可為 generator，分批讀取)
+
+        Returns:
+            統計資料 {rows, updated, inserted, copy_seconds, merge_seconds}
+        """
+        missing = [k for k in keys if k not in columns]
+        if missing:
+            raise ValueError(f"鍵值欄位不在匯入欄位中: {missing}")
+
+        conn = psycopg2.connect(self.dsn)
+        try:
+            with conn.cursor() as cursor:
+                target = sql.Identifier(*table.split("."))
+                cols = sql.SQL(", ").join(map(sql.Identifier, columns))
+                cursor.execute(
+                    sql.SQL(
+                        "CREATE TEMP TABLE _bulk_stage ON COMMIT DROP AS "
+                        "SELECT {cols} FROM {target} WITH NO DATA"
+                    ).format(cols=cols, target=target)
+                )
+                cursor.execute("ALTER TABLE _bulk_stage ADD COLUMN _line bigint")
+
+                t0 = time.perf_counter()
+                count = self._copy_to_stage(cursor, columns, rows)
+                t1 = time.perf_counter()
+                updated, inserted = self._merge(cursor, table, columns, keys)
+                t2 = time.perf_counter()
+
+            if self.dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        return {
+            "rows": count,
+            "updated": updated,
+            "inserted": inserted,
+            "copy_seconds": t1 - t0,
+            "merge_seconds": t2 - t1,
+        }
+
+
+def report(table: str, stats: Dict[str, Any], dry_run: bool):
+    total = stats["copy_seconds"] + stats["merge_seconds"]
+    rate = stats["rows"] / total if total > 0 else 0
+    prefix = "🧪 [dry-run] " if dry_run else "✅ "
+    print(
+        f"{prefix}{table}: {stats['rows']} 筆 | "
+        f"COPY {stats['copy_seconds']:.2f}s | 合併 {stats['merge_seconds']:.2f}s | "
+        f"{rate:,.0f} 筆/秒 | 新增 {stats['inserted']}、更新 {stats['updated']}"
+    )
+
+
+def _chain(paths: Sequence[str], reader, *args) -> Iterator[Row]:
+    for path in paths:
+        yield from reader(path, *args)
+
+
+def default_dsn() -> Optional[str]:
+    dsn = os.getenv("DB_CONNECT_STRING")
+    if dsn:
+        return dsn
+    try:
+        from app.config import settings
+
+        return settings.DB_CONNECT_STRING
+    except Exception:
+        return None
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="以 COPY 批次匯入代碼、語音與字幕")
+    parser.add_argument(
+        "kind", choices=["codes", "voices", "subtitles", "csv"], help="來源類型"
+    )
+    parser.add_argument("files", nargs="+", help="來源檔案")
+    parser.add_argument("--dsn", default=None, help="PostgreSQL 連線字串")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="執行後 rollback")
+    parser.add_argument("--category-id", type=int, default=13, help="codes 的分類")
+    parser.add_argument("--category", default="voice", help="voices 的分類")
+    parser.add_argument("--table", help="csv 的目標資料表")
+    parser.add_argument("--key", help="csv 的鍵值欄位，以逗號分隔")
+    args = parser.parse_args(argv)
+
+    dsn = args.dsn or default_dsn()
+    if not dsn:
+        print("❌ 請以 --dsn 或 DB_CONNECT_STRING 指定資料庫")
+        sys.exit(1)
+    importer = CBulkImporter(dsn, batch_size=args.batch_size, dry_run=args.dry_run)
+
+    if args.kind == "codes":
+        rows = _chain(args.files, read_code_list, args.category_id)
+        jobs = [(*CODES_TARGET, rows)]
+    elif args.kind == "voices":
+        rows = _chain(args.files, read_voice_txt, args.category)
+        jobs = [(*VOICES_TARGET, rows)]
+    elif args.kind == "subtitles":
+        jobs = [(*SUBTITLES_TARGET, _chain(args.files, read_subtitle_json))]
+    else:
+        if not args.table or not args.key:
+            print("❌ csv 需要 --table 與 --key")
+            sys.exit(1)
+        jobs = []
+        for path in args.files:
+            columns, rows = read_csv(path)
+            jobs.append((args.table, columns, args.key.split(","), rows))
+
+    for table, columns, keys, rows in jobs:
+        try:
+            stats = importer.run(table, columns, keys, rows)
+        except Exception as e:
+            print(f"❌ {table} 匯入失敗: {e}")
+            sys.exit(1)
+        report(table, stats, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
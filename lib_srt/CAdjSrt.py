@@ -1,70 +1,67 @@
-import re
-from datetime import datetime
-from typing import List, Dict
+import asyncio
+import os
+import sys
+from typing import Optional
 import aiofiles
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCueTrack import CCueTrack
+
 
 # 調整字幕檔使用,有的字幕時間軸的資料會不一致需要調整
+# 時間存放在 CCueTrack 的 numpy 陣列，調整一次作用在整份字幕
 class CAdjSrt:
-    TIME_FORMAT = "%H:%M:%S,%f"
-
-    def __init__(self, input_path: str, output_path: str):
+    def __init__(
+        self,
+        input_path: str,
+        output_path: str,
+        max_gap_ms: Optional[int] = None,
+        min_duration_ms: Optional[int] = None,
+        max_duration_ms: Optional[int] = None,
+        offset_ms: int = 0,
+    ):
+        """
+        Args:
+            input_path: 來源字幕
+            output_path: 輸出字幕
+            max_gap_ms: 結束時間延到下一句開始的最大空檔，None 表示每句都接到下一句
+            min_duration_ms: 單句最短顯示時間 (不超過下一句開始)
+            max_duration_ms: 單句最長顯示時間
+            offset_ms: 整體平移，正數延後、負數提前
+        """
         self.input_path = input_path
         self.output_path = output_path
-        self.blocks: List[Dict] = []
-
-    @classmethod
-    def parse_time(cls, t: str) -> datetime:
-        return datetime.strptime(t, cls.TIME_FORMAT)
-
-    @classmethod
-    def format_time(cls, t: datetime) -> str:
-        return t.strftime(cls.TIME_FORMAT)[:-3]  # 保留到毫秒
+        self.max_gap_ms = max_gap_ms
+        self.min_duration_ms = min_duration_ms
+        self.max_duration_ms = max_duration_ms
+        self.offset_ms = offset_ms
+        self.track = CCueTrack()
 
     async def read_srt(self):
-        async with aiofiles.open(self.input_path, "r", encoding="utf-8") as f:
-            content = await f.read()
-
-        blocks_raw = re.split(r"\n\s*\n", content.strip())
-        self.blocks = []
-
-        for block in blocks_raw:
-            lines = block.strip().splitlines()
-            if len(lines) < 3:
-                continue
-            idx = lines[0].strip()
-            times = lines[1].strip()
-            en = lines[2].strip()
-            zh = lines[3].strip() if len(lines) > 3 else ""
-
-            m = re.match(
-                r"(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})", times
-            )
-            if not m:
-                continue
-
-            start = self.parse_time(m.group(1))
-            end = self.parse_time(m.group(2))
-
-            self.blocks.append(
-                {"idx": idx, "start": start, "end": end, "en": en, "zh": zh}
-            )
+        # 自動判斷編碼 (UTF-8 / Big5 / GBK)，讀檔放到執行緒避免阻塞事件迴圈
+        self.track = await asyncio.to_thread(
+            CCueTrack.from_file, self.input_path, "srt"
+        )
 
     def adjust_end_times(self):
-        for i in range(len(self.blocks) - 1):
-            self.blocks[i]["end"] = self.blocks[i + 1]["start"]
+        # 只調整時間，不刪除字幕 (長度為 0 或與其他句同時開始的句子也保留)，
+        # 之後匯入資料庫時每一句的文字都要在
+        track = self.track.sort()
+        if self.offset_ms:
+            track.shift(self.offset_ms)
+        track.clip(0, drop_empty=False)
+        track.close_gaps(self.max_gap_ms)
+        track.fix_overlaps(drop_empty=False)
+        track.enforce_duration(self.min_duration_ms, self.max_duration_ms)
 
     async def write_srt(self):
+        # 整份字幕組成字串後一次寫出
         async with aiofiles.open(self.output_path, "w", encoding="utf-8") as f:
-            for b in self.blocks:
-                await f.write(f"{b['idx']}\n")
-                await f.write(
-                    f"{self.format_time(b['start'])} --> {self.format_time(b['end'])}\n"
-                )
-                await f.write(f"{b['en']}\n")
-                if b["zh"]:
-                    await f.write(f"{b['zh']}\n")
-                await f.write("\n")
+            await f.write(self.track.to_srt())
 
     async def process(self):
         await self.read_srt()
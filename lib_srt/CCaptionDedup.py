@@ -0,0 +1,177 @@
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from lib_srt.CCueTrack import CCueTrack
+
+# YouTube 自動字幕 (滾動式) 去重複
+# 自動字幕每條會重複前一條的內容 (上一行 + 新的一行)，另有 10ms 的過場字幕；
+# 比對「前一條的結尾」與「這一條的開頭」的最長重疊 (KMP，線性時間)，
+# 只保留新增的部分，並調整時間使字幕互不重疊。
+# 一般字幕 (人工字幕、翻譯字幕) 句尾與下一句開頭本來就可能相同，
+# 只有明確是滾動重複時才刪除：與前一條時間重疊，或重疊夠長且佔其中一條的大部分
+
+# 中日文以單字為單位，其餘以空白分隔的字詞為單位
+_CJK = r"\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff"
+_TOKEN_RE = re.compile(rf"[{_CJK}]|[^\s{_CJK}]+")
+_CJK_RE = re.compile(rf"[{_CJK}]")
+
+
+def tokenize(text: str) -> List[str]:
+    """切出比對用的字詞 (不分大小寫)"""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def drop_tokens(text: str, count: int) -> str:
+    """去掉開頭 count 個字詞"""
+    for i, m in enumerate(_TOKEN_RE.finditer(text)):
+        if i == count:
+            return text[m.start() :]
+    return ""
+
+
+def prefix_function(pattern: Sequence[str]) -> List[int]:
+    """KMP 失敗函數"""
+    fail = [0] * len(pattern)
+    k = 0
+    for i in range(1, len(pattern)):
+        while k and pattern[i] != pattern[k]:
+            k = fail[k - 1]
+        if pattern[i] == pattern[k]:
+            k += 1
+        fail[i] = k
+    return fail
+
+
+def suffix_prefix_overlap(prev: Sequence[str], cur: Sequence[str]) -> int:
+    """
+    prev 的結尾與 cur 的開頭最長相同的字詞數
+
+    只需掃描 prev 最後 len(cur) 個字詞，時間為 O(len(cur))
+    """
+    if not prev or not cur:
+        return 0
+    fail = prefix_function(cur)
+    k = 0
+    for token in prev[-len(cur) :]:
+        while k and (k == len(cur) or token != cur[k]):
+            k = fail[k - 1]
+        if k < len(cur) and token == cur[k]:
+            k += 1
+    return k
+
+
+class CCaptionDedup:
+    def __init__(
+        self,
+        rolling: bool = True,
+        min_overlap: int = 2,
+        min_overlap_chars: int = 12,
+        min_overlap_cjk: int = 6,
+        min_overlap_ratio: float = 0.5,
+        max_gap_ms: int = 1000,
+        min_duration_ms: int = 100,
+    ):
+        """
+        Args:
+            rolling: 是否為 YouTube 自動字幕；False 時只移除與前一條完全相同的字幕
+            min_overlap: 部分重疊至少要有幾個字詞才視為重複
+            min_overlap_chars: 時間不重疊時，重疊部分至少要有的字元數 (不含中日文)
+            min_overlap_cjk: 同上，中日文字數 (混合時依比例加總)
+            min_overlap_ratio: 時間不重疊時，重疊部分至少要佔較短一條字詞的比例
+                               (滾動字幕會整行重複前一條)
+            max_gap_ms: 與前一條的間隔超過此毫秒數時不比對 (視為真的重說一次)
+            min_duration_ms: 調整後短於此長度的字幕併入前一條
+        """
+        self.rolling = rolling
+        self.min_overlap = min_overlap
+        self.min_overlap_chars = min_overlap_chars
+        self.min_overlap_cjk = min_overlap_cjk
+        self.min_overlap_ratio = min_overlap_ratio
+        self.max_gap_ms = max_gap_ms
+        self.min_duration_ms = min_duration_ms
+
+    def _is_repeat(
+        self, prev_keys: List[str], keys: List[str], k: int, overlapped: bool
+    ) -> bool:
+        """前一條結尾與這一條開頭的 k 個字詞是否為滾動重複"""
+        if k == len(keys) == len(prev_keys):
+            # 與前一條完全相同
+            return True
+        if not self.rolling or k < self.min_overlap:
+            return False
+        if overlapped:
+            # 滾動字幕的前後兩條在時間上互相重疊
+            return True
+        shared = keys[:k]
+        cjk = sum(1 for t in shared if _CJK_RE.fullmatch(t))
+        chars = sum(len(t) for t in shared if not _CJK_RE.fullmatch(t))
+        long_enough = cjk / self.min_overlap_cjk + chars / self.min_overlap_chars >= 1
+        ratio = k / min(len(keys), len(prev_keys))
+        return long_enough and ratio >= self.min_overlap_ratio
+
+    def _new_part(
+        self, prev_keys: Optional[List[str]], text: str, overlapped: bool = False
+    ) -> Tuple[str, List[str]]:
+        """回傳 (去掉重疊後的新內容, 這一條的比對字詞)"""
+        keys = tokenize(text)
+        if prev_keys is None or not keys:
+            return text, keys
+        k = suffix_prefix_overlap(prev_keys, keys)
+        if not self._is_repeat(prev_keys, keys, k, overlapped):
+            return text, keys
+        if k == len(keys):
+            return "", keys
+        return drop_tokens(text, k), keys
+
+    def dedupe(self, track: CCueTrack) -> CCueTrack:
+        """
+        移除滾動字幕的重複內容
+
+        Args:
+            track: 依時間排序的字幕
+
+        Returns:
+            只含新增內容、時間互不重疊的 CCueTrack
+        """
+        starts: List[int] = []
+        ends: List[int] = []
+        texts: List[str] = []
+
+        prev_keys: Optional[List[str]] = None
+        prev_end = None
+        rows = zip(track.starts.tolist(), track.ends.tolist(), track.texts)
+        for start, end, raw in rows:
+            text = " ".join(raw.split())
+            if not text:
+                continue
+
+            # 與前一條 (原始字幕) 時間相連時才比對重疊
+            near = prev_end is not None and start - prev_end <= self.max_gap_ms
+            overlapped = near and start < prev_end
+            new_text, keys = self._new_part(
+                prev_keys if near else None, text, overlapped
+            )
+            prev_keys, prev_end = keys, end
+
+            if not new_text:
+                # 整條重複：延長前一條的顯示時間
+                if ends:
+                    ends[-1] = max(ends[-1], end)
+                continue
+
+            if ends:
+                start = max(start, ends[-1])
+                if end - start < self.min_duration_ms:
+                    # 太短 (例如 10ms 過場字幕)：內容併入前一條，不遺失字詞
+                    texts[-1] = f"{texts[-1]} {new_text}"
+                    ends[-1] = max(ends[-1], end)
+                    continue
+            starts.append(start)
+            ends.append(end)
+            texts.append(new_text)
+
+        return CCueTrack(starts, ends, texts)
+
+    def dedupe_srt(self, srt_content: str) -> str:
+        """處理 SRT 字串，回傳重新編號的 SRT"""
+        return self.dedupe(CCueTrack.from_string(srt_content)).to_srt()
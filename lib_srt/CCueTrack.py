@@ -0,0 +1,437 @@
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lib_srt.CSrtLoader import CSrtLoader
+
+# 字幕核心：SRT / VTT / ASS 串流解析與輸出
+# 時間以整數毫秒存放在 numpy 陣列 (starts / ends)，文字另存 list，
+# 平移、縮放、裁切、補空檔、修正重疊等時間運算一次作用在整個陣列上
+
+# 00:01:02,345 / 00:01:02.345 / 01:02.345 (VTT 可省略小時)
+_TIME_RE = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})")
+_ASS_TAG_RE = re.compile(r"\{[^}]*\}")
+
+Cue = Tuple[int, int, str]
+
+
+def parse_time_ms(t: str) -> int:
+    """'HH:MM:SS,mmm' (或 VTT 的 'MM:SS.mmm') 轉為毫秒"""
+    t = t.strip()
+    # 標準格式直接以切片轉換，其餘情況交給 regex
+    if len(t) == 12 and t[2] == ":" and t[5] == ":" and t[8] in ",.":
+        try:
+            return (
+                int(t[0:2]) * 3600000
+                + int(t[3:5]) * 60000
+                + int(t[6:8]) * 1000
+                + int(t[9:12])
+            )
+        except ValueError:
+            pass
+    m = _TIME_RE.search(t)
+    if not m:
+        raise ValueError(f"無法解析時間: {t}")
+    h, mi, s, ms = m.groups()
+    # 小數位數不足三位時補齊 ("1.5" 為 500 毫秒)
+    return (
+        (int(h or 0) * 3600 + int(mi) * 60 + int(s)) * 1000
+        + int(ms.ljust(3, "0"))
+    )
+
+
+def format_srt_time(ms: int) -> str:
+    """毫秒轉為 SRT 時間格式 'HH:MM:SS,mmm'"""
+    ms = max(int(ms), 0)
+    s, ms = divmod(ms, 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+def format_vtt_time(ms: int) -> str:
+    return format_srt_time(ms).replace(",", ".")
+
+
+def format_ass_time(ms: int) -> str:
+    """毫秒轉為 ASS 時間格式 'H:MM:SS.cc'"""
+    cs = max(int(ms), 0) // 10
+    s, cs = divmod(cs, 100)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h:d}:{m:02d}:{s:02d}.{cs:02d}"
+
+
+# 'HH:MM:SS,mmm' 各位數所在欄位與對應毫秒權重
+_DIGIT_COLS = [0, 1, 3, 4, 6, 7, 9, 10, 11]
+_DIGIT_WEIGHTS = np.array(
+    [36000000, 3600000, 600000, 60000, 10000, 1000, 100, 10, 1], dtype=np.int64
+)
+
+
+def times_to_ms(times: Sequence[str]) -> np.ndarray:
+    """
+    批次將時間字串轉為毫秒陣列
+
+    標準 'HH:MM:SS,mmm' 以 numpy 一次換算，其他格式逐筆交給 parse_time_ms
+    """
+    if not times:
+        return np.empty(0, dtype=np.int64)
+
+    codes = np.array(times, dtype="<U13").view(np.uint32).reshape(len(times), 13)
+    digits = codes.astype(np.int64) - ord("0")
+    ok = (
+        (codes[:, 12] == 0)
+        & (codes[:, 2] == ord(":"))
+        & (codes[:, 5] == ord(":"))
+        & ((codes[:, 8] == ord(",")) | (codes[:, 8] == ord(".")))
+        & ((digits[:, _DIGIT_COLS] >= 0) & (digits[:, _DIGIT_COLS] <= 9)).all(axis=1)
+    )
+    result = digits[:, _DIGIT_COLS] @ _DIGIT_WEIGHTS
+    for i in np.flatnonzero(~ok).tolist():
+        result[i] = parse_time_ms(times[i])
+    return result
+
+
+def _scan_srt(
+    lines: Iterable[str],
+) -> Iterator[Tuple[Optional[int], str, str, str]]:
+    """
+    逐行掃描 SRT / VTT，產生 (序號, 開始時間字串, 結束時間字串, 文字)
+
+    序號為時間行前一行的數字，沒有序號時為 None
+    """
+    start = end = number = None
+    label = ""
+    text_lines: List[str] = []
+
+    for raw in lines:
+        line = raw.strip()
+        if "-->" in line:
+            left, _, right = line.partition("-->")
+            left = left.strip()
+            right = right.split(None, 1)[0] if right.strip() else ""
+            if _TIME_RE.search(left) and _TIME_RE.search(right):
+                if start is not None:
+                    yield number, start, end, "\n".join(text_lines)
+                start, end = left, right
+                number = int(label) if label.isdigit() else None
+                label = ""
+                text_lines = []
+                continue
+
+        if start is None:
+            if line:
+                label = line
+            continue
+        if line:
+            text_lines.append(line)
+        else:
+            # 空行結束目前字幕 (允許沒有文字的字幕)
+            yield number, start, end, "\n".join(text_lines)
+            start = end = None
+            text_lines = []
+
+    if start is not None:
+        yield number, start, end, "\n".join(text_lines)
+
+
+def iter_srt(lines: Iterable[str]) -> Iterator[Cue]:
+    """
+    逐行解析 SRT / VTT，不需先讀入整個檔案
+
+    序號行可有可無，時間行之後到空行前為字幕文字
+    """
+    for _, start, end, text in _scan_srt(lines):
+        yield parse_time_ms(start), parse_time_ms(end), text
+
+
+def iter_srt_numbered(
+    lines: Iterable[str],
+) -> Iterator[Tuple[Optional[int], int, int, str]]:
+    """同 iter_srt，另外回傳檔案中的原始序號 (沒有序號時為 None)"""
+    for number, start, end, text in _scan_srt(lines):
+        yield number, parse_time_ms(start), parse_time_ms(end), text
+
+
+def iter_ass(lines: Iterable[str], strip_tags: bool = True) -> Iterator[Cue]:
+    """逐行解析 ASS / SSA 的 [Events] 區段"""
+    fields = ["Layer", "Start", "End", "Style", "Name", "MarginL", "MarginR",
+              "MarginV", "Effect", "Text"]  # fmt: skip
+    in_events = False
+
+    for raw in lines:
+        line = raw.strip()
+        if line.startswith("["):
+            in_events = line.lower() == "[events]"
+            continue
+        if not in_events:
+            continue
+        if line.startswith("Format:"):
+            fields = [f.strip() for f in line[len("Format:") :].split(",")]
+            continue
+        if not line.startswith("Dialogue:"):
+            continue
+
+        values = line[len("Dialogue:") :].split(",", len(fields) - 1)
+        if len(values) < len(fields):
+            continue
+        row = dict(zip(fields, values))
+        text = row["Text"].replace("\\N", "\n").replace("\\n", "\n")
+        if strip_tags:
+            text = _ASS_TAG_RE.sub("", text)
+        yield parse_time_ms(row["Start"]), parse_time_ms(row["End"]), text.strip()
+
+
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 1920
+PlayResY: 1080
+WrapStyle: 0
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,56,&H00FFFFFF,&H000000FF,&H00000000,&H64000000,-1,0,0,0,100,100,0,0,1,3,2,2,60,60,100,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+class CCueTrack:
+    """字幕軌：starts / ends 為 int64 毫秒陣列，texts 為文字列表"""
+
+    FORMATS = ("srt", "vtt", "ass")
+
+    def __init__(
+        self,
+        starts: Optional[Iterable[int]] = None,
+        ends: Optional[Iterable[int]] = None,
+        texts: Optional[Iterable[str]] = None,
+    ):
+        self.starts = np.asarray([] if starts is None else starts, dtype=np.int64)
+        self.ends = np.asarray([] if ends is None else ends, dtype=np.int64)
+        self.texts: List[str] = [] if texts is None else list(texts)
+        if not (len(self.starts) == len(self.ends) == len(self.texts)):
+            raise ValueError("starts / ends / texts 數量不一致")
+
+    # ===== 建立 =====
+    @classmethod
+    def from_cues(cls, cues: Iterable[Cue]) -> "CCueTrack":
+        rows = list(cues)
+        if not rows:
+            return cls()
+        starts, ends, texts = zip(*rows)
+        return cls(starts, ends, texts)
+
+    @staticmethod
+    def detect_format(path: str) -> str:
+        ext = Path(path).suffix.lower().lstrip(".")
+        if ext == "ssa":
+            return "ass"
+        return ext if ext in CCueTrack.FORMATS else "srt"
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], fmt: str = "srt") -> "CCueTrack":
+        if fmt == "ass":
+            return cls.from_cues(iter_ass(lines))
+
+        # 先收集時間字串，最後一次向量化換算
+        rows = list(_scan_srt(lines))
+        if not rows:
+            return cls()
+        _, starts, ends, texts = zip(*rows)
+        return cls(times_to_ms(starts), times_to_ms(ends), texts)
+
+    @classmethod
+    def from_string(cls, content: str, fmt: str = "srt") -> "CCueTrack":
+        return cls.from_lines(content.splitlines(), fmt)
+
+    @classmethod
+    def from_file(
+        cls, path: str, fmt: Optional[str] = None, encoding: Optional[str] = None
+    ) -> "CCueTrack":
+        """
+        讀取字幕檔，格式預設依副檔名判斷
+
+        未指定 encoding 時由 CSrtLoader 自動判斷 (UTF-8 / Big5 / GBK / UTF-16)
+        """
+        fmt = fmt or cls.detect_format(path)
+        if encoding is None:
+            return cls.from_lines(CSrtLoader.read_lines(path), fmt)
+        with open(path, "r", encoding=encoding) as f:
+            return cls.from_lines(f, fmt)
+
+    # ===== 存取 =====
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[Cue]:
+        return zip(self.starts.tolist(), self.ends.tolist(), self.texts)
+
+    def __getitem__(self, i: int) -> Cue:
+        return int(self.starts[i]), int(self.ends[i]), self.texts[i]
+
+    def copy(self) -> "CCueTrack":
+        return CCueTrack(self.starts.copy(), self.ends.copy(), list(self.texts))
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.ends - self.starts
+
+    def seconds(self) -> List[Tuple[float, float, str]]:
+        """[(開始秒, 結束秒, 文字)]"""
+        return [(s / 1000, e / 1000, t) for s, e, t in self]
+
+    # ===== 時間運算 (整個陣列一次處理) =====
+    def shift(self, offset_ms: int) -> "CCueTrack":
+        """整體平移，正數延後、負數提前"""
+        self.starts += int(offset_ms)
+        self.ends += int(offset_ms)
+        return self
+
+    def scale(self, factor: float, pivot_ms: int = 0) -> "CCueTrack":
+        """以 pivot 為基準縮放時間 (修正影格率差異造成的漂移)"""
+        self.starts = np.rint((self.starts - pivot_ms) * factor + pivot_ms).astype(
+            np.int64
+        )
+        self.ends = np.rint((self.ends - pivot_ms) * factor + pivot_ms).astype(
+            np.int64
+        )
+        return self
+
+    def clip(
+        self, min_ms: int = 0, max_ms: Optional[int] = None, drop_empty: bool = True
+    ) -> "CCueTrack":
+        """
+        將時間限制在範圍內
+
+        Args:
+            drop_empty: 是否移除裁切後長度為 0 的字幕
+        """
+        np.clip(self.starts, min_ms, max_ms, out=self.starts)
+        np.clip(self.ends, min_ms, max_ms, out=self.ends)
+        return self.filter(self.ends > self.starts) if drop_empty else self
+
+    def filter(self, mask: np.ndarray) -> "CCueTrack":
+        """只保留 mask 為 True 的字幕"""
+        mask = np.asarray(mask, dtype=bool)
+        self.starts = self.starts[mask]
+        self.ends = self.ends[mask]
+        self.texts = [t for t, keep in zip(self.texts, mask.tolist()) if keep]
+        return self
+
+    def sort(self) -> "CCueTrack":
+        order = np.argsort(self.starts, kind="stable")
+        self.starts = self.starts[order]
+        self.ends = self.ends[order]
+        self.texts = [self.texts[i] for i in order.tolist()]
+        return self
+
+    def align_to_points(
+        self, src_a: int, dst_a: int, src_b: int, dst_b: int
+    ) -> "CCueTrack":
+        """
+        以兩個同步點做線性校正 (同時修正偏移與漂移)
+
+        Args:
+            src_a, dst_a: 第一個同步點的字幕時間與實際時間 (毫秒)
+            src_b, dst_b: 第二個同步點的字幕時間與實際時間 (毫秒)
+        """
+        if src_a == src_b:
+            raise ValueError("兩個同步點的字幕時間不可相同")
+        factor = (dst_b - dst_a) / (src_b - src_a)
+        return self.scale(factor, src_a).shift(dst_a - src_a)
+
+    def overlap_mask(self) -> np.ndarray:
+        """第 i 句結束時間超過第 i+1 句開始時間者為 True (長度 n-1)"""
+        return self.ends[:-1] > self.starts[1:]
+
+    def close_gaps(self, max_gap_ms: Optional[int] = None) -> "CCueTrack":
+        """
+        將結束時間延到下一句開始
+
+        Args:
+            max_gap_ms: 只填補不超過此毫秒數的空檔；None 表示每句都接到下一句開始
+        """
+        if len(self) < 2:
+            return self
+        next_starts = self.starts[1:]
+        if max_gap_ms is None:
+            self.ends[:-1] = next_starts
+        else:
+            gap = next_starts - self.ends[:-1]
+            mask = (gap > 0) & (gap <= max_gap_ms)
+            self.ends[:-1][mask] = next_starts[mask]
+        return self
+
+    def fix_overlaps(
+        self, min_gap_ms: int = 0, drop_empty: bool = True
+    ) -> "CCueTrack":
+        """
+        結束時間超過下一句開始時截短
+
+        Args:
+            drop_empty: 是否移除截短後長度為 0 的字幕；
+                        False 時不讓結束時間早於開始時間 (保留為長度 0)
+        """
+        if len(self) < 2:
+            return self
+        np.minimum(self.ends[:-1], self.starts[1:] - min_gap_ms, out=self.ends[:-1])
+        if drop_empty:
+            return self.filter(self.ends > self.starts)
+        np.maximum(self.ends, self.starts, out=self.ends)
+        return self
+
+    def enforce_duration(
+        self, min_ms: Optional[int] = None, max_ms: Optional[int] = None
+    ) -> "CCueTrack":
+        """
+        限制每句顯示長度
+
+        延長時不超過下一句開始 (下一句太近時維持原本長度)
+        """
+        if max_ms is not None:
+            np.minimum(self.ends, self.starts + max_ms, out=self.ends)
+        if min_ms is not None and len(self):
+            target = self.starts + min_ms
+            target[:-1] = np.minimum(target[:-1], self.starts[1:])
+            np.maximum(self.ends, target, out=self.ends)
+        return self
+
+    # ===== 輸出 =====
+    def to_srt(self) -> str:
+        parts = []
+        for i, (s, e, text) in enumerate(self, start=1):
+            parts.append(f"{i}\n{format_srt_time(s)} --> {format_srt_time(e)}\n{text}\n")
+        return "\n".join(parts)
+
+    def to_vtt(self) -> str:
+        parts = ["WEBVTT\n"]
+        for s, e, text in self:
+            parts.append(f"{format_vtt_time(s)} --> {format_vtt_time(e)}\n{text}\n")
+        return "\n".join(parts)
+
+    def to_ass(self, header: str = ASS_HEADER, style: str = "Default") -> str:
+        parts = [header]
+        for s, e, text in self:
+            text = text.replace("\n", "\\N")
+            parts.append(
+                f"Dialogue: 0,{format_ass_time(s)},{format_ass_time(e)},{style},,0,0,0,,{text}\n"
+            )
+        return "".join(parts)
+
+    def dumps(self, fmt: str = "srt") -> str:
+        if fmt == "vtt":
+            return self.to_vtt()
+        if fmt == "ass":
+            return self.to_ass()
+        return self.to_srt()
+
+    def save(self, path: str, fmt: Optional[str] = None, encoding: str = "utf-8"):
+        """一次寫出整個檔案"""
+        fmt = fmt or self.detect_format(path)
+        with open(path, "w", encoding=encoding, newline="\n") as f:
+            f.write(self.dumps(fmt))
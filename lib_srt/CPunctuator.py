@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 字幕標點還原 (deepmultilingualpunctuation)
+# 每個行程只載入一次模型；所有字幕的字詞串成一條序列，
+# 切成前後帶上下文的視窗後批次送進模型，再依字詞歸屬還原回原本的字幕邊界
+
+DEFAULT_MODEL = "oliverguhr/fullstop-punctuation-multilang-large"
+
+# 不送進模型的標記
+SKIP_TEXTS = {"", "[music]", "[音樂]", "[applause]", "[laughter]"}
+
+_models: Dict[str, object] = {}
+_model_lock = threading.Lock()
+
+
+def get_model(model_name: str = DEFAULT_MODEL):
+    """取得 (並快取) 標點模型，同一行程只載入一次"""
+    with _model_lock:
+        model = _models.get(model_name)
+        if model is None:
+            from deepmultilingualpunctuation import PunctuationModel
+
+            print(f"🔤 載入標點模型：{model_name}")
+            model = PunctuationModel(model=model_name)
+            _models[model_name] = model
+        return model
+
+
+def preprocess_words(text: str) -> List[str]:
+    """移除既有標點 (數字中的除外) 後切成字詞，與 PunctuationModel.preprocess 相同"""
+    return re.sub(r"(?<!\d)[.,;:!?](?!\d)", "", text).split()
+
+
+class CPunctuator:
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        window_words: int = 200,
+        context_words: int = 15,
+        batch_size: int = 8,
+        cache_path: Optional[str] = None,
+        max_cache_entries: int = 50000,
+    ):
+        """
+        Args:
+            model_name: HuggingFace 模型名稱
+            window_words: 每個視窗實際要標記的字詞數
+            context_words: 視窗前後額外附帶的上下文字詞數 (只參考不輸出)
+            batch_size: 一次送進模型的視窗數
+            cache_path: 結果快取檔 (JSON)，None 表示只在記憶體中快取
+            max_cache_entries: 快取筆數上限，超過時刪除最久沒用到的 (0 表示不限制)
+        """
+        # 模型最多 512 個 token，視窗 (含上下文) 維持在 PunctuationModel 預設的 230 字內
+        if window_words + 2 * context_words > 230:
+            raise ValueError("window_words + 2 * context_words 不可超過 230")
+        self.model_name = model_name
+        self.window_words = window_words
+        self.context_words = context_words
+        self.batch_size = batch_size
+        self.cache_path = cache_path
+        self.max_cache_entries = max_cache_entries
+        self.cache: Dict[str, str] = self._load_cache()
+        self._trim_cache()
+
+    # ===== 快取 =====
+    def _load_cache(self) -> Dict[str, str]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _trim_cache(self):
+        # dict 依插入順序排列，命中時移到最後，最前面的就是最久沒用到的
+        excess = len(self.cache) - self.max_cache_entries
+        if self.max_cache_entries and excess > 0:
+            for key in list(self.cache)[:excess]:
+                del self.cache[key]
+
+    def _save_cache(self):
+        self._trim_cache()
+        if not self.cache_path:
+            return
+        temp = self.cache_path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f, ensure_ascii=False)
+        os.replace(temp, self.cache_path)
+
+    def _cache_key(self, prev_text: str, text: str, next_text: str) -> str:
+        # 結果受前後句影響，鍵值包含相鄰字幕
+        raw = "\x00".join((self.model_name, prev_text, text, next_text))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    # ===== 模型 =====
+    @staticmethod
+    def _labels_from_result(words: Sequence[str], result: List[Dict]) -> List[str]:
+        """將 token 標記對應回字詞 (與 PunctuationModel.predict 相同規則)"""
+        labels = []
+        char_index = 0
+        result_index = 0
+        for word in words:
+            char_index += len(word) + 1
+            # 字詞的任一子詞被標為標點，整個字詞就採用該標點
+            label = "0"
+            while result_index < len(result) and char_index > result[result_index]["end"]:
+                label = result[result_index]["entity"]
+                result_index += 1
+            labels.append(label)
+        return labels
+
+    def _predict(self, words: List[str], needed: List[bool]) -> List[str]:
+        """
+        標記字詞序列中需要的部分
+
+        Args:
+            words: 全部字詞
+            needed: 每個字詞是否需要標記 (快取命中的字幕只當上下文)
+
+        Returns:
+            每個字詞的標記 ("0" 表示無標點)
+        """
+        labels = ["0"] * len(words)
+        windows: List[Tuple[int, int, int, int]] = []
+        i = 0
+        while i < len(words):
+            if not needed[i]:
+                i += 1
+                continue
+            core_start = i
+            core_end = min(core_start + self.window_words, len(words))
+            ctx_start = max(core_start - self.context_words, 0)
+            ctx_end = min(core_end + self.context_words, len(words))
+            windows.append((ctx_start, core_start, core_end, ctx_end))
+            i = core_end
+
+        if not windows:
+            return labels
+
+        model = get_model(self.model_name)
+        texts = [" ".join(words[s:e]) for s, _, _, e in windows]
+        results = model.pipe(texts, batch_size=self.batch_size)
+
+        for (ctx_start, core_start, core_end, ctx_end), text, result in zip(
+            windows, texts, results
+        ):
+            if result and result[-1]["end"] != len(text):
+                print("⚠️ 視窗文字被模型截斷，請調小 window_words")
+            window_labels = self._labels_from_result(words[ctx_start:ctx_end], result)
+            labels[core_start:core_end] = window_labels[
+                core_start - ctx_start : core_end - ctx_start
+            ]
+        return labels
+
+    # ===== 對外 =====
+    def punctuate(self, texts: Sequence[str]) -> List[str]:
+        """
+        還原多條字幕的標點，字幕邊界保持不變
+
+        Args:
+            texts: 依時間排序的字幕文字
+
+        Returns:
+            加上標點的字幕文字 (與輸入一一對應)
+        """
+        cleaned = [re.sub(r"\s+", " ", t.strip()) for t in texts]
+        skip = [c.lower() in SKIP_TEXTS for c in cleaned]
+
+        # 只有一般字幕參與上下文
+        order = [i for i in range(len(cleaned)) if not skip[i]]
+        keys: Dict[int, str] = {}
+        for pos, i in enumerate(order):
+            prev_text = cleaned[order[pos - 1]] if pos > 0 else ""
+            next_text = cleaned[order[pos + 1]] if pos + 1 < len(order) else ""
+            keys[i] = self._cache_key(prev_text, cleaned[i], next_text)
+
+        cue_words = {i: preprocess_words(cleaned[i]) for i in order}
+        words: List[str] = []
+        needed: List[bool] = []
+        for i in order:
+            words.extend(cue_words[i])
+            needed.extend([keys[i] not in self.cache] * len(cue_words[i]))
+
+        labels = self._predict(words, needed)
+
+        # 依字詞歸屬組回每條字幕，並將句首字母大寫 (跨字幕也會處理)
+        punctuated: Dict[int, str] = {}
+        misses = 0
+        pos = 0
+        sentence_start = True
+        for i in order:
+            n = len(cue_words[i])
+            if keys[i] in self.cache:
+                punctuated[i] = self.cache[keys[i]] = self.cache.pop(keys[i])
+                sentence_start = punctuated[i].endswith((".", "?"))
+            else:
+                pieces = []
+                for word, label in zip(cue_words[i], labels[pos : pos + n]):
+                    if sentence_start and word[:1].isalpha():
+                        word = word[0].upper() + word[1:]
+                    sentence_start = label in ".?"
+                    pieces.append(word + (label if label in ".,?-:" else ""))
+                punctuated[i] = " ".join(pieces)
+                self.cache[keys[i]] = punctuated[i]
+                misses += 1
+            pos += n
+
+        results = [
+            cleaned[i] if skip[i] else punctuated[i] for i in range(len(cleaned))
+        ]
+        if misses:
+            self._save_cache()
+        return results
@@ -0,0 +1,200 @@
+import os
+import re
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from lib_srt.CCueTrack import CCueTrack
+
+# 依 Whisper 逐字時間 (word_timestamps) 重新切成句子字幕
+# 句子邊界直接落在字詞的實際起訖時間上，不再依字數比例估算
+
+Word = Tuple[float, float, str]
+
+# 句尾標點 (可接引號 / 括號)
+_SENTENCE_END_RE = re.compile(r"[.!?。！？…]+[\"'”’」』)\]]*$")
+# 適合在句中斷開的位置 (子句標點)
+_CLAUSE_END_RE = re.compile(r"[,;:，；：、—]+[\"'”’」』)\]]*$")
+
+# 未安裝 punkt 模型時使用的常見英文縮寫 (小寫、不含結尾句點)
+DEFAULT_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc",
+    "e.g", "i.e", "a.m", "p.m", "u.s", "u.k", "no", "fig", "inc", "ltd",
+    "co", "corp", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep",
+    "sept", "oct", "nov", "dec",
+}  # fmt: skip
+
+# 專案內附的 nltk 資料夾 (可放 tokenizers/punkt_tab/english)，不會連網下載
+BUNDLED_NLTK_DATA = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nltk_data"
+)
+
+_abbreviations: Optional[Set[str]] = None
+
+
+def load_abbreviations() -> Set[str]:
+    """
+    延遲載入縮寫表
+
+    有內附的 punkt 模型時取用其訓練出的縮寫，否則使用內建清單；
+    只在第一次需要時載入，且不呼叫 nltk.download
+    """
+    global _abbreviations
+    if _abbreviations is not None:
+        return _abbreviations
+
+    abbreviations = set(DEFAULT_ABBREVIATIONS)
+    try:
+        import nltk
+
+        if BUNDLED_NLTK_DATA not in nltk.data.path:
+            nltk.data.path.insert(0, BUNDLED_NLTK_DATA)
+        nltk.data.find("tokenizers/punkt_tab/english")
+        from nltk.tokenize.punkt import PunktTokenizer
+
+        abbreviations |= set(PunktTokenizer("english")._params.abbrev_types)
+    except Exception:
+        # 沒有 nltk 或沒有模型檔，使用內建清單
+        pass
+
+    _abbreviations = abbreviations
+    return abbreviations
+
+
+def is_sentence_end(word: str) -> bool:
+    """判斷字詞是否為句尾 (排除 Mr. / e.g. 這類縮寫與 3.5 這類數字)"""
+    token = word.strip()
+    if not _SENTENCE_END_RE.search(token):
+        return False
+    if token.endswith(".") and not token.endswith(".."):
+        stem = token.rstrip(".").lstrip("\"'“‘(").lower()
+        if stem in load_abbreviations():
+            return False
+        # 單一字母縮寫，例如人名縮寫 J.
+        if len(stem) == 1 and stem.isalpha():
+            return False
+    return True
+
+
+def split_sentences(text: str) -> List[str]:
+    """不依賴 nltk 的斷句，給沒有逐字時間的字幕使用"""
+    sentences = []
+    current: List[str] = []
+    for token in re.findall(r"\S+\s*", text):
+        current.append(token)
+        if is_sentence_end(token):
+            sentences.append("".join(current).strip())
+            current = []
+    if current:
+        sentences.append("".join(current).strip())
+    return [s for s in sentences if s]
+
+
+def words_from_segments(segments: Iterable) -> Iterator[Word]:
+    """
+    由 faster-whisper 的 segments 取出逐字時間
+
+    需以 word_timestamps=True 轉錄；沒有逐字資料的段落以整段當作一個字詞
+    """
+    for segment in segments:
+        words = getattr(segment, "words", None)
+        if words:
+            for w in words:
+                yield w.start, w.end, w.word
+        elif segment.text.strip():
+            yield segment.start, segment.end, " " + segment.text.strip()
+
+
+class CSentenceSegmenter:
+    def __init__(
+        self,
+        max_duration: float = 7.0,
+        max_chars: int = 84,
+        pause_split: float = 1.5,
+        min_duration: float = 0.5,
+    ):
+        """
+        Args:
+            max_duration: 單句字幕最長秒數，超過時在句中斷開
+            max_chars: 單句字幕最多字元數
+            pause_split: 字詞間停頓超過此秒數時視為新句子
+            min_duration: 字幕最短顯示秒數 (不會超過下一句開始時間)
+        """
+        self.max_duration = max_duration
+        self.max_chars = max_chars
+        self.pause_split = pause_split
+        self.min_duration = min_duration
+
+    @staticmethod
+    def _text(words: List[Word]) -> str:
+        # Whisper 的英文字詞自帶前導空白，中文則沒有，直接串接即可
+        return re.sub(r"\s+", " ", "".join(w[2] for w in words)).strip()
+
+    def _fits(self, words: List[Word]) -> bool:
+        return (
+            words[-1][1] - words[0][0] <= self.max_duration
+            and len(self._text(words)) <= self.max_chars
+        )
+
+    def _best_break(self, words: List[Word]) -> int:
+        """
+        超過長度限制時找出斷點，回傳前半段的字詞數
+
+        優先在最後一個子句標點後斷開，其次選停頓最長的位置
+        """
+        for i in range(len(words) - 1, 0, -1):
+            if _CLAUSE_END_RE.search(words[i - 1][2].strip()) and self._fits(words[:i]):
+                return i
+
+        best, best_gap = len(words) - 1, -1.0
+        for i in range(1, len(words)):
+            if not self._fits(words[:i]):
+                break
+            gap = words[i][0] - words[i - 1][1]
+            if gap >= best_gap:
+                best, best_gap = i, gap
+        return max(best, 1)
+
+    def _emit(self, words: List[Word], cues: List[Tuple[int, int, str]]):
+        text = self._text(words)
+        if text:
+            cues.append((round(words[0][0] * 1000), round(words[-1][1] * 1000), text))
+
+    def segment(self, words: Iterable[Word]) -> CCueTrack:
+        """
+        由逐字時間產生句子字幕
+
+        Args:
+            words: (開始秒, 結束秒, 字詞) 序列
+
+        Returns:
+            CCueTrack
+        """
+        cues: List[Tuple[int, int, str]] = []
+        buffer: List[Word] = []
+
+        for word in words:
+            if buffer and word[0] - buffer[-1][1] >= self.pause_split:
+                self._emit(buffer, cues)
+                buffer = []
+            buffer.append(word)
+            while len(buffer) > 1 and not self._fits(buffer):
+                # 超過長度限制，先輸出前半段，其餘留待與後面的字詞組成下一句
+                cut = self._best_break(buffer)
+                self._emit(buffer[:cut], cues)
+                buffer = buffer[cut:]
+            if is_sentence_end(word[2]):
+                self._emit(buffer, cues)
+                buffer = []
+        if buffer:
+            self._emit(buffer, cues)
+
+        track = CCueTrack.from_cues(cues)
+        if len(track):
+            # 太短的字幕延長顯示，但不超過下一句開始
+            min_ms = round(self.min_duration * 1000)
+            track.ends = track.ends.clip(min=track.starts + min_ms)
+            track.ends[:-1] = track.ends[:-1].clip(max=track.starts[1:])
+        return track
+
+    def segment_segments(self, segments: Iterable) -> CCueTrack:
+        """直接處理 faster-whisper 的 segments"""
+        return self.segment(words_from_segments(segments))
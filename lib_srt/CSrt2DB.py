@@ -11,7 +11,15 @@ if project_root not in sys.path:
 from sqlalchemy.orm import Session
 from lib_db.db.database import SessionLocal
 from lib_db.schemas.Subtitle import SubtitleCreate
-from lib_db.crud.subtitle_crud import create_subtitle
+from lib_db.crud.subtitle_crud import (
+    bulk_create_subtitles,
+    replace_subtitles_by_video,
+)
+from lib_srt.CCueTrack import format_srt_time, iter_srt_numbered
+from lib_srt.CSrtLoader import CSrtLoader
+from lib_srt.CTrackAligner import CTrackAligner
+
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
 
 
 class CSrt2DB:
@@ -38,8 +46,7 @@ class CSrt2DB:
             SubtitleCreate物件列表
         """
         try:
-            with open(filepath, encoding="utf-8") as f:
-                srt_content = f.read()
+            cues = list(iter_srt_numbered(CSrtLoader.read_lines(filepath)))
         except FileNotFoundError:
             print(f"❌ 檔案不存在: {filepath}")
             return []
@@ -47,68 +54,108 @@ class CSrt2DB:
             print(f"❌ 讀取檔案失敗: {e}")
             return []
 
-        blocks = re.split(r"\n\s*\n", srt_content.strip())
         subtitles = []
-
-        for block in blocks:
-            subtitle = self._parse_subtitle_block(block, video_id)
+        for position, (seq, start_ms, end_ms, text) in enumerate(cues, start=1):
+            # seq 沿用檔案中的序號，沒有序號時以位置代替
+            subtitle = self._build_subtitle(
+                seq or position, start_ms, end_ms, text, video_id
+            )
             if subtitle:
                 subtitles.append(subtitle)
 
         return subtitles
 
-    def _parse_subtitle_block(
-        self, block: str, video_id: str
+    def parse_dual_files(
+        self,
+        en_path: str,
+        zh_path: str,
+        video_id: str,
+        aligner: Optional[CTrackAligner] = None,
+    ) -> List[SubtitleCreate]:
+        """
+        解析各自計時的英文、中文兩個字幕檔，依時間重疊對齊成中英字幕
+
+        Args:
+            en_path: 英文字幕 (時間與斷句以此為準)
+            zh_path: 中文字幕
+            video_id: 影片ID
+            aligner: 自訂的對齊設定，None 使用預設值
+
+        Returns:
+            SubtitleCreate物件列表
+        """
+        aligner = aligner or CTrackAligner()
+        try:
+            cues = aligner.align_files(en_path, zh_path)
+        except FileNotFoundError as e:
+            print(f"❌ 檔案不存在: {e.filename}")
+            return []
+        except Exception as e:
+            print(f"❌ 讀取檔案失敗: {e}")
+            return []
+
+        return [
+            SubtitleCreate(
+                video_id=video_id,
+                seq=seq,
+                start_time=format_srt_time(start_ms),
+                end_time=format_srt_time(end_ms),
+                en_text=en_text,
+                zh_text=zh_text,
+            )
+            for seq, (start_ms, end_ms, en_text, zh_text) in enumerate(cues, start=1)
+        ]
+
+    def _build_subtitle(
+        self, seq: int, start_ms: int, end_ms: int, text: str, video_id: str
     ) -> Optional[SubtitleCreate]:
         """
-        解析單個字幕區塊
+        由單條字幕建立資料庫物件
 
         Args:
-            block: 字幕區塊文字
+            seq: 字幕序號
+            start_ms: 開始時間 (毫秒)
+            end_ms: 結束時間 (毫秒)
+            text: 字幕文字 (可含多行)
             video_id: 影片ID
 
         Returns:
             SubtitleCreate物件或None
         """
-        lines = block.strip().splitlines()
-        if len(lines) < 3:
+        if not text:
             return None
 
-        try:
-            seq = int(lines[0].strip())
-            times = lines[1].split(" --> ")
-            start_time = times[0].strip()
-            end_time = times[1].strip()
-
-            text_lines = lines[2:]
-            en_text = ""
-            zh_text = ""
-
-            for line in text_lines:
-                # 簡單判斷中英文：可根據需求自訂
-                if re.search(r"[\u4e00-\u9fff]", line):
-                    zh_text += line.strip() + " "
-                else:
-                    en_text += line.strip() + " "
+        en_text = ""
+        zh_text = ""
+        for line in text.splitlines():
+            # 簡單判斷中英文：可根據需求自訂
+            if _CJK_RE.search(line):
+                zh_text += line.strip() + " "
+            else:
+                en_text += line.strip() + " "
 
+        try:
             return SubtitleCreate(
                 video_id=video_id,
                 seq=seq,
-                start_time=start_time,
-                end_time=end_time,
+                start_time=format_srt_time(start_ms),
+                end_time=format_srt_time(end_ms),
                 en_text=en_text.strip(),
                 zh_text=zh_text.strip(),
             )
         except Exception as e:
-            print(f"⚠️ 解析錯誤: {e}, block: {block}")
+            print(f"⚠️ 解析錯誤: {e}, seq: {seq}")
             return None
 
-    def insert_subtitles_to_db(self, subtitles: List[SubtitleCreate]) -> bool:
+    def insert_subtitles_to_db(
+        self, subtitles: List[SubtitleCreate], replace: bool = False
+    ) -> bool:
         """
         將字幕插入到資料庫
 
         Args:
             subtitles: SubtitleCreate物件列表
+            replace: 先刪除該影片原有的字幕 (同一個交易)，重複匯入時不會產生重複資料
 
         Returns:
             插入是否成功
@@ -122,9 +169,11 @@ class CSrt2DB:
         should_close_db = self.db_session is None
 
         try:
-            # 逐個插入
-            for sub in subtitles:
-                create_subtitle(db, sub)
+            # 一次批次寫入
+            if replace:
+                replace_subtitles_by_video(db, subtitles[0].video_id, subtitles)
+            else:
+                bulk_create_subtitles(db, subtitles)
             print(f"✅ 插入完成，共 {len(subtitles)} 筆")
             return True
 
@@ -135,13 +184,16 @@ class CSrt2DB:
             if should_close_db:
                 db.close()
 
-    def process_srt_file(self, filepath: str, video_id: str) -> bool:
+    def process_srt_file(
+        self, filepath: str, video_id: str, replace: bool = False
+    ) -> bool:
         """
         完整處理SRT檔案：解析並插入資料庫
 
         Args:
             filepath: SRT檔案路徑
             video_id: 影片ID
+            replace: 取代該影片原有的字幕 (見 insert_subtitles_to_db)
 
         Returns:
             處理是否成功
@@ -151,6 +203,29 @@ class CSrt2DB:
         subtitles = self.parse_srt_file(filepath, video_id)
         print(f"📝 解析完成，共 {len(subtitles)} 筆字幕")
 
+        if not subtitles:
+            print("⚠️ 沒有找到任何字幕資料")
+            return False
+
+        return self.insert_subtitles_to_db(subtitles, replace)
+
+    def process_dual_files(self, en_path: str, zh_path: str, video_id: str) -> bool:
+        """
+        完整處理中英兩個字幕檔：對齊並插入資料庫
+
+        Args:
+            en_path: 英文字幕檔路徑
+            zh_path: 中文字幕檔路徑
+            video_id: 影片ID
+
+        Returns:
+            處理是否成功
+        """
+        print(f"📖 開始對齊字幕檔案: {en_path} + {zh_path}")
+
+        subtitles = self.parse_dual_files(en_path, zh_path, video_id)
+        print(f"📝 對齊完成，共 {len(subtitles)} 筆字幕")
+
         if not subtitles:
             print("⚠️ 沒有找到任何字幕資料")
             return False
@@ -0,0 +1,128 @@
+import codecs
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+# 字幕檔讀取：只讀一次檔案，以 BOM 與前段取樣判斷編碼後一次解碼，
+# 統一換行為 \n，並依 (路徑, 大小, 修改時間) 快取判斷結果
+class CSrtLoader:
+    SAMPLE_SIZE = 64 * 1024
+
+    # 非 UTF-8 時的候選編碼 (cp950 為 Big5 的 Windows 擴充，可解出 Big5 全部字元)
+    FALLBACK_ENCODINGS = ("cp950", "gbk")
+
+    # 繁簡中文常用字，用來判斷 Big5 / GBK 何者解出的是正常文字
+    COMMON_CHARS = set(
+        "的一是不了在人有我他這个這個們们中來来上大為为和國国地到以說说時时要就出會会"
+        "可也你對对生能而子那得於于著着下自之年過过發发後后作裡里用道行所然家種种事成"
+        "方多經经麼么去法學学如都同現现當当沒没動动面起看定天分還还進进好小部其些主樣样"
+        "理心她本前開开但因只從从想實实，。！？、「」"
+    )
+
+    _cache: Dict[Tuple[str, int, int], str] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _cache_key(cls, path: str) -> Tuple[str, int, int]:
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def _bom_encoding(data: bytes) -> Optional[str]:
+        if data.startswith(codecs.BOM_UTF8):
+            return "utf-8-sig"
+        if data.startswith(codecs.BOM_UTF16_LE) or data.startswith(codecs.BOM_UTF16_BE):
+            return "utf-16"
+        return None
+
+    @staticmethod
+    def _try_decode(sample: bytes, encoding: str) -> Optional[str]:
+        # 取樣可能切在多位元組字元中間，用 incremental decoder 忽略尾端不完整的位元組
+        decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+        try:
+            return decoder.decode(sample, final=False)
+        except UnicodeDecodeError:
+            return None
+
+    @classmethod
+    def sniff(cls, data: bytes) -> str:
+        """由 BOM 或前段取樣判斷編碼"""
+        encoding = cls._bom_encoding(data)
+        if encoding:
+            return encoding
+
+        sample = data[: cls.SAMPLE_SIZE]
+        if cls._try_decode(sample, "utf-8") is not None:
+            return "utf-8"
+
+        best, best_score = None, -1
+        for encoding in cls.FALLBACK_ENCODINGS:
+            text = cls._try_decode(sample, encoding)
+            if text is None:
+                continue
+            score = sum(1 for ch in text if ch in cls.COMMON_CHARS)
+            if score > best_score:
+                best, best_score = encoding, score
+        return best or "utf-8"
+
+    @classmethod
+    def read_bytes(cls, path: str) -> Tuple[bytes, str]:
+        """讀入檔案並判斷編碼，回傳 (原始內容, 編碼)"""
+        with open(path, "rb") as f:
+            data = f.read()
+
+        key = cls._cache_key(path)
+        with cls._lock:
+            encoding = cls._cache.get(key)
+        if encoding is None:
+            encoding = cls.sniff(data)
+            with cls._lock:
+                cls._cache[key] = encoding
+        return data, encoding
+
+    @classmethod
+    def detect_encoding(cls, path: str) -> str:
+        """
+        判斷檔案編碼 (給 pysrt / pysubs2 等自行開檔的函式庫使用)
+
+        只讀取 BOM 與前段取樣，不讀整個檔案
+        """
+        key = cls._cache_key(path)
+        with cls._lock:
+            encoding = cls._cache.get(key)
+        if encoding is None:
+            with open(path, "rb") as f:
+                encoding = cls.sniff(f.read(cls.SAMPLE_SIZE))
+            with cls._lock:
+                cls._cache[key] = encoding
+        return encoding
+
+    @classmethod
+    def read_text(cls, path: str) -> str:
+        """
+        讀取字幕檔為字串
+
+        Args:
+            path: 檔案路徑
+
+        Returns:
+            解碼後的內容，換行統一為 \\n
+        """
+        data, encoding = cls.read_bytes(path)
+        try:
+            text = data.decode(encoding)
+        except UnicodeDecodeError:
+            # 取樣之後才出現的錯誤位元組，以替代字元保留其餘內容
+            print(f"⚠️ {os.path.basename(path)} 含有無法以 {encoding} 解碼的字元")
+            text = data.decode(encoding, errors="replace")
+
+        if text.startswith("\ufeff"):
+            text = text[1:]
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    @classmethod
+    def read_lines(cls, path: str) -> List[str]:
+        return cls.read_text(path).split("\n")
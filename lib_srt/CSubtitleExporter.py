@@ -0,0 +1,168 @@
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence, Tuple
+
+from lib_srt.CCueTrack import CCueTrack, times_to_ms
+
+# 由資料庫字幕即時產生 SRT / VTT / ASS / JSON
+# 產生結果以 (影片, 版本, 格式, 語言) 為鍵快取在記憶體與磁碟；
+# 版本為字幕內容的雜湊，字幕一修改版本就不同，舊的快取不會再被命中
+
+# 格式對應的 Content-Type
+MEDIA_TYPES = {
+    "srt": "application/x-subrip; charset=utf-8",
+    "vtt": "text/vtt; charset=utf-8",
+    "ass": "text/x-ssa; charset=utf-8",
+    "json": "application/json",
+}
+LANGS = ("en", "zh", "dual")
+
+CacheKey = Tuple[str, str, str, str]
+
+
+def _text(row, lang: str) -> str:
+    en = (row.en_text or "").strip()
+    zh = (row.zh_text or "").strip()
+    if lang == "en":
+        return en
+    if lang == "zh":
+        return zh
+    return "\n".join(t for t in (en, zh) if t)
+
+
+def render(rows: Sequence, fmt: str, lang: str) -> bytes:
+    """
+    將字幕資料列轉為指定格式
+
+    Args:
+        rows: 依 seq 排序的 Subtitle (需有 seq / start_time / end_time / en_text / zh_text)
+        fmt: srt / vtt / ass / json
+        lang: en / zh / dual (中英對照)
+    """
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"不支援的格式: {fmt}")
+    if lang not in LANGS:
+        raise ValueError(f"不支援的語言: {lang}")
+
+    rows = [r for r in rows if _text(r, lang)]
+    if fmt == "json":
+        data = []
+        for r in rows:
+            item = {
+                "seq": r.seq,
+                "start_time": (r.start_time or "").strip(),
+                "end_time": (r.end_time or "").strip(),
+            }
+            if lang in ("en", "dual"):
+                item["en_text"] = (r.en_text or "").strip()
+            if lang in ("zh", "dual"):
+                item["zh_text"] = (r.zh_text or "").strip()
+            data.append(item)
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    track = CCueTrack(
+        times_to_ms([(r.start_time or "").strip() for r in rows]),
+        times_to_ms([(r.end_time or "").strip() for r in rows]),
+        [_text(r, lang) for r in rows],
+    )
+    return track.dumps(fmt).encode("utf-8")
+
+
+class CSubtitleExporter:
+    def __init__(self, cache_dir: Optional[str] = None, max_items: int = 256):
+        """
+        Args:
+            cache_dir: 磁碟快取目錄，None 表示只快取在記憶體
+            max_items: 記憶體中最多保留的輸出數 (LRU)
+        """
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self._memory: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ===== 磁碟 =====
+    @staticmethod
+    def _safe_name(video_id: str) -> str:
+        return re.sub(r"[^\w-]", "_", video_id)
+
+    def _video_dir(self, video_id: str) -> str:
+        return os.path.join(self.cache_dir, self._safe_name(video_id))
+
+    def _disk_path(self, key: CacheKey) -> str:
+        video_id, revision, fmt, lang = key
+        return os.path.join(self._video_dir(video_id), f"{revision}.{lang}.{fmt}")
+
+    def _read_disk(self, key: CacheKey) -> Optional[bytes]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: CacheKey, data: bytes):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp, "wb") as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError as e:
+            print(f"⚠️ 字幕快取寫入失敗: {e}")
+
+    # ===== 記憶體 =====
+    def _remember(self, key: CacheKey, data: bytes):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    # ===== 對外 =====
+    def export(
+        self,
+        video_id: str,
+        revision: str,
+        fmt: str,
+        lang: str,
+        load_rows: Callable[[], Sequence],
+    ) -> bytes:
+        """
+        取得輸出內容，未命中快取時才呼叫 load_rows 讀取字幕並轉換
+
+        Args:
+            video_id: 影片 ID
+            revision: 字幕版本 (內容雜湊)
+            fmt: srt / vtt / ass / json
+            lang: en / zh / dual
+            load_rows: 讀取字幕資料列的函式
+        """
+        key = (video_id, revision, fmt, lang)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+
+        data = self._read_disk(key)
+        if data is None:
+            data = render(load_rows(), fmt, lang)
+            self._write_disk(key, data)
+        self._remember(key, data)
+        return data
+
+    def invalidate(self, video_id: str):
+        """清除某部影片所有版本的快取 (字幕修改後呼叫)"""
+        with self._lock:
+            for key in [k for k in self._memory if k[0] == video_id]:
+                del self._memory[key]
+        if self.cache_dir:
+            shutil.rmtree(self._video_dir(video_id), ignore_errors=True)
@@ -0,0 +1,342 @@
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, deque
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 字幕文字校正引擎
+# 1. 常見錯字表編譯成 Aho-Corasick 自動機，一次掃描完成所有替換
+# 2. 整份字幕與參考原文只做一次單調 (banded) 對齊，
+#    每條字幕再從對齊結果取出對應的原文片段
+
+# 歸屬到下一條字幕的開頭符號
+_OPENING = set("「『（(《〈“‘[【")
+
+
+class AhoCorasick:
+    """多字串比對自動機"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # 在此節點結束的樣式長度 (0 表示沒有)
+        self.length: List[int] = [0]
+        # fail 鏈上最近一個有樣式結束的節點 (output link)，0 表示沒有
+        self.output: List[int] = [0]
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.length.append(0)
+                self.output.append(0)
+            node = nxt
+        self.length[node] = len(pattern)
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                fail = self.goto[f].get(ch, 0)
+                self.fail[nxt] = fail
+                self.output[nxt] = fail if self.length[fail] else self.output[fail]
+
+    def matches(self, text: str) -> List[Tuple[int, int]]:
+        """
+        找出所有比對結果 (包含重疊與互相包含的)
+
+        Returns:
+            [(開始位置, 長度)]，依結束位置排序
+        """
+        found = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            # 此節點本身與 output link 上的每個樣式都在 i 結束
+            hit = node if self.length[node] else self.output[node]
+            while hit:
+                found.append((i + 1 - self.length[hit], self.length[hit]))
+                hit = self.output[hit]
+        return found
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """
+        找出最左最長、互不重疊的比對結果
+
+        Returns:
+            [(開始位置, 長度)]
+        """
+        # 依開始位置排序，同位置取最長，再依序挑出不重疊者
+        candidates = sorted(self.matches(text), key=lambda m: (m[0], -m[1]))
+        result = []
+        last_end = 0
+        for start, length in candidates:
+            if start >= last_end:
+                result.append((start, length))
+                last_end = start + length
+        return result
+
+
+def _is_text_char(ch: str) -> bool:
+    """對齊時只比較文字，忽略標點與空白"""
+    return not (ch.isspace() or unicodedata.category(ch)[0] in "PZS")
+
+
+def banded_pairs(a: str, b: str, band: int) -> List[Tuple[int, int]]:
+    """
+    限制在對角帶內的編輯距離對齊
+
+    Returns:
+        對齊到一起的 (a 位置, b 位置) (相同或替換)，依位置遞增
+    """
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return []
+
+    # 帶寬包含長度差，保證終點在帶內
+    lo_off = -band + min(0, m - n)
+    hi_off = band + max(0, m - n)
+
+    los: List[int] = []
+    moves: List[bytearray] = []
+    prev: List[int] = []
+    prev_lo = prev_hi = 0
+    inf = n + m + 1
+
+    for i in range(n + 1):
+        lo = max(0, i + lo_off)
+        hi = min(m, i + hi_off)
+        cur = [0] * (hi - lo + 1)
+        mv = bytearray(hi - lo + 1)
+        ai = a[i - 1] if i else ""
+        for j in range(lo, hi + 1):
+            if i == 0:
+                cur[j - lo] = j
+                mv[j - lo] = 2
+                continue
+            best, move = inf, 0
+            if j and prev_lo <= j - 1 <= prev_hi:
+                best = prev[j - 1 - prev_lo] + (ai != b[j - 1])
+            if prev_lo <= j <= prev_hi and prev[j - prev_lo] + 1 < best:
+                best, move = prev[j - prev_lo] + 1, 1
+            if j > lo and cur[j - 1 - lo] + 1 < best:
+                best, move = cur[j - 1 - lo] + 1, 2
+            cur[j - lo] = best
+            mv[j - lo] = move
+        los.append(lo)
+        moves.append(mv)
+        prev, prev_lo, prev_hi = cur, lo, hi
+
+    pairs = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        move = moves[i][j - los[i]]
+        if move == 0:
+            i, j = i - 1, j - 1
+            pairs.append((i, j))
+        elif move == 1:
+            i -= 1
+        else:
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+
+class CTextCorrector:
+    def __init__(
+        self,
+        errors: Dict[str, str],
+        anchor_size: int = 4,
+        band: int = 32,
+        min_ratio: float = 0.6,
+    ):
+        """
+        Args:
+            errors: 錯字對照表 {錯誤: 正確}
+            anchor_size: 對齊錨點長度 (兩邊都只出現一次的 n-gram)
+            band: 錨點之間做編輯距離對齊時的帶寬
+            min_ratio: 字幕與原文片段相似度低於此值時不採用原文
+        """
+        self.errors = {k: v for k, v in errors.items() if k and k != v}
+        self.automaton = AhoCorasick(list(self.errors))
+        self.anchor_size = anchor_size
+        self.band = band
+        self.min_ratio = min_ratio
+
+    # ===== 錯字表 =====
+    def replace_errors(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        一次掃描替換所有錯字
+
+        Returns:
+            (校正後文字, [(錯誤, 正確)])
+        """
+        matches = self.automaton.find_all(text)
+        if not matches:
+            return text, []
+
+        parts = []
+        applied = []
+        pos = 0
+        for start, length in matches:
+            wrong = text[start : start + length]
+            parts.append(text[pos:start])
+            parts.append(self.errors[wrong])
+            applied.append((wrong, self.errors[wrong]))
+            pos = start + length
+        parts.append(text[pos:])
+        return "".join(parts), applied
+
+    # ===== 對齊 =====
+    def _anchors(self, a: str, b: str) -> List[Tuple[int, int, int]]:
+        """找出單調遞增的錨點鏈 [(a 位置, b 位置, 長度)]"""
+        k = self.anchor_size
+        if len(a) < k or len(b) < k:
+            return []
+
+        count_a = Counter(a[i : i + k] for i in range(len(a) - k + 1))
+        count_b = Counter(b[i : i + k] for i in range(len(b) - k + 1))
+        pos_b = {}
+        for i in range(len(b) - k + 1):
+            gram = b[i : i + k]
+            if count_b[gram] == 1 and count_a[gram] == 1:
+                pos_b[gram] = i
+
+        candidates = []
+        for i in range(len(a) - k + 1):
+            j = pos_b.get(a[i : i + k])
+            if j is not None:
+                candidates.append((i, j))
+
+        # b 位置的最長遞增子序列
+        tails: List[int] = []
+        tail_idx: List[int] = []
+        parent = [-1] * len(candidates)
+        for idx, (_, j) in enumerate(candidates):
+            p = bisect_left(tails, j)
+            if p == len(tails):
+                tails.append(j)
+                tail_idx.append(idx)
+            else:
+                tails[p] = j
+                tail_idx[p] = idx
+            parent[idx] = tail_idx[p - 1] if p else -1
+        chain = []
+        idx = tail_idx[-1] if tail_idx else -1
+        while idx != -1:
+            chain.append(candidates[idx])
+            idx = parent[idx]
+        chain.reverse()
+
+        # 同一對角線上相鄰的錨點合併成一段，交錯的捨棄
+        segments: List[List[int]] = []
+        for i, j in chain:
+            if segments:
+                si, sj, length = segments[-1]
+                if i - si == j - sj and i <= si + length:
+                    segments[-1][2] = i + k - si
+                    continue
+                if i < si + length or j < sj + length:
+                    continue
+            segments.append([i, j, k])
+        return [tuple(s) for s in segments]
+
+    def _align(self, a: str, b: str) -> List[Tuple[int, int]]:
+        """整段對齊，回傳 (a 位置, b 位置) 對應"""
+        pairs: List[Tuple[int, int]] = []
+
+        def gap(a0: int, a1: int, b0: int, b1: int):
+            if a1 <= a0 or b1 <= b0:
+                return
+            if (b1 - b0) > 2 * (a1 - a0) + self.band:
+                # 原文遠長於字幕 (字幕只涵蓋其中一段)，改找共同區塊，不強迫頭尾對齊
+                matcher = SequenceMatcher(None, a[a0:a1], b[b0:b1], autojunk=False)
+                for i, j, size in matcher.get_matching_blocks():
+                    pairs.extend((a0 + i + t, b0 + j + t) for t in range(size))
+                return
+            for i, j in banded_pairs(a[a0:a1], b[b0:b1], self.band):
+                pairs.append((a0 + i, b0 + j))
+
+        ai = bi = 0
+        for i, j, length in self._anchors(a, b):
+            gap(ai, i, bi, j)
+            pairs.extend((i + t, j + t) for t in range(length))
+            ai, bi = i + length, j + length
+        gap(ai, len(a), bi, len(b))
+        return pairs
+
+    def align(self, texts: Sequence[str], reference: str) -> List[Optional[str]]:
+        """
+        將多條字幕一次對齊到參考原文
+
+        Args:
+            texts: 依序排列的字幕文字
+            reference: 參考原文
+
+        Returns:
+            每條字幕對應的原文片段 (含原文標點)，對不上時為 None
+        """
+        # 只保留文字字元，並記錄原文位置
+        ref_idx = [i for i, ch in enumerate(reference) if _is_text_char(ch)]
+        clean_ref = "".join(reference[i] for i in ref_idx)
+
+        bounds = []
+        parts = []
+        pos = 0
+        for text in texts:
+            clean = "".join(ch for ch in text if _is_text_char(ch))
+            parts.append(clean)
+            bounds.append((pos, pos + len(clean)))
+            pos += len(clean)
+        clean_hyp = "".join(parts)
+
+        pairs = self._align(clean_hyp, clean_ref)
+        pair_a = [p[0] for p in pairs]
+
+        spans: List[Optional[Tuple[int, int]]] = []
+        for start, end in bounds:
+            k1 = bisect_left(pair_a, start)
+            k2 = bisect_left(pair_a, end)
+            if k1 == k2:
+                spans.append(None)
+                continue
+            matched = sum(1 for i, j in pairs[k1:k2] if clean_hyp[i] == clean_ref[j])
+            j_min, j_max = pairs[k1][1], pairs[k2 - 1][1]
+            ratio = 2 * matched / ((end - start) + (j_max - j_min + 1))
+            spans.append((j_min, j_max) if ratio >= self.min_ratio else None)
+
+        results: List[Optional[str]] = []
+        for span in spans:
+            if span is None:
+                results.append(None)
+                continue
+            j_min, j_max = span
+            s = ref_idx[j_min]
+            e = ref_idx[j_max] + 1
+            # 前面緊接的開頭符號與後面緊接的結尾標點併入此字幕
+            while s > 0 and reference[s - 1] in _OPENING:
+                s -= 1
+            while (
+                e < len(reference)
+                and not _is_text_char(reference[e])
+                and reference[e] not in _OPENING
+            ):
+                e += 1
+            results.append(reference[s:e].strip())
+        return results
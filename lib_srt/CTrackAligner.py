@@ -0,0 +1,195 @@
+import re
+from typing import List, Sequence, Tuple
+
+from lib_srt.CCueTrack import CCueTrack
+
+# 中英字幕對齊：兩條各自計時的字幕軌依時間重疊配對
+# 主軌 (通常是英文) 的時間與斷句保持不變，副軌 (中文) 的每一條字幕
+# 歸到重疊最多的主軌字幕；跨越多條主軌字幕時依重疊時間比例切開，
+# 多條副軌落在同一條主軌時合併。兩軌都依時間排序，以雙指標一次掃描完成 O(N+M)
+
+# (開始毫秒, 結束毫秒, 主軌文字, 副軌文字)
+AlignedCue = Tuple[int, int, str, str]
+
+# 切開副軌文字時優先落在這些標點之後
+_BREAK_CHARS = set("，。、；：！？,.;:!? ")
+
+
+def split_text(text: str, weights: Sequence[float]) -> List[str]:
+    """
+    依比例切開文字
+
+    有空白的文字以字詞為單位，否則 (中文) 以字元為單位；
+    切點會往附近的標點靠，避免把詞切斷
+    """
+    total = sum(weights)
+    if len(weights) == 1 or total <= 0:
+        return [text] + [""] * (len(weights) - 1)
+
+    spaced = " " in text.strip()
+    units = text.split() if spaced else list(text)
+    n = len(units)
+    cuts = []
+    acc = 0.0
+    prev = 0
+    for w in weights[:-1]:
+        acc += w
+        cut = min(max(round(n * acc / total), prev), n)
+        if not spaced:
+            # 前後 3 個字內有標點就切在標點後
+            for d in (0, 1, -1, 2, -2, 3, -3):
+                c = cut + d
+                if prev < c < n and units[c - 1] in _BREAK_CHARS:
+                    cut = c
+                    break
+        cuts.append(cut)
+        prev = cut
+    cuts.append(n)
+
+    parts = []
+    start = 0
+    joiner = " " if spaced else ""
+    for cut in cuts:
+        parts.append(joiner.join(units[start:cut]).strip())
+        start = cut
+    return parts
+
+
+class CTrackAligner:
+    def __init__(
+        self,
+        tie_break: str = "earlier",
+        split: bool = True,
+        split_min_ratio: float = 0.3,
+        max_gap_ms: int = 500,
+    ):
+        """
+        Args:
+            tie_break: 副軌字幕與兩條主軌字幕重疊相同時，
+                       歸到前一條 ("earlier") 或後一條 ("later")
+            split: 副軌字幕跨越多條主軌字幕時是否依重疊比例切開
+            split_min_ratio: 重疊佔副軌字幕長度此比例以上的主軌字幕才分到切開的文字
+            max_gap_ms: 副軌字幕沒有重疊時，歸到此距離內最近的主軌字幕；
+                        超過時自成一條 (主軌文字為空)，不遺失內容
+        """
+        if tie_break not in ("earlier", "later"):
+            raise ValueError("tie_break 只能是 earlier 或 later")
+        self.tie_break = tie_break
+        self.split = split
+        self.split_min_ratio = split_min_ratio
+        self.max_gap_ms = max_gap_ms
+
+    def _targets(
+        self, overlaps: List[Tuple[int, int]], duration: int
+    ) -> List[Tuple[int, int]]:
+        """由重疊清單 [(主軌位置, 重疊毫秒)] 決定副軌字幕要分給哪些主軌字幕"""
+        if self.split and len(overlaps) > 1:
+            min_ms = max(duration, 1) * self.split_min_ratio
+            chosen = [(i, ms) for i, ms in overlaps if ms >= min_ms]
+            if len(chosen) > 1:
+                return chosen
+
+        if self.tie_break == "earlier":
+            best = max(overlaps, key=lambda o: (o[1], -o[0]))
+        else:
+            best = max(overlaps, key=lambda o: (o[1], o[0]))
+        return [best]
+
+    def align(self, primary: CCueTrack, secondary: CCueTrack) -> List[AlignedCue]:
+        """
+        對齊兩條字幕軌
+
+        Args:
+            primary: 主軌 (時間與斷句以此為準)
+            secondary: 副軌
+
+        Returns:
+            依時間排序的 [(開始毫秒, 結束毫秒, 主軌文字, 副軌文字)]
+        """
+        p_starts = primary.starts.tolist()
+        p_ends = primary.ends.tolist()
+        s_starts = secondary.starts.tolist()
+        s_ends = secondary.ends.tolist()
+        n = len(p_starts)
+
+        assigned: List[List[str]] = [[] for _ in range(n)]
+        # 沒有配對的副軌字幕 (插在第幾條主軌字幕之前, 開始, 結束, 文字)
+        orphans: List[Tuple[int, int, int, str]] = []
+
+        i = 0
+        for s_start, s_end, text in zip(s_starts, s_ends, secondary.texts):
+            text = " ".join(text.split())
+            if not text:
+                continue
+            # 主軌指標只前進不後退：結束時間在副軌開始前的主軌字幕不會再被用到
+            while i < n and p_ends[i] <= s_start:
+                i += 1
+
+            overlaps = []
+            k = i
+            while k < n and p_starts[k] < s_end:
+                ms = min(p_ends[k], s_end) - max(p_starts[k], s_start)
+                if ms > 0:
+                    overlaps.append((k, ms))
+                k += 1
+
+            if overlaps:
+                targets = self._targets(overlaps, s_end - s_start)
+                pieces = split_text(text, [ms for _, ms in targets])
+                for (k, _), piece in zip(targets, pieces):
+                    if piece:
+                        assigned[k].append(piece)
+                continue
+
+            # 沒有重疊：找前後最近的主軌字幕
+            gap_prev = s_start - p_ends[i - 1] if i > 0 else None
+            gap_next = p_starts[i] - s_end if i < n else None
+            candidates = [
+                (gap, k)
+                for gap, k in ((gap_prev, i - 1), (gap_next, i))
+                if gap is not None and gap <= self.max_gap_ms
+            ]
+            if candidates:
+                if self.tie_break == "earlier":
+                    _, k = min(candidates)
+                else:
+                    _, k = min(candidates, key=lambda c: (c[0], -c[1]))
+                assigned[k].append(text)
+            else:
+                orphans.append((i, s_start, s_end, text))
+
+        joiner = self._joiner(secondary.texts)
+        result: List[AlignedCue] = []
+        o = 0
+        for k in range(n):
+            while o < len(orphans) and orphans[o][0] <= k:
+                _, s, e, text = orphans[o]
+                result.append((s, e, "", text))
+                o += 1
+            primary_text = primary.texts[k].strip()
+            secondary_text = joiner.join(assigned[k])
+            result.append((p_starts[k], p_ends[k], primary_text, secondary_text))
+        for _, s, e, text in orphans[o:]:
+            result.append((s, e, "", text))
+        return result
+
+    @staticmethod
+    def _joiner(texts: Sequence[str]) -> str:
+        # 中文合併時不加空白
+        sample = "".join(texts[:20])
+        return "" if re.search(r"[\u4e00-\u9fff]", sample) else " "
+
+    def align_files(self, primary_path: str, secondary_path: str) -> List[AlignedCue]:
+        """讀取兩個字幕檔並對齊"""
+        primary = CCueTrack.from_file(primary_path).sort()
+        secondary = CCueTrack.from_file(secondary_path).sort()
+        return self.align(primary, secondary)
+
+    @staticmethod
+    def to_track(cues: Sequence[AlignedCue]) -> CCueTrack:
+        """轉為中英兩行的 CCueTrack"""
+        return CCueTrack(
+            [c[0] for c in cues],
+            [c[1] for c in cues],
+            ["\n".join(t for t in (c[2], c[3]) if t) for c in cues],
+        )
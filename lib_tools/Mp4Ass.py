@@ -1,7 +1,14 @@
+import os
 import subprocess
 from pathlib import Path
 import sys
-import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CSegmentRender import CSegmentRender
 
 
 def check_ffmpeg():
@@ -12,21 +19,9 @@ def check_ffmpeg():
         return False
 
 
-def normalize_path_for_ffmpeg(path: Path) -> str:
-    if sys.platform == "win32":
-        return str(path.resolve()).replace("\\", "/").replace(":", "\\:")
-    return str(path.resolve())
-
-
-def show_progress(seconds: int):
-    for i in range(seconds):
-        bar = "█" * (i + 1) + "-" * (seconds - i - 1)
-        print(f"\r⏳ 處理中 [{bar}] {i+1}/{seconds} 秒", end="")
-        time.sleep(1)
-    print()
-
-
-def embed_subtitles_with_background(mp4_path: str, ass_path: str, output_path: str):
+def embed_subtitles_with_background(
+    mp4_path: str, ass_path: str, output_path: str, work_dir: str = None
+):
     mp4_file = Path(mp4_path)
     ass_file = Path(ass_path)
     output_file = Path(output_path)
@@ -38,48 +33,23 @@ def embed_subtitles_with_background(mp4_path: str, ass_path: str, output_path: s
         print(f"❌ 找不到字幕檔案：{ass_file}")
         return False
 
-    video_input = str(mp4_file.resolve())
-    subtitle_input = normalize_path_for_ffmpeg(ass_file)
-
     # 背景 + 字幕一起
-    filter_str = f"drawbox=y=ih*2/3:h=ih/3:color=navy@0.6:t=fill,ass='{subtitle_input}'"
-
-    cmd = [
-        "ffmpeg",
-        "-i",
-        video_input,
-        "-vf",
-        filter_str,
-        "-c:v",
-        "libx264",
-        "-preset",
-        "medium",
-        "-crf",
-        "18",
-        "-c:a",
-        "copy",
-        "-movflags",
-        "+faststart",
-        "-y",
-        str(output_file),
-    ]
+    filter_str = "drawbox=y=ih*2/3:h=ih/3:color=navy@0.6:t=fill,ass='{sub}'"
+
+    # 分段編碼，字幕修改後只重新編碼受影響的片段
+    if work_dir is None:
+        work_dir = str(output_file.with_suffix(".segments"))
 
     print("\n🔧 開始轉檔，請稍候...")
     print(f"📋 FFmpeg 濾鏡：{filter_str}")
 
-    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    show_progress(5)  # 模擬進度條 5 秒
-
-    stdout, stderr = process.communicate()
-
-    if process.returncode == 0:
+    renderer = CSegmentRender(work_dir)
+    if renderer.render(str(mp4_file), str(ass_file), str(output_file), filter_str):
         print("✅ 成功嵌入字幕與背景色塊！")
-        print(f"📁 影片已輸出至：{output_file}")
         return True
-    else:
-        print("❌ 發生錯誤：")
-        print(stderr.decode())
-        return False
+
+    print("❌ 發生錯誤，請檢查 FFmpeg 訊息")
+    return False
 
 
 def main():
@@ -3,6 +3,7 @@
 FFmpeg 字幕嵌入工具（含底部深藍背景 + 中英文分色樣式）
 """
 
+import os
 import subprocess
 from pathlib import Path
 import sys
@@ -10,6 +11,13 @@ import re
 
 from pysubs2 import SSAFile, Color, Alignment
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CSrtLoader import CSrtLoader
+
 
 def check_ffmpeg() -> bool:
     try:
@@ -28,7 +36,9 @@ def convert_srt_to_ass(srt_path: str) -> Path:
     ass_file = srt_file.with_suffix(".ass")
 
     subs = SSAFile()
-    srt_subs = SSAFile.load(str(srt_file), encoding="utf-8")
+    srt_subs = SSAFile.load(
+        str(srt_file), encoding=CSrtLoader.detect_encoding(str(srt_file))
+    )
 
     subs.info["PlayResX"] = "1920"
     subs.info["PlayResY"] = "1080"
@@ -5,6 +5,13 @@ import os
 import subprocess
 from typing import Optional, List
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CSegmentRender import CSegmentRender
+
 
 def format_timestamp(seconds: float) -> str:
     """格式化時間戳記為 SRT 格式"""
@@ -200,41 +207,22 @@ def burn_subtitles(
     print(f"📹 輸出影片：{output_path}")
     print("-" * 50)
 
-    try:
-        # 構建 FFmpeg 命令（燒錄字幕）
-        cmd = [
-            "ffmpeg",
-            "-i",
-            str(video_path),
-            "-vf",
-            f"subtitles={str(srt_path)}",  # 使用 subtitles 濾鏡
-            "-c:a",
-            "copy",  # 複製音訊流
-            "-y",  # 覆寫輸出檔案
-            str(output_path),
-        ]
+    # 分段編碼並保留片段，字幕修改後只重新編碼受影響的片段
+    work_dir = str(Path(output_path).with_suffix(".segments"))
 
+    try:
         print("🔄 開始燒錄字幕...")
-        print("   ⚠️  注意：燒錄字幕需要重新編碼，時間較長")
-
-        # 執行 FFmpeg 命令
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=600  # 10分鐘超時
-        )
+        print("   ⚠️  注意：燒錄字幕需要重新編碼，只有字幕變動的片段會重新編碼")
 
-        if result.returncode == 0:
+        renderer = CSegmentRender(work_dir)
+        if renderer.render(str(video_path), str(srt_path), str(output_path)):
             print("✅ 字幕燒錄成功！")
             print(f"   📹 輸出檔案：{output_path}")
             return True
         else:
             print("❌ 字幕燒錄失敗")
-            print("FFmpeg 錯誤訊息：")
-            print(result.stderr)
             return False
 
-    except subprocess.TimeoutExpired:
-        print("❌ 處理超時（超過10分鐘）")
-        return False
     except Exception as e:
         print(f"❌ 燒錄字幕時發生錯誤：{e}")
         return False
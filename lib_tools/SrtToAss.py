@@ -1,9 +1,18 @@
+import os
 import re
+import sys
 from pathlib import Path
 import pysubs2
 from pysubs2 import SSAFile, SSAEvent, SSAStyle, Color, Alignment
 import textwrap
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CSrtLoader import CSrtLoader
+
 
 def wrap_text(text: str, max_width: int = 50) -> str:
     """處理文字折行，英文按單詞折行，中文按字元折行"""
@@ -39,7 +48,7 @@ def srt_en_zh_to_ass(srt_path: str, ass_path: str):
     srt_file = Path(srt_path)
     ass_file = Path(ass_path)
 
-    subs = pysubs2.load(str(srt_file), encoding="utf-8")
+    subs = pysubs2.load(str(srt_file), encoding=CSrtLoader.detect_encoding(srt_path))
 
     # 建立 ASS 檔
     ass_subs = SSAFile()
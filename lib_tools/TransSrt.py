@@ -2,8 +2,16 @@
 import pysrt
 from googletrans import Translator
 import os
+import sys
 import time
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CSrtLoader import CSrtLoader
+
 
 def translate_and_merge_srt(
     input_file, output_file, source_lang="en", target_lang="zh-tw", delay=0.5
@@ -13,7 +21,7 @@ def translate_and_merge_srt(
         return False
 
     try:
-        subs = pysrt.open(input_file, encoding="utf-8")
+        subs = pysrt.open(input_file, encoding=CSrtLoader.detect_encoding(input_file))
         translator = Translator()
         successful = 0
         failed = 0
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+# 每部影片的產出清單 (manifest.json)
+# 下載 / 轉錄 / 翻譯各階段完成後才記錄產出檔的大小、修改時間與 SHA-256，
+# 重跑時已記錄且檔案未變的階段直接略過；中斷時留下的半成品沒有記錄，會重新產生。
+# 每個項目也記下上游項目的雜湊 (例如字幕記錄音訊的雜湊)，上游重新產生後下游自動失效
+
+MANIFEST_NAME = "manifest.json"
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class CArtifactManifest:
+    def __init__(self, video_dir: str, video_id: Optional[str] = None):
+        """
+        Args:
+            video_dir: 影片的輸出目錄，manifest.json 存在這裡
+            video_id: 影片 ID (只記錄在清單中)
+        """
+        self.video_dir = video_dir
+        self.video_id = video_id
+        self.path = os.path.join(video_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self.artifacts: Dict[str, dict] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.artifacts = json.load(f).get("artifacts", {})
+        except (OSError, ValueError):
+            pass
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _save(self):
+        data = {"video_id": self.video_id, "artifacts": self.artifacts}
+        temp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(self.video_dir, exist_ok=True)
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp, self.path)
+
+    def file_path(self, name: str) -> Optional[str]:
+        """項目的檔案絕對路徑，沒有記錄或沒有檔案的項目回傳 None"""
+        entry = self.artifacts.get(name)
+        if not entry or not entry.get("path"):
+            return None
+        return os.path.join(self.video_dir, entry["path"])
+
+    def valid(self, name: str) -> bool:
+        """
+        項目是否已完成且仍有效：
+        檔案存在、大小相同、內容雜湊相同 (修改時間沒變時不重新計算)，且上游項目沒有重新產生
+        """
+        with self._lock:
+            entry = self.artifacts.get(name)
+            if entry is None:
+                return False
+            for upstream, sha in entry.get("inputs", {}).items():
+                if self.artifacts.get(upstream, {}).get("sha256") != sha:
+                    return False
+            path = self.file_path(name)
+            if path is None:
+                return True
+
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            if st.st_size != entry["size"]:
+                return False
+            if st.st_mtime_ns != entry["mtime_ns"]:
+                if file_sha256(path) != entry["sha256"]:
+                    return False
+                entry["mtime_ns"] = st.st_mtime_ns
+                self._save()
+            return True
+
+    def complete(self, names: Iterable[str]) -> bool:
+        return all(self.valid(name) for name in names)
+
+    def record(
+        self,
+        name: str,
+        path: Optional[str] = None,
+        inputs: Iterable[str] = (),
+        **meta,
+    ) -> dict:
+        """
+        記錄完成的項目 (階段完成後才呼叫)
+
+        Args:
+            name: 項目名稱，例如 audio / thumbnail / srt / srt_translated
+            path: 產出檔，None 表示沒有檔案的階段 (例如寫入資料庫)
+            inputs: 上游項目名稱，記錄其雜湊作為相依
+            meta: 其他要記錄的資訊
+        """
+        entry = {"updated_at": time.time(), "meta": meta}
+        if path is not None:
+            st = os.stat(path)
+            entry.update(
+                path=os.path.relpath(path, self.video_dir),
+                size=st.st_size,
+                mtime_ns=st.st_mtime_ns,
+                sha256=file_sha256(path),
+            )
+        with self._lock:
+            entry["inputs"] = {
+                upstream: self.artifacts[upstream].get("sha256")
+                for upstream in inputs
+                if upstream in self.artifacts
+            }
+            self.artifacts[name] = entry
+            self._save()
+        return entry
+
+    def invalidate(self, name: str):
+        with self._lock:
+            if self.artifacts.pop(name, None) is not None:
+                self._save()
@@ -0,0 +1,349 @@
+import glob
+import hashlib
+import os
+import struct
+import subprocess
+import tempfile
+import threading
+import wave
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from lib_util.CFFmpeg import CFFmpeg
+
+# 音訊解碼一次，後續各階段共用
+# 以 ffmpeg 把來源 (mp3 / m4a / webm / mp4 ...) 解碼成 PCM 存成可 memmap 的檔案：
+#   - 16 kHz 單聲道 float32：Whisper / VAD 直接使用，不需要再轉換
+#   - 原始取樣率 int16：切割片段、波形等需要完整音質的用途
+# 檔案 = 64 bytes 標頭 + little-endian 交錯 PCM
+# 標頭記錄來源大小與修改時間，來源更動時自動重新解碼
+# PCM 很大 (16 kHz float32 約 230 MB / 小時，原始取樣率 int16 約 635 MB / 小時)，
+# 統一放在快取目錄，超過上限時刪除最久沒用到的檔案
+
+_MAGIC = b"YTPCM\x00\x01\x00"
+# magic, 取樣率, 聲道數, 樣本型別, 樣本數, 來源大小, 來源修改時間 (ns)
+_HEADER = struct.Struct("<8sIHHQQq")
+HEADER_SIZE = 64
+
+_DTYPES = {1: np.dtype("<i2"), 2: np.dtype("<f4")}
+_FFMPEG_FORMATS = {1: "s16le", 2: "f32le"}
+
+WHISPER_RATE = 16000
+
+
+class CPcmAudio:
+    """memmap 開啟的 PCM 音訊，samples 形狀為 (樣本數,) 或 (樣本數, 聲道)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            (
+                _,
+                self.sample_rate,
+                self.channels,
+                dtype_code,
+                self.frames,
+                _,
+                _,
+            ) = _HEADER.unpack(f.read(_HEADER.size))
+        self.dtype = _DTYPES[dtype_code]
+        shape = (self.frames,) if self.channels == 1 else (self.frames, self.channels)
+        if self.frames:
+            self.samples = np.memmap(
+                path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=shape
+            )
+        else:
+            self.samples = np.zeros(shape, dtype=self.dtype)
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    def index(self, ms: float) -> int:
+        return min(self.frames, max(0, round(ms * self.sample_rate / 1000)))
+
+    def slice(self, start_ms: float, end_ms: Optional[float] = None) -> np.ndarray:
+        """取出時間區間 (不複製)"""
+        end = self.frames if end_ms is None else self.index(end_ms)
+        return self.samples[self.index(start_ms) : end]
+
+    def float32(self) -> np.ndarray:
+        """[-1, 1] 的 float32 樣本；本身就是 float32 時不複製"""
+        if self.dtype.kind == "f":
+            return self.samples
+        return self.samples.astype(np.float32) / 32768.0
+
+    def peaks(self, buckets: int = 1000) -> np.ndarray:
+        """
+        波形資料：每個區間的 (最小值, 最大值)，範圍 [-1, 1]
+
+        Returns:
+            (buckets, 2) float32
+        """
+        data = self.samples if self.channels == 1 else self.samples.mean(axis=1)
+        buckets = max(1, min(buckets, len(data)))
+        step = len(data) // buckets
+        if step == 0:
+            return np.zeros((0, 2), dtype=np.float32)
+        blocks = np.asarray(data[: step * buckets]).reshape(buckets, step)
+        result = np.stack([blocks.min(axis=1), blocks.max(axis=1)], axis=1)
+        result = result.astype(np.float32)
+        if self.dtype.kind != "f":
+            result /= 32768.0
+        return result
+
+    def write_wav(
+        self, path: str, start_ms: float = 0, end_ms: Optional[float] = None
+    ):
+        """把時間區間寫成 16-bit WAV (不需要 ffmpeg)"""
+        data = self.slice(start_ms, end_ms)
+        if self.dtype.kind == "f":
+            data = (np.clip(data, -1.0, 1.0) * 32767).astype("<i2")
+        with wave.open(path, "wb") as w:
+            w.setnchannels(self.channels)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(np.ascontiguousarray(data, dtype="<i2").tobytes())
+
+    def export(
+        self,
+        path: str,
+        start_ms: float = 0,
+        end_ms: Optional[float] = None,
+        bitrate: str = "192k",
+    ) -> bool:
+        """
+        把時間區間編碼輸出 (依副檔名決定格式)，PCM 直接由 stdin 送給 ffmpeg，不再解碼來源
+        """
+        if path.lower().endswith(".wav"):
+            self.write_wav(path, start_ms, end_ms)
+            return True
+
+        data = self.slice(start_ms, end_ms)
+        fmt = "f32le" if self.dtype.kind == "f" else "s16le"
+        cmd = [
+            CFFmpeg.FFMPEG, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", fmt, "-ar", str(self.sample_rate), "-ac", str(self.channels),
+            "-i", "pipe:0", "-b:a", bitrate, path,
+        ]  # fmt: skip
+        result = subprocess.run(
+            cmd, input=np.ascontiguousarray(data).tobytes(), capture_output=True
+        )
+        if result.returncode != 0:
+            error = result.stderr.decode(errors="ignore")[-300:]
+            print(f"❌ FFmpeg 輸出片段失敗：{error}")
+            return False
+        return True
+
+
+def default_store_dir() -> str:
+    return os.path.join(tempfile.gettempdir(), "yt_pcm_cache")
+
+
+class CAudioStore:
+    def __init__(
+        self,
+        store_dir: Optional[str] = None,
+        max_bytes: int = 4 * 1024**3,
+        max_open: int = 8,
+    ):
+        """
+        Args:
+            store_dir: PCM 快取目錄，None 表示 default_store_dir()
+            max_bytes: 快取目錄大小上限，超過時依最後使用時間刪除 (0 表示不限制)
+            max_open: 保持開啟 (memmap) 的 PCM 數量，超過時釋放最久沒用到的
+        """
+        self.store_dir = store_dir or default_store_dir()
+        self.max_bytes = max_bytes
+        self.max_open = max_open
+        self._opened: "OrderedDict[Tuple[str, int, int, int], CPcmAudio]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        # 同一個來源同時只解碼一次
+        self._decoding: Dict[str, threading.Lock] = {}
+
+    def pcm_path(
+        self, source: str, sample_rate: int, channels: int, dtype_code: int
+    ) -> str:
+        suffix = f".{sample_rate}x{channels}.{_FFMPEG_FORMATS[dtype_code]}.pcm"
+        name = hashlib.blake2b(
+            os.path.abspath(source).encode("utf-8"), digest_size=10
+        ).hexdigest()
+        return os.path.join(self.store_dir, name + suffix)
+
+    def _release(self, path: str):
+        """不再保留 path 的 memmap (呼叫端仍持有的陣列不受影響)"""
+        for key in [k for k in self._opened if k[0] == path]:
+            del self._opened[key]
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        快取目錄超過 max_bytes 時，從最久沒用到的 PCM 開始刪除
+        (開啟中的與 keep 不刪；Windows 上仍被 memmap 的檔案無法刪除，略過)
+
+        Returns:
+            刪除的檔案數
+        """
+        if not self.max_bytes:
+            return 0
+        files = []
+        for path in glob.glob(os.path.join(self.store_dir, "*.pcm")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        with self._lock:
+            in_use = {key[0] for key in self._opened}
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep or path in in_use:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _is_current(path: str, st: os.stat_result) -> bool:
+        try:
+            with open(path, "rb") as f:
+                header = _HEADER.unpack(f.read(_HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return (
+            header[0] == _MAGIC
+            and header[5] == st.st_size
+            and header[6] == st.st_mtime_ns
+        )
+
+    def _decode(
+        self,
+        source: str,
+        path: str,
+        sample_rate: int,
+        channels: int,
+        dtype_code: int,
+        st: os.stat_result,
+    ):
+        name = os.path.basename(source)
+        print(f"[AudioStore] 解碼 {name} → {sample_rate} Hz x {channels}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        cmd = [
+            CFFmpeg.FFMPEG, "-hide_banner", "-loglevel", "error", "-nostdin",
+            "-i", source, "-vn", "-f", _FFMPEG_FORMATS[dtype_code],
+            "-ac", str(channels), "-ar", str(sample_rate), "pipe:1",
+        ]  # fmt: skip
+        try:
+            with open(temp, "wb") as f:
+                f.write(b"\x00" * HEADER_SIZE)
+                f.flush()
+                # ffmpeg 直接寫進檔案，不經過 Python 記憶體
+                result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE)
+                if result.returncode != 0:
+                    raise RuntimeError(
+                        f"ffmpeg 無法解碼 {source}："
+                        f"{result.stderr.decode(errors='ignore')[-300:]}"
+                    )
+                frames = (os.fstat(f.fileno()).st_size - HEADER_SIZE) // (
+                    _DTYPES[dtype_code].itemsize * channels
+                )
+                f.seek(0)
+                f.write(
+                    _HEADER.pack(
+                        _MAGIC,
+                        sample_rate,
+                        channels,
+                        dtype_code,
+                        frames,
+                        st.st_size,
+                        st.st_mtime_ns,
+                    )
+                )
+            os.replace(temp, path)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def open(
+        self,
+        source: str,
+        sample_rate: Optional[int] = WHISPER_RATE,
+        channels: Optional[int] = 1,
+    ) -> CPcmAudio:
+        """
+        取得來源的 PCM，尚未解碼 (或來源已更動) 時才呼叫 ffmpeg
+
+        Args:
+            source: 來源音訊 / 影片檔
+            sample_rate: 取樣率，None 表示保留原始取樣率
+            channels: 聲道數，None 表示保留原始聲道
+
+        預設 (16 kHz 單聲道) 存成 float32 供 Whisper 直接使用，其他設定存成 int16
+        """
+        st = os.stat(source)
+        if sample_rate is None or channels is None:
+            audio = CFFmpeg.probe(source)["audio"] or {}
+            sample_rate = sample_rate or int(audio.get("sample_rate") or 44100)
+            channels = channels or int(audio.get("channels") or 2)
+        dtype_code = 2 if (sample_rate, channels) == (WHISPER_RATE, 1) else 1
+        path = self.pcm_path(source, sample_rate, channels, dtype_code)
+        key = (path, st.st_size, st.st_mtime_ns, dtype_code)
+
+        with self._lock:
+            pcm = self._opened.get(key)
+            if pcm is not None:
+                self._opened.move_to_end(key)
+                return pcm
+            decoding = self._decoding.setdefault(path, threading.Lock())
+
+        decoded = False
+        with decoding:
+            if not self._is_current(path, st):
+                # 來源更動過：先放掉舊的 memmap (Windows 上被 map 的檔案無法取代)
+                with self._lock:
+                    self._release(path)
+                self._decode(source, path, sample_rate, channels, dtype_code, st)
+                decoded = True
+            else:
+                # 以修改時間記錄最後使用時間，供 evict 判斷
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+            pcm = CPcmAudio(path)
+        with self._lock:
+            self._opened[key] = pcm
+            while len(self._opened) > max(1, self.max_open):
+                self._opened.popitem(last=False)
+        if decoded:
+            self.evict(keep=path)
+        return pcm
+
+    def whisper_audio(self, source: str) -> np.ndarray:
+        """16 kHz 單聲道 float32，可直接交給 faster-whisper / VAD"""
+        return self.open(source).samples
+
+
+_default_store: Optional[CAudioStore] = None
+
+
+def default_store() -> CAudioStore:
+    global _default_store
+    if _default_store is None:
+        max_mb = os.environ.get("AUDIO_STORE_MAX_MB", "")
+        _default_store = CAudioStore(
+            os.environ.get("AUDIO_STORE_DIR") or None,
+            max_bytes=int(max_mb) * 1024**2 if max_mb.isdigit() else 4 * 1024**3,
+        )
+    return _default_store
@@ -0,0 +1,85 @@
+import json
+import subprocess
+from typing import Dict, List, Optional
+
+
+# ffmpeg / ffprobe 共用呼叫工具
+class CFFmpeg:
+    FFMPEG = "ffmpeg"
+    FFPROBE = "ffprobe"
+
+    @classmethod
+    def check(cls) -> bool:
+        """檢查 ffmpeg 是否可用"""
+        try:
+            result = subprocess.run(
+                [cls.FFMPEG, "-version"], capture_output=True, text=True, timeout=5
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
+
+    @classmethod
+    def run(cls, args: List[str], timeout: Optional[float] = None) -> bool:
+        """
+        執行 ffmpeg 指令
+
+        Args:
+            args: ffmpeg 之後的參數 (不含 "ffmpeg")
+            timeout: 逾時秒數，None 表示不限制
+
+        Returns:
+            是否成功
+        """
+        cmd = [cls.FFMPEG, "-hide_banner", "-loglevel", "error", "-y", *args]
+        try:
+            result = subprocess.run(
+                cmd, capture_output=True, text=True, timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            print(f"❌ FFmpeg 執行逾時：{' '.join(cmd)}")
+            return False
+
+        if result.returncode != 0:
+            print(f"❌ FFmpeg 錯誤 (返回碼: {result.returncode})")
+            if result.stderr:
+                print(f"   錯誤詳情: {result.stderr.strip()[-500:]}")
+            return False
+        return True
+
+    @classmethod
+    def probe(cls, path: str) -> Dict:
+        """
+        以 ffprobe 取得影片資訊
+
+        Returns:
+            {"duration": float, "video": dict | None, "audio": dict | None}
+        """
+        cmd = [
+            cls.FFPROBE,
+            "-v",
+            "quiet",
+            "-print_format",
+            "json",
+            "-show_format",
+            "-show_streams",
+            path,
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffprobe 無法讀取檔案：{path}")
+
+        data = json.loads(result.stdout or "{}")
+        video = None
+        audio = None
+        for stream in data.get("streams", []):
+            if stream.get("codec_type") == "video" and video is None:
+                video = stream
+            elif stream.get("codec_type") == "audio" and audio is None:
+                audio = stream
+
+        return {
+            "duration": float(data.get("format", {}).get("duration", 0) or 0),
+            "video": video,
+            "audio": audio,
+        }
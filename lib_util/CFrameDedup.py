@@ -0,0 +1,115 @@
+from typing import List, Sequence
+
+import numpy as np
+from PIL import Image
+
+# 雜湊邊長 8 (64 bits，打包成一個 uint64)
+HASH_SIZE = 8
+
+
+# 以感知雜湊 (dHash / pHash) 找出連續且幾乎相同的畫面，合併成同一頁
+class CFrameDedup:
+    def __init__(self, method: str = "dhash", threshold: int = 6):
+        """
+        Args:
+            method: "dhash" 或 "phash"
+            threshold: 與群組第一張的漢明距離 (0~64) 小於等於此值視為重複，0 表示不合併
+        """
+        if method not in ("dhash", "phash"):
+            raise ValueError(f"不支援的雜湊方式: {method}")
+        self.method = method
+        self.threshold = threshold
+
+    def _load_gray(self, paths: Sequence[str], size: tuple) -> np.ndarray:
+        """讀入灰階縮圖，回傳 (N, H, W) 陣列"""
+        w, h = size
+        frames = np.empty((len(paths), h, w), dtype=np.float32)
+        for i, path in enumerate(paths):
+            with Image.open(path) as img:
+                # JPEG 可以直接以 1/2 ~ 1/8 比例解碼，避免解出整張大圖
+                img.draft("L", (w * 8, h * 8))
+                frames[i] = np.asarray(
+                    img.convert("L").resize((w, h), Image.Resampling.BILINEAR),
+                    dtype=np.float32,
+                )
+        return frames
+
+    @staticmethod
+    def _pack(bits: np.ndarray) -> np.ndarray:
+        """(N, 64) bool -> (N,) uint64"""
+        packed = np.packbits(bits.astype(np.uint8), axis=1)
+        return packed.view(">u8").ravel().astype(np.uint64)
+
+    def _dhash(self, paths: Sequence[str]) -> np.ndarray:
+        n = HASH_SIZE
+        frames = self._load_gray(paths, (n + 1, n))
+        bits = frames[:, :, 1:] > frames[:, :, :-1]
+        return self._pack(bits.reshape(len(paths), -1))
+
+    def _phash(self, paths: Sequence[str]) -> np.ndarray:
+        n = HASH_SIZE
+        size = n * 4
+        frames = self._load_gray(paths, (size, size))
+
+        # DCT-II 矩陣，一次對所有畫面做二維 DCT
+        k = np.arange(size)[:, None]
+        x = np.arange(size)[None, :]
+        dct = np.cos(np.pi * (2 * x + 1) * k / (2 * size)).astype(np.float32)
+        coeffs = (dct @ frames @ dct.T)[:, :n, :n].reshape(len(paths), -1)
+
+        # 排除直流分量後取中位數
+        median = np.median(coeffs[:, 1:], axis=1, keepdims=True)
+        return self._pack(coeffs > median)
+
+    def hash_images(self, paths: Sequence[str]) -> np.ndarray:
+        """計算每張圖片的 64 bits 感知雜湊"""
+        if not paths:
+            return np.empty(0, dtype=np.uint64)
+        if self.method == "phash":
+            return self._phash(paths)
+        return self._dhash(paths)
+
+    @staticmethod
+    def hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """逐元素計算兩組雜湊的漢明距離"""
+        xor = np.bitwise_xor(a.astype(np.uint64), b.astype(np.uint64))
+        return np.unpackbits(xor.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+    def group(self, hashes: np.ndarray) -> List[List[int]]:
+        """
+        將連續且相似的畫面分成群組
+
+        Returns:
+            每個群組的索引列表 (依原順序)
+        """
+        groups: List[List[int]] = []
+        anchor = None
+        for i, h in enumerate(int(v) for v in hashes):
+            # 和群組第一張比較，避免緩慢變化的畫面一路串成同一組
+            if anchor is not None and (h ^ anchor).bit_count() <= self.threshold:
+                groups[-1].append(i)
+            else:
+                groups.append([i])
+                anchor = h
+        return groups
+
+    def group_images(self, paths: Sequence[str]) -> List[List[int]]:
+        """計算雜湊並分組"""
+        if self.threshold <= 0:
+            return [[i] for i in range(len(paths))]
+        return self.group(self.hash_images(paths))
+
+    @staticmethod
+    def merge_texts(
+        texts: Sequence[str], groups: List[List[int]], sep: str = " "
+    ) -> List[str]:
+        """合併同一群組的字幕文字，連續重複的句子只保留一次"""
+        merged = []
+        for g in groups:
+            parts = []
+            for i in g:
+                text = texts[i].strip()
+                if text and (not parts or parts[-1] != text):
+                    parts.append(text)
+            merged.append(sep.join(parts))
+        return merged
@@ -0,0 +1,192 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from lib_util.CFFmpeg import CFFmpeg
+
+
+# 依時間點批次擷取影片畫面
+# 密集模式：先以 ffprobe 讀出每個畫格時間 (只 demux 不解碼)，
+#           再以 select 濾鏡在「一次解碼」中輸出所有需要的畫格
+# 稀疏模式：時間點很少時，平行以 -ss 跳到關鍵畫格附近各擷取一張
+class CFrameExtractor:
+    def __init__(
+        self,
+        quality: int = 2,
+        sparse_gap: float = 20.0,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            quality: JPEG 品質 (-q:v，2 為高品質)
+            sparse_gap: 平均間隔超過此秒數時改用稀疏模式
+            max_workers: 稀疏模式平行處理數量，預設為 CPU 數
+        """
+        self.quality = quality
+        self.sparse_gap = sparse_gap
+        self.max_workers = max_workers or os.cpu_count() or 4
+
+    @staticmethod
+    def frame_times(video_path: str) -> List[float]:
+        """讀出影片所有畫格的顯示時間 (依時間排序)"""
+        cmd = [
+            CFFmpeg.FFPROBE,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time",
+            "-of",
+            "csv=p=0",
+            video_path,
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffprobe 無法讀取畫格：{video_path}")
+
+        times = []
+        for line in result.stdout.splitlines():
+            value = line.strip().rstrip(",")
+            if value and value != "N/A":
+                times.append(float(value))
+        times.sort()
+        return times
+
+    def _is_sparse(self, video_path: str, timestamps: List[float]) -> bool:
+        duration = CFFmpeg.probe(video_path)["duration"]
+        if not duration:
+            return False
+        return duration / max(len(timestamps), 1) > self.sparse_gap
+
+    def _extract_one(self, video_path: str, timestamp: float, output_file: str) -> bool:
+        return CFFmpeg.run(
+            [
+                "-ss",
+                f"{timestamp:.3f}",
+                "-i",
+                video_path,
+                "-frames:v",
+                "1",
+                "-q:v",
+                str(self.quality),
+                output_file,
+            ],
+            timeout=30,
+        )
+
+    def extract_sparse(
+        self, video_path: str, timestamps: List[float], output_files: List[str]
+    ) -> List[bool]:
+        """稀疏模式：平行以 -ss 逐張擷取"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(
+                pool.map(
+                    lambda args: self._extract_one(video_path, *args),
+                    zip(timestamps, output_files),
+                )
+            )
+
+    def extract_dense(
+        self, video_path: str, timestamps: List[float], output_files: List[str]
+    ) -> List[bool]:
+        """密集模式：一次解碼輸出全部畫格"""
+        times = self.frame_times(video_path)
+        if not times:
+            return [False] * len(timestamps)
+
+        # 每個時間點對應到第一個顯示時間 >= 該時間點的畫格
+        targets = [min(bisect_left(times, t - 1e-4), len(times) - 1) for t in timestamps]
+        unique_frames = sorted(set(targets))
+        rank = {n: i for i, n in enumerate(unique_frames)}
+
+        results = [False] * len(timestamps)
+        with tempfile.TemporaryDirectory(prefix="frames_") as temp_dir:
+            # 時間點很多時指令會太長，改用 filter script 檔
+            select = "+".join(f"eq(n,{n})" for n in unique_frames)
+            script_path = os.path.join(temp_dir, "select.txt")
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write(f"select='{select}'")
+
+            ok = CFFmpeg.run(
+                [
+                    "-i",
+                    video_path,
+                    "-filter_script:v",
+                    script_path,
+                    "-fps_mode",
+                    "passthrough",
+                    "-q:v",
+                    str(self.quality),
+                    os.path.join(temp_dir, "%06d.jpg"),
+                ]
+            )
+            if not ok:
+                return results
+
+            for i, (frame, output_file) in enumerate(zip(targets, output_files)):
+                frame_file = os.path.join(temp_dir, f"{rank[frame] + 1:06d}.jpg")
+                if os.path.exists(frame_file):
+                    shutil.copyfile(frame_file, output_file)
+                    results[i] = True
+
+        return results
+
+    def extract(
+        self, video_path: str, timestamps: List[float], output_files: List[str]
+    ) -> List[bool]:
+        """
+        依時間點擷取畫面
+
+        Args:
+            video_path: 影片路徑
+            timestamps: 時間點 (秒)
+            output_files: 對應每個時間點的輸出圖片路徑
+
+        Returns:
+            每個時間點是否擷取成功
+        """
+        if len(timestamps) != len(output_files):
+            raise ValueError("timestamps 與 output_files 數量不一致")
+        if not timestamps:
+            return []
+
+        if self._is_sparse(video_path, timestamps):
+            print(f"📸 稀疏模式擷取 {len(timestamps)} 張圖片")
+            return self.extract_sparse(video_path, timestamps, output_files)
+
+        print(f"📸 單次解碼擷取 {len(timestamps)} 張圖片")
+        results = self.extract_dense(video_path, timestamps, output_files)
+
+        # 少數失敗的時間點再以稀疏模式補擷取
+        missing = [i for i, ok in enumerate(results) if not ok]
+        if missing:
+            print(f"🔄 補擷取 {len(missing)} 張圖片")
+            retry = self.extract_sparse(
+                video_path,
+                [timestamps[i] for i in missing],
+                [output_files[i] for i in missing],
+            )
+            for i, ok in zip(missing, retry):
+                results[i] = ok
+        return results
+
+    def extract_to_dir(
+        self,
+        video_path: str,
+        timestamps: List[float],
+        output_dir: str,
+        name_format: str = "{:04d}.jpg",
+        start: int = 1,
+    ) -> List[bool]:
+        """依時間點擷取畫面，依序編號輸出到資料夾"""
+        os.makedirs(output_dir, exist_ok=True)
+        output_files = [
+            os.path.join(output_dir, name_format.format(i))
+            for i in range(start, start + len(timestamps))
+        ]
+        return self.extract(video_path, timestamps, output_files)
@@ -0,0 +1,305 @@
+import asyncio
+import importlib.util
+import os
+import random
+import re
+import time
+from typing import Dict, Optional
+
+import httpx
+from google.auth import exceptions as google_exceptions
+from google.auth import jwt as google_jwt
+
+from lib_util.CArtifactManifest import file_sha256
+
+# 共用的 async HTTP client
+# 每次請求都開新連線 (requests.get / 每次登入新的 google Request) 要重新做 TCP + TLS 握手；
+# 整個服務共用一個 httpx.AsyncClient：保持連線池、可用時走 HTTP/2、統一逾時與重試。
+# FastAPI 在 lifespan 建立與關閉，端點以 Depends(get_client) 取得；
+# 命令列腳本沒有 lifespan，第一次使用時自動建立 (每次 asyncio.run 是新的事件迴圈，
+# client 綁定建立它的迴圈，換了迴圈就重建)，結束前呼叫 close_client()
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+# 這些狀態碼視為暫時性錯誤，退避後重試
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _client_options(
+    timeout: float, connect_timeout: float, max_connections: int, keepalive: int
+) -> dict:
+    # requirements 固定 httpx 0.13 (googletrans 需要)，新版的參數名稱不同
+    if hasattr(httpx, "Limits"):
+        return {
+            "timeout": httpx.Timeout(timeout, connect=connect_timeout),
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=keepalive,
+            ),
+        }
+    return {
+        "timeout": httpx.Timeout(timeout, connect_timeout=connect_timeout),
+        "pool_limits": httpx.PoolLimits(
+            soft_limit=keepalive, hard_limit=max_connections
+        ),
+    }
+
+
+async def start_client(
+    timeout: float = 30.0,
+    connect_timeout: float = 10.0,
+    max_connections: int = 100,
+    keepalive: int = 20,
+) -> httpx.AsyncClient:
+    """
+    建立共用 client (已建立時直接回傳)
+
+    Args:
+        timeout: 讀寫逾時秒數
+        connect_timeout: 連線逾時秒數
+        max_connections: 連線池上限
+        keepalive: 保持的閒置連線數
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client_loop = loop
+        _client = httpx.AsyncClient(
+            # 沒有安裝 h2 時退回 HTTP/1.1
+            http2=importlib.util.find_spec("h2") is not None,
+            headers={"User-Agent": USER_AGENT},
+            **_client_options(timeout, connect_timeout, max_connections, keepalive),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+
+
+async def get_client() -> httpx.AsyncClient:
+    """取得共用 client，也可當作 FastAPI 相依項：Depends(get_client)"""
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        return _client
+    return await start_client()
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after", "")
+    return float(value) if value.isdigit() else None
+
+
+async def request(
+    method: str,
+    url: str,
+    retries: int = 3,
+    backoff: float = 0.5,
+    **kwargs,
+) -> httpx.Response:
+    """
+    送出請求，連線錯誤與暫時性狀態碼 (429 / 5xx) 退避後重試
+
+    Args:
+        retries: 失敗後的重試次數
+        backoff: 第一次重試前等待秒數，之後每次加倍 (另加隨機抖動)；
+                 伺服器有 Retry-After 時依其指示
+        kwargs: 交給 httpx 的參數 (headers / data / json / params ...)
+
+    Returns:
+        最後一次的回應 (不檢查狀態碼，需要時自行 raise_for_status)
+    """
+    client = await get_client()
+    for attempt in range(retries + 1):
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2**attempt) * random.uniform(0.8, 1.2)
+            print(f"⚠️ {method} {url} 失敗 ({e!r})，{delay:.1f} 秒後重試")
+        else:
+            if response.status_code not in RETRY_STATUS or attempt == retries:
+                return response
+            delay = _retry_after(response) or backoff * (2**attempt)
+            status = response.status_code
+            print(f"⚠️ {method} {url} 回應 {status}，{delay:.1f} 秒後重試")
+            await response.aclose()
+        await asyncio.sleep(delay)
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+
+def _retryable(e: httpx.HTTPError) -> bool:
+    # 連線錯誤沒有 response；有 response 的只重試暫時性狀態碼
+    response = getattr(e, "response", None)
+    return response is None or response.status_code in RETRY_STATUS
+
+
+def _range_total(response: httpx.Response) -> Optional[int]:
+    """Content-Range: bytes 100-199/1234 的總長度"""
+    total = response.headers.get("content-range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+async def download(
+    url: str,
+    output_path: str,
+    expected_size: Optional[int] = None,
+    sha256: Optional[str] = None,
+    retries: int = 3,
+    backoff: float = 0.5,
+    **kwargs,
+) -> str:
+    """
+    以串流下載檔案，可續傳並驗證完整性
+
+    內容先寫到 <output_path>.part，中斷 (或這次連線失敗) 後以 HTTP Range 從 .part 的
+    大小接續；大小 (與指定的 SHA-256) 驗證通過才改名成 output_path，
+    所以 output_path 存在就代表是完整的檔案
+
+    Args:
+        expected_size: 預期大小，None 時使用伺服器回報的長度
+        sha256: 預期的 SHA-256，None 表示不檢查
+        retries: 失敗後的重試次數 (每次都從已下載的位置續傳)
+
+    Returns:
+        output_path
+    """
+    client = await get_client()
+    part = f"{output_path}.part"
+    # 不壓縮傳輸，Range 的位移才會對應到檔案內容
+    headers = {**(kwargs.pop("headers", None) or {}), "Accept-Encoding": "identity"}
+    total = expected_size
+    for attempt in range(retries + 1):
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        else:
+            headers.pop("Range", None)
+        try:
+            async with client.stream("GET", url, headers=headers, **kwargs) as response:
+                if response.status_code == 416 and offset:
+                    # .part 已經下載完 (或比遠端檔案還大)
+                    remote = _range_total(response)
+                    if remote is not None and remote != offset:
+                        os.remove(part)
+                        continue
+                    break
+                response.raise_for_status()
+                if response.status_code == 206:
+                    mode = "ab"
+                    total = total or _range_total(response)
+                else:
+                    # 伺服器不支援 Range 時從頭下載
+                    mode = "wb"
+                    length = response.headers.get("content-length", "")
+                    total = total or (int(length) if length.isdigit() else None)
+                with open(part, mode) as f:
+                    async for chunk in response.aiter_bytes():
+                        f.write(chunk)
+            break
+        except httpx.HTTPError as e:
+            if attempt == retries or not _retryable(e):
+                raise
+            delay = backoff * (2**attempt) * random.uniform(0.8, 1.2)
+            print(f"⚠️ 下載 {url} 中斷 ({e!r})，{delay:.1f} 秒後續傳")
+            await asyncio.sleep(delay)
+
+    if not os.path.exists(part):
+        raise IOError(f"下載失敗：{url}")
+    size = os.path.getsize(part)
+    if total is not None and size != total:
+        if size > total:
+            os.remove(part)
+        raise IOError(f"下載不完整：{url} ({size}/{total} bytes)")
+    if sha256 and await asyncio.to_thread(file_sha256, part) != sha256.lower():
+        os.remove(part)
+        raise IOError(f"下載檔案雜湊不符：{url}")
+    os.replace(part, output_path)
+    return output_path
+
+
+# Google id_token 驗證
+# google.oauth2.id_token.verify_oauth2_token 每次都下載一次公鑰；
+# 公鑰的 Cache-Control 通常有數小時，這裡依 max-age 快取，
+# 遇到不認得的 kid (金鑰輪替) 才提早重新下載
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+
+class CGoogleCerts:
+    def __init__(self, certs_url: str = GOOGLE_CERTS_URL, default_ttl: float = 3600):
+        """
+        Args:
+            certs_url: PEM 格式公鑰的網址 ({kid: 憑證})
+            default_ttl: 回應沒有 max-age 時的快取秒數
+        """
+        self.certs_url = certs_url
+        self.default_ttl = default_ttl
+        self._certs: Dict[str, str] = {}
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+
+    def _max_age(self, response: httpx.Response) -> float:
+        match = re.search(
+            r"max-age=(\d+)", response.headers.get("cache-control", "")
+        )
+        return float(match.group(1)) if match else self.default_ttl
+
+    async def certs(self, kid: Optional[str] = None) -> Dict[str, str]:
+        """取得公鑰，快取過期或沒有指定的 kid 時重新下載"""
+        if time.time() < self._expires and (kid is None or kid in self._certs):
+            return self._certs
+        async with self._lock:
+            # 等待期間其他請求可能已經更新
+            if time.time() >= self._expires or (kid and kid not in self._certs):
+                response = await get(self.certs_url)
+                response.raise_for_status()
+                self._certs = response.json()
+                self._expires = time.time() + self._max_age(response)
+        return self._certs
+
+    async def verify_id_token(
+        self, token: str, audience: str, clock_skew: int = 10
+    ) -> dict:
+        """
+        驗證 Google id_token 的簽章、有效期限、audience 與 issuer
+
+        Returns:
+            token 內容 (email / sub / name / picture ...)
+        """
+        kid = google_jwt.decode_header(token).get("kid")
+        certs = await self.certs(kid)
+        idinfo = google_jwt.decode(
+            token, certs=certs, audience=audience, clock_skew_in_seconds=clock_skew
+        )
+        if idinfo.get("iss") not in GOOGLE_ISSUERS:
+            raise google_exceptions.GoogleAuthError(
+                f"Wrong issuer. 'iss' should be one of {GOOGLE_ISSUERS}"
+            )
+        return idinfo
+
+
+_google_certs: Optional[CGoogleCerts] = None
+
+
+def google_certs() -> CGoogleCerts:
+    global _google_certs
+    if _google_certs is None:
+        _google_certs = CGoogleCerts()
+    return _google_certs
@@ -0,0 +1,297 @@
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+# 圖片字幕書工具：平行在圖片加上字幕框，並以串流方式組成 PDF
+
+# 每個 worker 行程只載入一次字型
+_worker_font = None
+
+
+def _init_worker(font_paths: Tuple[str, ...], font_size: int):
+    global _worker_font
+    _worker_font = load_font(font_paths, font_size)
+
+
+def _overlay_worker(job: Tuple[str, str, str]) -> bool:
+    src, dst, text = job
+    try:
+        img = Image.open(src).convert("RGB")
+        draw_caption_box(img, caption_lines(text), _worker_font)
+        img.save(dst)
+        return True
+    except Exception as e:
+        print(f"❌ 處理圖片時出錯 {os.path.basename(src)}：{e}")
+        return False
+
+
+def load_font(font_paths: Iterable[str], font_size: int):
+    """依序嘗試字型檔，全部失敗時使用預設字型"""
+    for font_path in font_paths:
+        if font_path and os.path.exists(font_path):
+            try:
+                return ImageFont.truetype(font_path, font_size)
+            except Exception:
+                continue
+    return ImageFont.load_default()
+
+
+def split_chinese_english(text: str) -> Tuple[str, str]:
+    chinese = "".join(re.findall(r"[\u4e00-\u9fff，。！？；：「」、《》（）]", text))
+    english = "".join(re.findall(r"[^\u4e00-\u9fff，。！？；：「」、《》（）]+", text))
+    return chinese.strip(), english.strip()
+
+
+def caption_lines(text: str) -> List[str]:
+    """雙語字幕拆成英文、中文兩行"""
+    text = text.strip().replace("\n", " ")
+    zh, en = split_chinese_english(text)
+    return [en, zh] if zh and en else [text]
+
+
+def wrap_line(draw: ImageDraw.ImageDraw, line: str, font, max_width: int) -> List[str]:
+    """依寬度自動換行，中文逐字、英文逐單字"""
+    if draw.textlength(line, font=font) <= max_width:
+        return [line]
+
+    is_chinese = re.search(r"[\u4e00-\u9fff]", line) is not None
+    tokens = list(line) if is_chinese else line.split()
+    joiner = "" if is_chinese else " "
+
+    wrapped = []
+    current = ""
+    for token in tokens:
+        candidate = current + (joiner if current else "") + token
+        if current and draw.textlength(candidate, font=font) > max_width:
+            wrapped.append(current)
+            current = token
+        else:
+            current = candidate
+    if current:
+        wrapped.append(current)
+    return wrapped
+
+
+def draw_caption_box(img: Image.Image, lines: List[str], font, fill="#002244"):
+    """在圖片底部畫圓角背景框並置中寫入字幕"""
+    draw = ImageDraw.Draw(img)
+
+    # 合併多句字幕時文字可能超過畫面寬度，先換行
+    wrap_width = img.width - 80
+    wrapped = []
+    for line in lines:
+        if line:
+            wrapped.extend(wrap_line(draw, line, font, wrap_width))
+
+    line_sizes = []
+    total_height = 0
+    max_width = 0
+    for line in wrapped:
+        if line:
+            bbox = draw.textbbox((0, 0), line, font=font)
+            w = bbox[2] - bbox[0]
+            h = bbox[3] - bbox[1]
+            line_sizes.append((line, w, h))
+            total_height += h
+            max_width = max(max_width, w)
+
+    if not line_sizes:
+        return img
+
+    total_height += (len(line_sizes) - 1) * 10  # 行間距
+
+    # 框框座標與設定
+    padding = 16
+    x = (img.width - max_width) / 2 - padding
+    y = img.height - total_height - 40 - padding
+    box_w = max_width + 2 * padding
+    box_h = total_height + 2 * padding
+
+    draw.rounded_rectangle([x, y, x + box_w, y + box_h], radius=20, fill=fill)
+
+    text_y = y + padding
+    for line, w, h in line_sizes:
+        text_x = (img.width - w) / 2
+        draw.text((text_x, text_y), line, font=font, fill="white")
+        text_y += h + 10
+
+    return img
+
+
+class _StreamingPdf:
+    """逐頁寫出的最小 PDF 產生器，記憶體中只保留目前這一頁"""
+
+    def __init__(self, path: str):
+        self.f = open(path, "wb")
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 3  # 1: Catalog, 2: Pages
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _begin(self, obj_id: int):
+        self.offsets[obj_id] = self.f.tell()
+        self.f.write(f"{obj_id} 0 obj\n".encode())
+
+    def _object(self, obj_id: int, body: bytes):
+        self._begin(obj_id)
+        self.f.write(body)
+        self.f.write(b"\nendobj\n")
+
+    def _stream(self, obj_id: int, header: str, data: bytes):
+        self._begin(obj_id)
+        self.f.write(f"<< {header} /Length {len(data)} >>\nstream\n".encode())
+        self.f.write(data)
+        self.f.write(b"\nendstream\nendobj\n")
+
+    def add_jpeg_page(
+        self, jpeg: bytes, width: int, height: int, color_space: str, dpi: float
+    ):
+        image_id, content_id, page_id = range(self.next_id, self.next_id + 3)
+        self.next_id += 3
+
+        self._stream(
+            image_id,
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /{color_space} /BitsPerComponent 8 /Filter /DCTDecode",
+            jpeg,
+        )
+
+        page_w = width * 72.0 / dpi
+        page_h = height * 72.0 / dpi
+        content = f"q {page_w:.2f} 0 0 {page_h:.2f} 0 0 cm /Im0 Do Q".encode()
+        self._stream(content_id, "", content)
+
+        self._object(
+            page_id,
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_w:.2f} {page_h:.2f}] "
+                f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+                f"/Contents {content_id} 0 R >>"
+            ).encode(),
+        )
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{i} 0 R" for i in self.page_ids)
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._object(
+            2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode()
+        )
+
+        xref_offset = self.f.tell()
+        size = self.next_id
+        self.f.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode())
+        for obj_id in range(1, size):
+            if obj_id in self.offsets:
+                self.f.write(f"{self.offsets[obj_id]:010d} 00000 n \n".encode())
+            else:
+                self.f.write(b"0000000000 65535 f \n")
+        self.f.write(
+            f"trailer\n<< /Size {size} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
+        self.f.close()
+
+
+class CImageBook:
+    def __init__(
+        self,
+        font_paths: Tuple[str, ...] = (
+            r"C:\Windows\Fonts\msjh.ttc",  # 微軟正黑體
+            r"C:\Windows\Fonts\arial.ttf",  # 備用字體
+        ),
+        font_size: int = 28,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            font_paths: 依序嘗試的字型檔
+            font_size: 字幕字體大小
+            max_workers: 加字幕使用的行程數，預設為 CPU 數
+        """
+        self.font_paths = tuple(font_paths)
+        self.font_size = font_size
+        self.max_workers = max_workers or os.cpu_count() or 4
+
+    def add_captions(self, jobs: List[Tuple[str, str, str]]) -> int:
+        """
+        平行為圖片加上字幕
+
+        Args:
+            jobs: (來源圖片, 輸出圖片, 字幕文字) 列表
+
+        Returns:
+            成功張數
+        """
+        if not jobs:
+            return 0
+
+        chunksize = max(1, len(jobs) // (self.max_workers * 4))
+        success_count = 0
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.font_paths, self.font_size),
+        ) as pool:
+            for idx, ok in enumerate(
+                pool.map(_overlay_worker, jobs, chunksize=chunksize), start=1
+            ):
+                success_count += ok
+                if idx % 20 == 0:
+                    print(
+                        f"⏳ 字幕添加進度: {idx}/{len(jobs)} ({(idx/len(jobs))*100:.1f}%)"
+                    )
+        return success_count
+
+    @staticmethod
+    def images_to_pdf(
+        image_paths: List[str],
+        output_pdf_path: str,
+        jpeg_passthrough: bool = True,
+        jpeg_quality: int = 90,
+        dpi: float = 72.0,
+    ) -> int:
+        """
+        逐頁串流寫出 PDF，一次只在記憶體中保留一張圖片
+
+        Args:
+            image_paths: 依頁序排列的圖片路徑
+            output_pdf_path: 輸出 PDF 路徑
+            jpeg_passthrough: JPEG 圖片直接嵌入，不重新壓縮
+            jpeg_quality: 非 JPEG 圖片轉檔時的品質
+            dpi: 圖片解析度，決定頁面大小
+
+        Returns:
+            頁數
+        """
+        pdf = _StreamingPdf(output_pdf_path)
+        try:
+            for path in image_paths:
+                with Image.open(path) as img:
+                    # Image.open 只讀取檔頭，JPEG 直通時不需要解碼
+                    if (
+                        jpeg_passthrough
+                        and img.format == "JPEG"
+                        and img.mode in ("RGB", "L")
+                    ):
+                        with open(path, "rb") as f:
+                            data = f.read()
+                        color_space = "DeviceRGB" if img.mode == "RGB" else "DeviceGray"
+                    else:
+                        rgb = img.convert("RGB")
+                        buffer = io.BytesIO()
+                        rgb.save(buffer, format="JPEG", quality=jpeg_quality)
+                        data = buffer.getvalue()
+                        color_space = "DeviceRGB"
+                    width, height = img.size
+
+                pdf.add_jpeg_page(data, width, height, color_space, dpi)
+        finally:
+            pdf.close()
+
+        return len(pdf.page_ids)
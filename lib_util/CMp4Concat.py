@@ -0,0 +1,244 @@
+import os
+import subprocess
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from lib_util.CFFmpeg import CFFmpeg
+
+
+# 影片合併 / 重複播放工具
+# 參數一致的影片直接以 concat demuxer 串接 (stream copy，不重新編碼)，
+# 只有參數不一致的影片才會先轉成與多數影片相同的格式
+class CMp4Concat:
+    # ffprobe codec_name -> ffmpeg 編碼器
+    VIDEO_ENCODERS = {
+        "h264": "libx264",
+        "hevc": "libx265",
+        "vp9": "libvpx-vp9",
+        "mpeg4": "mpeg4",
+    }
+    AUDIO_ENCODERS = {
+        "aac": "aac",
+        "mp3": "libmp3lame",
+        "opus": "libopus",
+        "vorbis": "libvorbis",
+    }
+
+    def __init__(self, crf: int = 18, preset: str = "medium"):
+        """
+        Args:
+            crf: 需要重新編碼時使用的品質參數
+            preset: 需要重新編碼時使用的 x264/x265 preset
+        """
+        self.crf = crf
+        self.preset = preset
+
+    @staticmethod
+    def stream_signature(info: Dict) -> Tuple:
+        """取得可以判斷能否 stream copy 串接的參數組合"""
+        v = info.get("video") or {}
+        a = info.get("audio") or {}
+        video_sig = (
+            v.get("codec_name"),
+            v.get("profile"),
+            v.get("width"),
+            v.get("height"),
+            v.get("pix_fmt"),
+            v.get("r_frame_rate"),
+        )
+        audio_sig = (
+            (a.get("codec_name"), a.get("sample_rate"), a.get("channels"))
+            if a
+            else None
+        )
+        return video_sig, audio_sig
+
+    def _reference_signature(self, signatures: List[Tuple]) -> Tuple:
+        """以出現次數最多且可以重新編碼的參數作為基準"""
+        for sig, _ in Counter(signatures).most_common():
+            video_sig, audio_sig = sig
+            if video_sig[0] not in self.VIDEO_ENCODERS:
+                continue
+            if audio_sig and audio_sig[0] not in self.AUDIO_ENCODERS:
+                continue
+            return sig
+
+        # 沒有可用的基準時，以第一支影片的尺寸轉為 h264/aac
+        video_sig, audio_sig = signatures[0]
+        if not (video_sig[2] and video_sig[3]):
+            raise ValueError("找不到可作為基準的影像串流 (沒有寬高資訊)")
+        return (
+            ("h264", None, *video_sig[2:4], "yuv420p", video_sig[5]),
+            ("aac", audio_sig[1], audio_sig[2]) if audio_sig else None,
+        )
+
+    def _conform(
+        self, input_file: str, info: Dict, reference: Tuple, output_file: str
+    ) -> bool:
+        """將影片重新編碼成與基準相同的參數"""
+        video_sig, audio_sig = reference
+        codec, _, width, height, pix_fmt, frame_rate = video_sig
+
+        vf = (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+        )
+        args = ["-i", input_file]
+        has_audio = info.get("audio") is not None
+        if audio_sig and not has_audio:
+            # 沒有音軌的影片補上靜音，避免串接後音畫不同步
+            _, sample_rate, channels = audio_sig
+            layout = "mono" if int(channels or 2) == 1 else "stereo"
+            args += ["-f", "lavfi", "-i", f"anullsrc=r={sample_rate}:cl={layout}"]
+            args += ["-map", "0:v:0", "-map", "1:a:0", "-shortest"]
+
+        args += ["-vf", vf, "-c:v", self.VIDEO_ENCODERS[codec]]
+        if codec in ("h264", "hevc"):
+            args += ["-preset", self.preset, "-crf", str(self.crf)]
+        if pix_fmt:
+            args += ["-pix_fmt", pix_fmt]
+        if frame_rate and frame_rate != "0/0":
+            args += ["-r", frame_rate]
+
+        if audio_sig:
+            audio_codec, sample_rate, channels = audio_sig
+            args += ["-c:a", self.AUDIO_ENCODERS[audio_codec]]
+            if sample_rate:
+                args += ["-ar", str(sample_rate)]
+            if channels:
+                args += ["-ac", str(channels)]
+        else:
+            args += ["-an"]
+
+        args.append(output_file)
+        return CFFmpeg.run(args)
+
+    @staticmethod
+    def _write_concat_list(files: List[str], list_path: str):
+        """建立 concat demuxer 使用的清單檔"""
+        with open(list_path, "w", encoding="utf-8") as f:
+            for file in files:
+                path = Path(file).resolve().as_posix().replace("'", r"'\''")
+                f.write(f"file '{path}'\n")
+
+    def concat(self, input_files: List[str], output_file: str) -> bool:
+        """
+        合併多支影片
+
+        Args:
+            input_files: 依播放順序排列的影片路徑
+            output_file: 合併後輸出的影片路徑
+
+        Returns:
+            是否成功
+        """
+        if not input_files:
+            print("❌ 沒有需要合併的影片")
+            return False
+
+        # 讀不到或沒有影像串流的檔案略過並回報，不中斷整批合併
+        files, infos = [], []
+        for file in input_files:
+            try:
+                info = CFFmpeg.probe(str(file))
+            except (RuntimeError, subprocess.TimeoutExpired) as e:
+                print(f"⚠️ 無法讀取，略過：{Path(file).name} ({e})")
+                continue
+            if info.get("video") is None:
+                print(f"⚠️ 沒有影像串流，略過：{Path(file).name}")
+                continue
+            files.append(file)
+            infos.append(info)
+        if not files:
+            print("❌ 沒有可以合併的影片")
+            return False
+
+        signatures = [self.stream_signature(info) for info in infos]
+        try:
+            reference = self._reference_signature(signatures)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+
+        with tempfile.TemporaryDirectory(prefix="mp4concat_") as temp_dir:
+            parts = []
+            for idx, (file, info, sig) in enumerate(zip(files, infos, signatures)):
+                if sig == reference:
+                    print(f"📥 直接串接：{Path(file).name}")
+                    parts.append(str(file))
+                    continue
+
+                print(f"🔧 參數不一致，重新編碼：{Path(file).name}")
+                conformed = os.path.join(temp_dir, f"{idx:04d}.mp4")
+                if not self._conform(str(file), info, reference, conformed):
+                    return False
+                parts.append(conformed)
+
+            list_path = os.path.join(temp_dir, "list.txt")
+            self._write_concat_list(parts, list_path)
+            ok = CFFmpeg.run(
+                [
+                    "-f",
+                    "concat",
+                    "-safe",
+                    "0",
+                    "-i",
+                    list_path,
+                    "-c",
+                    "copy",
+                    "-movflags",
+                    "+faststart",
+                    output_file,
+                ]
+            )
+
+        if ok:
+            print(f"✅ 合併完成: {output_file}")
+        return ok
+
+    def concat_dir(
+        self, input_dir: str, output_file: str, pattern: str = "*.mp4"
+    ) -> bool:
+        """合併資料夾中的所有影片 (依檔名排序，排除輸出檔本身)"""
+        output_path = Path(output_file).resolve()
+        files = [
+            str(f)
+            for f in sorted(Path(input_dir).glob(pattern))
+            if f.resolve() != output_path
+        ]
+        if not files:
+            print("❌ 找不到任何 MP4 檔案")
+            return False
+        return self.concat(files, output_file)
+
+    def repeat(self, input_file: str, output_file: str, times: int) -> bool:
+        """
+        將影片重複播放 times 次 (使用 -stream_loop，不重新編碼)
+        """
+        if times < 1:
+            raise ValueError("times 必須大於等於 1")
+
+        ok = CFFmpeg.run(
+            [
+                "-stream_loop",
+                str(times - 1),
+                "-i",
+                input_file,
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                output_file,
+            ]
+        )
+        if ok:
+            print(f"✅ 重複 {times} 次完成: {output_file}")
+        return ok
+
+
+# 使用範例
+if __name__ == "__main__":
+    concat = CMp4Concat()
+    concat.concat_dir(r"c:\temp\0718", r"c:\temp\0718\result.mp4")
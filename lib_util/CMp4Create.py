@@ -5,8 +5,18 @@ from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 import os
 import re
+import sys
 import traceback
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CMp4Concat import CMp4Concat
+from lib_srt.CCueTrack import CCueTrack, parse_time_ms
+from lib_srt.CSrtLoader import CSrtLoader
+
 
 class DualSubtitleVideoGenerator:
     """雙語字幕影片生成器"""
@@ -58,51 +68,19 @@ class DualSubtitleVideoGenerator:
     def parse_srt_time(self, time_str):
         """解析 SRT 時間格式 (HH:MM:SS,mmm)"""
         try:
-            time_part, ms_part = time_str.split(",")
-            h, m, s = map(int, time_part.split(":"))
-            ms = int(ms_part)
-            return h * 3600 + m * 60 + s + ms / 1000.0
-        except:
+            return parse_time_ms(time_str) / 1000.0
+        except ValueError:
             return 0
 
     def parse_srt_content(self, content):
-        """解析 SRT 內容"""
-        subtitles = []
-        blocks = re.split(r"\n\s*\n", content.strip())
-
-        for block in blocks:
-            lines = block.strip().split("\n")
-            if len(lines) >= 3:
-                # 第一行是序號
-                # 第二行是時間
-                time_line = lines[1]
-                time_match = re.search(
-                    r"(\d+:\d+:\d+,\d+)\s*-->\s*(\d+:\d+:\d+,\d+)", time_line
-                )
-
-                if time_match:
-                    start_time = self.parse_srt_time(time_match.group(1))
-                    end_time = self.parse_srt_time(time_match.group(2))
-                    text = "\n".join(lines[2:])
-                    subtitles.append((start_time, end_time, text))
-
-        return subtitles
+        """解析 SRT 內容，回傳 [(開始秒, 結束秒, 文字)]"""
+        return CCueTrack.from_string(content).seconds()
 
     def parse_subtitle_file(self, file_path):
         """解析字幕檔案"""
         try:
-            # 嘗試不同編碼
-            encodings = ["utf-8", "utf-8-sig", "big5", "gbk", "cp950"]
-            content = None
-
-            for encoding in encodings:
-                try:
-                    with open(file_path, "r", encoding=encoding) as f:
-                        content = f.read()
-                    print(f"成功使用 {encoding} 編碼讀取 {file_path}")
-                    break
-                except:
-                    continue
+            # 一次讀入並自動判斷編碼
+            content = CSrtLoader.read_text(file_path)
 
             if not content:
                 raise Exception("無法讀取檔案")
@@ -517,23 +495,8 @@ class DualSubtitleVideoGenerator:
             input_dir (str): MP4 檔案所在的資料夾
             output_file (str): 合併後輸出的影片路徑
         """
-        input_path = Path(input_dir)
-        mp4_files = sorted(input_path.glob("*.mp4"))  # 可依檔名順序排序
-
-        if not mp4_files:
-            print("❌ 找不到任何 MP4 檔案")
-            return
-
-        clips = []
-        for file in mp4_files:
-            print(f"📥 載入影片: {file.name}")
-            clip = VideoFileClip(str(file))
-            clips.append(clip)
-
-        final_clip = concatenate_videoclips(clips, method="compose")
-        final_clip.write_videofile(output_file, codec="libx264", audio_codec="aac")
-
-        print(f"✅ 合併完成: {output_file}")
+        # 參數一致的影片直接 stream copy 串接，只有不一致的才重新編碼
+        return CMp4Concat().concat_dir(input_dir, output_file)
 
 
 # 使用範例
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from lib_srt.CCueTrack import CCueTrack
+from lib_srt.CSrtLoader import CSrtLoader
+from lib_util.CFFmpeg import CFFmpeg
+
+
+# 燒錄字幕影片的分段增量重算
+# 輸出影片依來源關鍵畫格 (GOP) 切成數段各自編碼，manifest 記錄每段涵蓋的字幕雜湊；
+# 字幕修改後只重新編碼受影響的片段，再以 stream copy 串接並混入原始音軌
+# 片段以畫格編號切割 (-frames:v)，不以浮點秒數 -t 截斷，接縫處不會重複或遺漏畫格
+class CSegmentRender:
+    MANIFEST = "manifest.json"
+
+    def __init__(
+        self,
+        work_dir: str,
+        segment_seconds: float = 10.0,
+        crf: int = 18,
+        preset: str = "medium",
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            work_dir: 存放片段與 manifest 的資料夾
+            segment_seconds: 每段最短長度 (實際切在其後第一個關鍵畫格)
+            crf: x264 品質參數
+            preset: x264 preset
+            max_workers: 同時編碼的片段數
+        """
+        self.work_dir = Path(work_dir)
+        self.segment_seconds = segment_seconds
+        self.crf = crf
+        self.preset = preset
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+
+    # ===== 字幕事件 =====
+    @staticmethod
+    def _ass_time(t: str) -> float:
+        h, m, s = t.strip().split(":")
+        return int(h) * 3600 + int(m) * 60 + float(s)
+
+    @classmethod
+    def read_events(cls, subtitle_path: str) -> Tuple[str, List[Tuple[float, float, str]]]:
+        """
+        讀取字幕事件
+
+        Returns:
+            (影響所有片段的檔頭內容, [(開始秒, 結束秒, 原始內容)])
+        """
+        events = []
+        if Path(subtitle_path).suffix.lower() in (".ass", ".ssa"):
+            # ASS 保留原始 Dialogue 行與檔頭 (樣式變更要影響所有片段)
+            header_lines = []
+            for line in CSrtLoader.read_text(subtitle_path).splitlines():
+                if line.startswith("Dialogue:"):
+                    fields = line[len("Dialogue:") :].split(",", 9)
+                    events.append(
+                        (cls._ass_time(fields[1]), cls._ass_time(fields[2]), line)
+                    )
+                else:
+                    header_lines.append(line)
+            return "\n".join(header_lines), events
+
+        # SRT / VTT 交給 CCueTrack 解析 (接受 "," 或 "." 毫秒分隔與 VTT 時間格式)
+        track = CCueTrack.from_file(subtitle_path)
+        events = [(start / 1000, end / 1000, text) for start, end, text in track]
+        return "", events
+
+    # ===== 片段切割 =====
+    @staticmethod
+    def video_packets(video_path: str) -> List[Tuple[float, bool]]:
+        """
+        讀出來源影片每個畫格的時間與是否為關鍵畫格 (只 demux 不解碼)
+
+        Returns:
+            依顯示時間排序的 [(秒, 是否為關鍵畫格)]
+        """
+        cmd = [
+            CFFmpeg.FFPROBE,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            video_path,
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffprobe 無法讀取關鍵畫格：{video_path}")
+
+        packets = []
+        for line in result.stdout.splitlines():
+            parts = line.strip().split(",")
+            if len(parts) >= 2 and parts[0] not in ("", "N/A"):
+                packets.append((float(parts[0]), "K" in parts[1]))
+        return sorted(packets)
+
+    @classmethod
+    def keyframe_times(cls, video_path: str) -> List[float]:
+        """讀出來源影片關鍵畫格時間"""
+        return [t for t, key in cls.video_packets(video_path) if key]
+
+    def _boundaries(self, video_path: str, duration: float) -> Dict[str, List]:
+        """
+        規劃片段邊界
+
+        Returns:
+            {"boundaries": 各邊界秒數 (最後為影片長度，用於字幕雜湊),
+             "frames": 各邊界的畫格編號 (最後為總畫格數),
+             "seeks": 各片段的 -ss 位置}
+        """
+        packets = self.video_packets(video_path)
+        times = [t for t, _ in packets]
+        frames = [0]
+        for i, (t, key) in enumerate(packets):
+            if (
+                key
+                and t - times[frames[-1]] >= self.segment_seconds
+                and duration - t >= 1.0
+            ):
+                frames.append(i)
+        # 搜尋位置取前一個畫格與邊界畫格的中點，浮點誤差不會落到相鄰畫格
+        seeks = [0.0] + [(times[i - 1] + times[i]) / 2 for i in frames[1:]]
+        bounds = [0.0] + [times[i] for i in frames[1:]] + [duration]
+        frames.append(len(packets))
+        return {"boundaries": bounds, "frames": frames, "seeks": seeks}
+
+    @staticmethod
+    def _segment_hash(
+        header: str, events: List[Tuple[float, float, str]], start: float, end: float
+    ) -> str:
+        h = hashlib.sha1(header.encode("utf-8"))
+        for s, e, text in events:
+            if s < end and e > start:
+                h.update(f"{s:.3f}|{e:.3f}|{text}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    # ===== 編碼 =====
+    @staticmethod
+    def escape_filter_path(path: str) -> str:
+        resolved = str(Path(path).resolve())
+        if sys.platform == "win32":
+            return resolved.replace("\\", "/").replace(":", "\\:")
+        return resolved.replace(":", "\\:")
+
+    def _render_segment(
+        self, video_path: str, vf: str, seek: float, frames: int, output_file: str
+    ) -> bool:
+        # -copyts 讓字幕濾鏡看到原始時間，濾鏡後再將片段時間歸零；
+        # 從邊界畫格開始 (精確搜尋會丟掉 seek 之前的畫格) 輸出剛好 frames 個畫格
+        return CFFmpeg.run(
+            [
+                "-ss",
+                f"{seek:.6f}",
+                "-copyts",
+                "-i",
+                video_path,
+                "-vf",
+                f"{vf},setpts=PTS-STARTPTS",
+                "-frames:v",
+                str(frames),
+                "-an",
+                "-c:v",
+                "libx264",
+                "-preset",
+                self.preset,
+                "-crf",
+                str(self.crf),
+                "-pix_fmt",
+                "yuv420p",
+                output_file,
+            ]
+        )
+
+    def _load_manifest(self) -> Dict:
+        path = self.work_dir / self.MANIFEST
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_manifest(self, manifest: Dict):
+        path = self.work_dir / self.MANIFEST
+        temp = path.with_suffix(".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp, path)
+
+    def render(
+        self,
+        video_path: str,
+        subtitle_path: str,
+        output_path: str,
+        filter_template: str = "subtitles='{sub}'",
+    ) -> bool:
+        """
+        燒錄字幕，只重新編碼字幕有變動的片段
+
+        Args:
+            video_path: 原始影片
+            subtitle_path: 字幕檔 (.srt / .ass)
+            output_path: 輸出影片
+            filter_template: 影片濾鏡，{sub} 會替換成字幕路徑
+
+        Returns:
+            是否成功
+        """
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        stat = os.stat(video_path)
+        source_key = {
+            "source": str(Path(video_path).resolve()),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "filter": filter_template,
+            "crf": self.crf,
+            "preset": self.preset,
+        }
+
+        manifest = self._load_manifest()
+        if manifest.get("source_key") != source_key:
+            # 來源或編碼參數變了，全部重新切割
+            duration = CFFmpeg.probe(video_path)["duration"]
+            manifest = {
+                "source_key": source_key,
+                **self._boundaries(video_path, duration),
+                "segments": {},
+            }
+
+        header, events = self.read_events(subtitle_path)
+        bounds = manifest["boundaries"]
+        frames = manifest["frames"]
+        seeks = manifest["seeks"]
+        vf = filter_template.format(sub=self.escape_filter_path(subtitle_path))
+
+        jobs = []
+        files = []
+        for idx, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+            seg_file = self.work_dir / f"seg_{idx:05d}.mp4"
+            files.append(seg_file)
+            digest = self._segment_hash(header, events, start, end)
+            if manifest["segments"].get(str(idx)) == digest and seg_file.exists():
+                continue
+            count = frames[idx + 1] - frames[idx]
+            jobs.append((idx, seeks[idx], count, seg_file, digest))
+
+        print(f"🔧 需要重新編碼 {len(jobs)}/{len(files)} 個片段")
+
+        def run(job):
+            idx, seek, count, seg_file, digest = job
+            ok = self._render_segment(video_path, vf, seek, count, str(seg_file))
+            return idx, digest, ok
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for idx, digest, ok in pool.map(run, jobs):
+                if not ok:
+                    manifest["segments"].pop(str(idx), None)
+                    self._save_manifest(manifest)
+                    print(f"❌ 片段 {idx} 編碼失敗")
+                    return False
+                manifest["segments"][str(idx)] = digest
+
+        self._save_manifest(manifest)
+
+        list_path = self.work_dir / "list.txt"
+        with open(list_path, "w", encoding="utf-8") as f:
+            for seg_file in files:
+                f.write(f"file '{seg_file.resolve().as_posix()}'\n")
+
+        # 影片片段 stream copy 串接，音訊直接取自原始影片
+        ok = CFFmpeg.run(
+            [
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(list_path),
+                "-i",
+                video_path,
+                "-map",
+                "0:v:0",
+                "-map",
+                "1:a?",
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                output_path,
+            ]
+        )
+        if ok:
+            print(f"📁 影片已輸出至：{output_path}")
+        return ok
@@ -1,8 +1,17 @@
 import yt_dlp
 import os
 import re
+import sys
 from datetime import datetime, timedelta
 
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCaptionDedup import CCaptionDedup
+from lib_srt.CCueTrack import CCueTrack
+
 
 class SubtitleProcessor:
     @staticmethod
@@ -34,43 +43,14 @@ class SubtitleProcessor:
         content = re.sub(r"[!]{2,}", "!", content)
         return content
 
-    def remove_duplicates(self, srt_content):
-        blocks = re.split(r"\n\s*\n", srt_content.strip())
-        cleaned = []
-        prev_content = ""
-        prev_end = None
-
-        for block in blocks:
-            lines = block.strip().split("\n")
-            if len(lines) < 3:
-                continue
-            try:
-                index, time_line, *content_lines = lines
-                match = re.match(
-                    r"(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})",
-                    time_line,
-                )
-                if not match:
-                    continue
-                start_str, end_str = match.groups()
-                start = self.parse_srt_time(start_str)
-                end = self.parse_srt_time(end_str)
-                content = self.clean_content(" ".join(content_lines))
-                if content == prev_content:
-                    continue
-                if prev_end and start < prev_end:
-                    start = prev_end + timedelta(milliseconds=1)
-                    if start >= end:
-                        continue
-                if (end - start).total_seconds() < 0.1:
-                    continue
-                new_block = f"{len(cleaned) + 1}\n{self.format_srt_time(start)} --> {self.format_srt_time(end)}\n{content}"
-                cleaned.append(new_block)
-                prev_content, prev_end = content, end
-            except Exception as e:
-                print(f"❌ 清理錯誤: {e}")
-                continue
-        return "\n\n".join(cleaned)
+    def remove_duplicates(self, srt_content, auto_captions=False):
+        """
+        移除重複字幕；auto_captions 為 True (YouTube 自動字幕) 時另外去除滾動重複，
+        否則只移除與前一條完全相同的字幕
+        """
+        track = CCueTrack.from_string(srt_content)
+        track.texts = [self.clean_content(text) for text in track.texts]
+        return CCaptionDedup(rolling=auto_captions).dedupe(track).to_srt()
 
     def adjust_timing(self, srt_content, offset=0, speed=1.0):
         blocks = re.split(r"\n\s*\n", srt_content.strip())
@@ -143,7 +123,7 @@ class SubtitleApp:
             print("❌ 無效網址")
             return
 
-        lang = self.select_language(url)
+        lang, auto_captions = self.select_language(url)
         folder = input("輸出資料夾（Enter 使用預設 ./subs）：").strip() or "./subs"
 
         downloader = YouTubeSubtitleDownloader(url, lang, folder)
@@ -158,7 +138,7 @@ class SubtitleApp:
                 content = f.read()
 
             print(f"🔍 處理字幕: {fname}")
-            cleaned = self.processor.remove_duplicates(content)
+            cleaned = self.processor.remove_duplicates(content, auto_captions)
             with open(path, "w", encoding="utf-8") as f:
                 f.write(cleaned)
             print("✅ 去重複完成")
@@ -168,7 +148,8 @@ class SubtitleApp:
         all_langs = sorted(set(langs["manual"]) | set(langs["automatic"]))
         print("\n可用語言：", ", ".join(all_langs))
         lang = input("請輸入語言代碼（例如 zh-Hant）：").strip()
-        return lang
+        # 沒有人工字幕時 yt-dlp 才會下載自動字幕
+        return lang, lang not in langs["manual"]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,375 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CSentenceSegmenter import CSentenceSegmenter, Word
+from lib_util.CAudioStore import default_store
+from lib_yt.Whisper.CTranscriptCache import CTranscriptCache, default_cache
+
+# CPU 長音檔平行轉錄
+# 1. 整個音檔經 CAudioStore 解碼一次 (16 kHz PCM memmap)，以 VAD 找出說話區段
+# 2. 只在靜音處切成數十秒到數分鐘的區塊
+# 3. 區塊分給多個行程轉錄 (每個行程各自載入一次模型，cpu_threads 依行程數分配)
+# 4. 逐字時間加上區塊起點換回整體時間，接縫處只保留落在區塊核心範圍內的字詞
+# 結果存入 CTranscriptCache，同一音檔以相同設定再轉錄時直接取回
+
+SAMPLE_RATE = 16000
+
+# (區塊編號, 核心開始樣本, 核心結束樣本, 含前後留白的開始樣本, 結束樣本)
+Chunk = Tuple[int, int, int, int, int]
+
+_worker_model = None
+
+
+def _init_worker(model_size: str, compute_type: str, cpu_threads: int):
+    """行程初始化：每個行程只載入一次模型"""
+    global _worker_model
+    from faster_whisper import WhisperModel
+
+    _worker_model = WhisperModel(
+        model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads
+    )
+
+
+def _transcribe_chunk(
+    audio: np.ndarray, offset: float, language: Optional[str], beam_size: int
+) -> Tuple[List[Word], List[Word], str]:
+    """轉錄一個區塊，回傳 (整體時間的 segments, 逐字結果, 語言)"""
+    segments, info = _worker_model.transcribe(
+        audio,
+        language=language,
+        beam_size=beam_size,
+        word_timestamps=True,
+        # 已在靜音處切開，區塊內不需要再做 VAD，也不沿用前文避免幻覺延續
+        vad_filter=False,
+        condition_on_previous_text=False,
+    )
+    seg_list = []
+    words = []
+    for segment in segments:
+        seg_list.append(
+            (segment.start + offset, segment.end + offset, segment.text.strip())
+        )
+        for w in segment.words or []:
+            words.append((w.start + offset, w.end + offset, w.word))
+    return seg_list, words, info.language
+
+
+def plan_chunks(
+    speech: Sequence[Dict[str, int]],
+    total: int,
+    target: int,
+    max_len: int,
+    pad: int,
+) -> List[Chunk]:
+    """
+    依說話區段在靜音處切出區塊 (單位皆為樣本數)
+
+    Args:
+        speech: VAD 結果 [{"start", "end"}]
+        total: 音檔總樣本數
+        target: 區塊達到此長度後，在下一個靜音處切開
+        max_len: 區塊長度上限，單一說話區段超過時強制切開
+        pad: 區塊前後多帶的留白
+
+    Returns:
+        [(編號, 核心開始, 核心結束, 開始, 結束)]
+    """
+    # 太長的說話區段先等分
+    regions = []
+    for r in speech:
+        start, end = r["start"], r["end"]
+        pieces = max(1, -(-(end - start) // max_len))
+        step = (end - start) / pieces
+        for i in range(pieces):
+            regions.append((round(start + i * step), round(start + (i + 1) * step)))
+
+    bounds = []
+    chunk_start = chunk_end = None
+    for start, end in regions:
+        # 加入後會超過上限就先在前一個靜音處切開
+        if chunk_start is not None and end - chunk_start > max_len:
+            bounds.append((chunk_start, chunk_end))
+            chunk_start = None
+        if chunk_start is None:
+            chunk_start = start
+        chunk_end = end
+        if end - chunk_start >= target:
+            bounds.append((chunk_start, end))
+            chunk_start = None
+    if chunk_start is not None:
+        bounds.append((chunk_start, chunk_end))
+
+    chunks = []
+    for i, (start, end) in enumerate(bounds):
+        # 核心範圍延伸到相鄰區塊之間的靜音中點，接縫上的字詞只屬於一邊
+        core_start = 0 if i == 0 else (bounds[i - 1][1] + start) // 2
+        core_end = total if i == len(bounds) - 1 else (end + bounds[i + 1][0]) // 2
+        chunks.append(
+            (i, core_start, core_end, max(0, start - pad), min(total, end + pad))
+        )
+    return chunks
+
+
+def stitch(results: Sequence[Tuple[Chunk, List[Word]]]) -> List[Word]:
+    """依區塊順序接回逐字結果 (或 segments)，移除接縫上的重複字詞"""
+    words: List[Word] = []
+    for (_, core_start, core_end, _, _), chunk_words in sorted(results):
+        lo, hi = core_start / SAMPLE_RATE, core_end / SAMPLE_RATE
+        for w in chunk_words:
+            mid = (w[0] + w[1]) / 2
+            if not lo <= mid < hi:
+                continue
+            # 留白範圍內兩邊都辨識到的同一個字
+            if (
+                words
+                and w[2].strip().lower() == words[-1][2].strip().lower()
+                and w[0] < words[-1][1]
+            ):
+                continue
+            words.append(w)
+    return words
+
+
+class CChunkedTranscriber:
+    def __init__(
+        self,
+        model_size: str = "small",
+        compute_type: str = "int8",
+        workers: Optional[int] = None,
+        cpu_threads: Optional[int] = None,
+        chunk_seconds: float = 120.0,
+        max_speech_seconds: float = 300.0,
+        pad_seconds: float = 0.3,
+        beam_size: int = 5,
+        cache: Optional[CTranscriptCache] = None,
+    ):
+        """
+        Args:
+            model_size: Whisper 模型大小
+            compute_type: CTranslate2 計算型別 (CPU 建議 int8)
+            workers: 行程數，None 表示依 CPU 核心數 (與 cpu_threads) 決定
+            cpu_threads: 每個行程的執行緒數，None 表示核心數平均分配；
+                         只指定 cpu_threads 時行程數 = 核心數 / cpu_threads
+            chunk_seconds: 區塊目標長度 (秒)，到達後在下一個靜音處切開
+            max_speech_seconds: 連續說話超過此秒數時強制切開
+            pad_seconds: 區塊前後多帶的留白 (秒)
+            beam_size: beam search 寬度
+            cache: 轉錄結果快取，None 表示使用預設目錄
+        """
+        cores = os.cpu_count() or 1
+        self.model_size = model_size
+        self.compute_type = compute_type
+        if workers is None and cpu_threads:
+            # 例如建議設定實測出的執行緒數 (見 whisper_profile)
+            workers = max(1, min(4, cores // cpu_threads))
+        self.workers = workers or max(1, min(4, cores // 2))
+        self.cpu_threads = cpu_threads or max(1, cores // self.workers)
+        self.chunk_seconds = chunk_seconds
+        self.max_speech_seconds = max_speech_seconds
+        self.pad_seconds = pad_seconds
+        self.beam_size = beam_size
+        self.cache = cache or default_cache()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # 行程池與模型在多次轉錄間共用
+        if self._pool is None:
+            print(
+                f"[Chunked] 啟動 {self.workers} 個行程 "
+                f"(每個 {self.cpu_threads} 執行緒，模型 {self.model_size})"
+            )
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_size, self.compute_type, self.cpu_threads),
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def split(self, audio: np.ndarray) -> List[Chunk]:
+        """以 VAD 找出說話區段並規劃區塊"""
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500))
+        if not speech:
+            return []
+        return plan_chunks(
+            speech,
+            len(audio),
+            round(self.chunk_seconds * SAMPLE_RATE),
+            round(self.max_speech_seconds * SAMPLE_RATE),
+            round(self.pad_seconds * SAMPLE_RATE),
+        )
+
+    def cache_key(self, input_path: str, language: Optional[str]) -> str:
+        # 區塊切法會影響結果，一併納入快取鍵
+        return self.cache.key(
+            input_path,
+            self.model_size,
+            self.compute_type,
+            language,
+            engine="chunked",
+            beam_size=self.beam_size,
+            chunk_seconds=self.chunk_seconds,
+            max_speech_seconds=self.max_speech_seconds,
+            pad_seconds=self.pad_seconds,
+        )
+
+    def transcribe(
+        self, input_path: str, language: Optional[str] = None, use_cache: bool = True
+    ) -> Tuple[dict, Dict]:
+        """
+        平行轉錄整個音檔
+
+        Args:
+            input_path: 音檔路徑
+            language: 指定語言，None 表示以第一個區塊偵測
+            use_cache: 是否查詢與寫入轉錄快取
+
+        Returns:
+            (結果 {language, duration, segments, words} (時間為整體秒數),
+             統計 {lan, duration, chunks, elapsed, rtf, cached})
+        """
+        t0 = time.perf_counter()
+        key = self.cache_key(input_path, language) if use_cache else None
+        transcript = self.cache.get(key) if key else None
+        cached = transcript is not None
+        chunks = 0
+        if transcript is None:
+            transcript, chunks = self._transcribe(input_path, language)
+            if key:
+                self.cache.put(key, transcript)
+
+        elapsed = time.perf_counter() - t0
+        duration = transcript["duration"]
+        stats = {
+            "lan": transcript["language"],
+            "duration": duration,
+            "chunks": chunks,
+            "elapsed": elapsed,
+            "rtf": elapsed / duration if duration else 0.0,
+            "cached": cached,
+        }
+        print(
+            f"[Chunked] 完成 {len(transcript['words'])} 字，"
+            f"耗時 {elapsed:.1f} 秒 (RTF {stats['rtf']:.3f})"
+        )
+        return transcript, stats
+
+    def _transcribe(self, input_path: str, language: Optional[str]) -> Tuple[dict, int]:
+        audio = default_store().whisper_audio(input_path)
+        duration = len(audio) / SAMPLE_RATE
+        chunks = self.split(audio)
+        print(f"[Chunked] {duration:.0f} 秒音檔切成 {len(chunks)} 個區塊")
+
+        seg_results = []
+        word_results = []
+        pending = list(chunks)
+        if pending and language is None:
+            # 第一個區塊先做，偵測到的語言用在其餘區塊，避免各區塊判斷不一致
+            first = pending.pop(0)
+            segments, words, language = self.pool.submit(
+                _transcribe_chunk,
+                audio[first[3] : first[4]],
+                first[3] / SAMPLE_RATE,
+                None,
+                self.beam_size,
+            ).result()
+            seg_results.append((first, segments))
+            word_results.append((first, words))
+            print(f"[Chunked] 偵測語言：{language}")
+
+        futures = [
+            (
+                chunk,
+                self.pool.submit(
+                    _transcribe_chunk,
+                    audio[chunk[3] : chunk[4]],
+                    chunk[3] / SAMPLE_RATE,
+                    language,
+                    self.beam_size,
+                ),
+            )
+            for chunk in pending
+        ]
+        for chunk, future in futures:
+            segments, words, _ = future.result()
+            seg_results.append((chunk, segments))
+            word_results.append((chunk, words))
+
+        transcript = {
+            "language": language,
+            "duration": duration,
+            "segments": stitch(seg_results),
+            "words": stitch(word_results),
+        }
+        return transcript, len(chunks)
+
+    def transcribe_to_srt(
+        self, input_path: str, output_srt_path: str, language: Optional[str] = None
+    ) -> dict:
+        """轉錄並依逐字時間切成句子字幕"""
+        transcript, stats = self.transcribe(input_path, language)
+        CSentenceSegmenter().segment(transcript["words"]).save(
+            output_srt_path, fmt="srt"
+        )
+        return {"srt_path": output_srt_path, **stats}
+
+
+# 整個服務共用一個轉錄器 (一個行程池)：設定改變時關閉舊的行程池再建立新的，
+# 避免每組設定各留一批載入模型的行程；FastAPI 關閉時呼叫 shutdown_shared()
+_shared: Optional[CChunkedTranscriber] = None
+_shared_settings: Dict = {}
+_shared_lock = threading.Lock()
+
+
+def transcribe_shared(
+    input_path: str,
+    output_srt_path: str,
+    language: Optional[str] = None,
+    **settings,
+) -> dict:
+    """
+    以共用的轉錄器執行 transcribe_to_srt
+
+    同時只執行一個轉錄 (行程池已用滿 CPU 核心)，也避免替換行程池時有轉錄正在使用
+
+    Args:
+        settings: CChunkedTranscriber 的參數 (model_size / compute_type / beam_size ...)
+    """
+    global _shared, _shared_settings
+    with _shared_lock:
+        if _shared is None or _shared_settings != settings:
+            if _shared is not None:
+                print("[Chunked] 設定改變，關閉舊的行程池")
+                _shared.close()
+            _shared = CChunkedTranscriber(**settings)
+            _shared_settings = settings
+        return _shared.transcribe_to_srt(input_path, output_srt_path, language)
+
+
+def shutdown_shared():
+    """關閉共用的行程池"""
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
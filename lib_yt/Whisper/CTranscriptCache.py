@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from lib_util.CAudioStore import default_store
+
+# 轉錄結果快取
+# 以 (音檔內容雜湊, 模型, 計算型別, 語言, 其他選項) 為鍵，
+# 同一個 MP3 重新匯入時直接取回 segments 與逐字時間，不再重跑 Whisper
+#
+# 每筆存成一個 .npz：時間為毫秒 int32 陣列，文字以 \x1f 串接後存成 UTF-8 位元組
+
+# (開始秒, 結束秒, 文字)
+Segment = Tuple[float, float, str]
+
+_SEP = "\x1f"
+_FORMAT = 1
+
+
+def _pack_texts(texts: List[str]) -> np.ndarray:
+    return np.frombuffer(_SEP.join(texts).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack_texts(data: np.ndarray, count: int) -> List[str]:
+    if count == 0:
+        return []
+    return data.tobytes().decode("utf-8").split(_SEP)
+
+
+def _pack_times(items: List[Segment]) -> np.ndarray:
+    return np.round(
+        np.array([(s, e) for s, e, _ in items], dtype=np.float64).reshape(-1, 2)
+        * 1000
+    ).astype(np.int32)
+
+
+def _unpack_times(times: np.ndarray, texts: List[str]) -> List[Segment]:
+    return [(s / 1000, e / 1000, t) for (s, e), t in zip(times.tolist(), texts)]
+
+
+class CTranscriptCache:
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir: 快取目錄，None 時使用環境變數 TRANSCRIPT_CACHE_DIR
+                       或 ~/.cache/transcripts
+        """
+        self.cache_dir = cache_dir or os.environ.get(
+            "TRANSCRIPT_CACHE_DIR",
+            os.path.join(os.path.expanduser("~"), ".cache", "transcripts"),
+        )
+        # (路徑, 大小, 修改時間) -> 內容雜湊，同一個行程內不重複讀檔計算
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def audio_hash(self, audio_path: str) -> str:
+        """音檔內容雜湊 (blake2b)"""
+        st = os.stat(audio_path)
+        stat_key = (os.path.abspath(audio_path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._hashes.get(stat_key)
+        if digest:
+            return digest
+
+        h = hashlib.blake2b(digest_size=20)
+        with open(audio_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self._hashes[stat_key] = digest
+        return digest
+
+    def key(
+        self,
+        audio_path: str,
+        model_size: str,
+        compute_type: str,
+        language: Optional[str] = None,
+        **options,
+    ) -> str:
+        """
+        計算快取鍵
+
+        Args:
+            audio_path: 音檔路徑 (以內容計算，不受檔名影響)
+            model_size: 模型大小
+            compute_type: 計算型別
+            language: 指定語言，None 表示自動偵測
+            options: 其他會影響結果的選項 (beam_size, word_timestamps ...)
+        """
+        payload = json.dumps(
+            {
+                "format": _FORMAT,
+                "audio": self.audio_hash(audio_path),
+                "model": model_size,
+                "compute_type": compute_type,
+                "language": language,
+                "options": options,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npz")
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        讀取快取
+
+        Returns:
+            {"language", "duration", "segments": [(開始秒, 結束秒, 文字)],
+             "words": [(開始秒, 結束秒, 字詞)]}，未命中時為 None
+        """
+        try:
+            with np.load(self._path(key)) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                segments = _unpack_times(
+                    data["seg_times"],
+                    _unpack_texts(data["seg_texts"], len(data["seg_times"])),
+                )
+                words = _unpack_times(
+                    data["word_times"],
+                    _unpack_texts(data["word_texts"], len(data["word_times"])),
+                )
+        except (OSError, KeyError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"⚠️ 轉錄快取讀取失敗 {key}: {e}")
+            return None
+        print(f"[TranscriptCache] ✓ 命中快取 {key[:12]}")
+        return {
+            "language": meta["language"],
+            "duration": meta["duration"],
+            "segments": segments,
+            "words": words,
+        }
+
+    def put(self, key: str, transcript: dict):
+        """寫入快取 (先寫暫存檔再改名，中斷時不會留下不完整的檔案)"""
+        path = self._path(key)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        meta = {
+            "language": transcript.get("language"),
+            "duration": transcript.get("duration"),
+        }
+        segments = transcript.get("segments") or []
+        words = transcript.get("words") or []
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    meta=np.frombuffer(json.dumps(meta).encode("utf-8"), np.uint8),
+                    seg_times=_pack_times(segments),
+                    seg_texts=_pack_texts([s[2] for s in segments]),
+                    word_times=_pack_times(words),
+                    word_texts=_pack_texts([w[2] for w in words]),
+                )
+            os.replace(temp, path)
+        except OSError as e:
+            print(f"⚠️ 轉錄快取寫入失敗: {e}")
+            if os.path.exists(temp):
+                os.remove(temp)
+
+
+def collect(segments, info) -> dict:
+    """把 faster-whisper 的 (segments, info) 展開成可快取的結果"""
+    seg_list: List[Segment] = []
+    words: List[Segment] = []
+    for segment in segments:
+        seg_list.append((segment.start, segment.end, segment.text.strip()))
+        for w in segment.words or []:
+            words.append((w.start, w.end, w.word))
+    return {
+        "language": info.language,
+        "duration": info.duration,
+        "segments": seg_list,
+        "words": words,
+    }
+
+
+def transcribe_cached(
+    load_model: Callable,
+    audio_path: str,
+    model_size: str,
+    compute_type: str,
+    cache: Optional[CTranscriptCache] = None,
+    language: Optional[str] = None,
+    **options,
+) -> dict:
+    """
+    先查快取，未命中才載入模型轉錄並寫回快取
+
+    Args:
+        load_model: 回傳 WhisperModel 的函式 (命中快取時不會呼叫)
+        model_size / compute_type: 模型設定 (組成快取鍵)
+        cache: 快取，None 表示使用預設目錄
+        language: 指定語言，None 表示自動偵測
+        options: 傳給 model.transcribe 的其他參數
+    """
+    cache = cache or default_cache()
+    key = cache.key(audio_path, model_size, compute_type, language, **options)
+    transcript = cache.get(key)
+    if transcript is None:
+        # 使用共用的 16 kHz PCM，不再由 faster-whisper 重新解碼 MP3
+        audio = default_store().whisper_audio(audio_path)
+        segments, info = load_model().transcribe(audio, language=language, **options)
+        print(f"[FasterWhisper] 偵測語言：{info.language}")
+        transcript = collect(segments, info)
+        cache.put(key, transcript)
+    return transcript
+
+
+_default_cache: Optional[CTranscriptCache] = None
+
+
+def default_cache() -> CTranscriptCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = CTranscriptCache()
+    return _default_cache
@@ -1,15 +1,16 @@
 # transcriber.py
 import torch
-from faster_whisper import WhisperModel
+
+from lib_srt.CSentenceSegmenter import CSentenceSegmenter
+from lib_yt.Whisper.CTranscriptCache import transcribe_cached
+from lib_yt.Whisper.model_pool import get_model
 
 
 class FasterWhisperTranscriber:
     def __init__(self, model_size="small", device="cpu", compute_type="int8"):
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"[FasterWhisper] 初始化模型 {model_size} on {self.device}")
-        self.model = WhisperModel(
-            model_size, device=self.device, compute_type=compute_type
-        )
+        self.model_size = model_size
+        self.compute_type = compute_type
 
     def format_timestamp(self, seconds: float) -> str:
         h = int(seconds // 3600)
@@ -18,17 +19,34 @@ class FasterWhisperTranscriber:
         ms = int((seconds - int(seconds)) * 1000)
         return f"{h:02}:{m:02}:{s:02},{ms:03}"
 
-    def transcribe_to_srt(self, input_path: str, output_srt_path: str) -> dict:
+    def transcribe_to_srt(
+        self, input_path: str, output_srt_path: str, resegment: bool = True
+    ) -> dict:
         print(f"[FasterWhisper] 開始轉錄：{input_path}")
-        segments, info = self.model.transcribe(input_path, beam_size=5)
-        print(f"[FasterWhisper] 偵測語言：{info.language}")
+        transcript = transcribe_cached(
+            # 快取沒有結果時才向模型池取得 (共用已載入的模型)
+            lambda: get_model(self.model_size, self.device, self.compute_type),
+            input_path,
+            self.model_size,
+            self.compute_type,
+            beam_size=5,
+            word_timestamps=resegment,
+        )
+        language = transcript["language"]
+
+        if resegment:
+            # 依逐字時間重新切成完整句子
+            CSentenceSegmenter().segment(transcript["words"]).save(
+                output_srt_path, fmt="srt"
+            )
+            return {"srt_path": output_srt_path, "lan": language}
 
         with open(output_srt_path, "w", encoding="utf-8") as f:
-            for i, segment in enumerate(segments, start=1):
+            for i, (start, end, text) in enumerate(transcript["segments"], start=1):
                 f.write(f"{i}\n")
                 f.write(
-                    f"{self.format_timestamp(segment.start)} --> {self.format_timestamp(segment.end)}\n"
+                    f"{self.format_timestamp(start)} --> {self.format_timestamp(end)}\n"
                 )
-                f.write(f"{segment.text.strip()}\n\n")
+                f.write(f"{text}\n\n")
 
-        return {"srt_path": output_srt_path, "lan": info.language}
+        return {"srt_path": output_srt_path, "lan": language}
@@ -0,0 +1,72 @@
+# model_pool.py
+# 共用的 WhisperModel：同一組 (模型, 裝置, 計算型別) 整個行程只載入一次，
+# 第一次使用時才載入，避免 import 路由時就佔用大量記憶體；
+# 沒有指定的參數使用本機實測的建議設定 (見 whisper_profile)
+import threading
+from typing import Dict, Optional, Tuple
+
+from faster_whisper import WhisperModel
+
+from lib_yt.Whisper.whisper_profile import default_device, load_profile
+
+_models: Dict[Tuple[str, str, str, int], WhisperModel] = {}
+_lock = threading.Lock()
+
+
+def resolve(
+    device: Optional[str] = None, compute_type: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    補上預設的裝置與計算型別：
+    建議設定有計算型別時使用之，否則 GPU 用 float16、CPU 用 int8
+    """
+    device = device or default_device()
+    compute_type = compute_type or load_profile(device)["compute_type"]
+    return device, compute_type or ("float16" if device == "cuda" else "int8")
+
+
+def get_model(
+    model_size: Optional[str] = None,
+    device: Optional[str] = None,
+    compute_type: Optional[str] = None,
+    cpu_threads: Optional[int] = None,
+) -> WhisperModel:
+    """
+    取得共用模型
+
+    Args:
+        model_size: 模型大小 (tiny, base, small, medium, large-v3 ...)，
+                    None 表示使用建議設定
+        device: cpu / cuda，None 表示自動判斷
+        compute_type: None 表示依建議設定或裝置決定 (見 resolve)
+        cpu_threads: CPU 執行緒數，None 表示使用建議設定
+    """
+    device, compute_type = resolve(device, compute_type)
+    profile = load_profile(device)
+    model_size = model_size or profile["model_size"]
+    if cpu_threads is None:
+        cpu_threads = profile["cpu_threads"]
+    key = (model_size, device, compute_type, cpu_threads)
+
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _lock:
+        # 等待鎖時可能已被其他執行緒載入
+        if key not in _models:
+            print(f"[FasterWhisper] 載入模型 {model_size} on {device} ({compute_type})")
+            _models[key] = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+            )
+            print("[FasterWhisper] ✓ 模型載入完成")
+        return _models[key]
+
+
+def release(model_size: Optional[str] = None):
+    """釋放模型，None 表示全部"""
+    with _lock:
+        for key in [k for k in _models if model_size in (None, k[0])]:
+            del _models[key]
@@ -0,0 +1,110 @@
+# whisper_profile.py
+# 本機的 Whisper 建議設定
+# Bench/bench_whisper_tune.py 在本機實測各種 (模型, 計算型別, beam, 執行緒) 後寫入建議設定，
+# model_pool 與轉錄端點沒有指定參數時自動套用；
+# 設定檔依「主機名稱/裝置」分開存放，同一份檔案可以放多台機器的結果
+import json
+import os
+import platform
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+PROFILE_KEYS = ("model_size", "compute_type", "beam_size", "cpu_threads")
+# 沒有實測結果時的設定；compute_type None 表示依裝置決定 (GPU float16、CPU int8)，
+# cpu_threads 0 表示由 CTranslate2 自行決定
+DEFAULT_PROFILE = {
+    "model_size": "small",
+    "compute_type": None,
+    "beam_size": 5,
+    "cpu_threads": 0,
+}
+
+_cache: Tuple[float, dict] = (0.0, {})
+_lock = threading.Lock()
+
+
+def default_device() -> str:
+    try:
+        import torch
+
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+def profile_path() -> str:
+    """設定檔路徑：環境變數 WHISPER_PROFILE 或 ~/.cache/whisper_profile.json"""
+    return os.environ.get("WHISPER_PROFILE") or os.path.join(
+        os.path.expanduser("~"), ".cache", "whisper_profile.json"
+    )
+
+
+def host_id(device: str) -> str:
+    return f"{platform.node()}/{device}"
+
+
+def _read() -> dict:
+    # 檔案沒有更動時不重新讀取
+    global _cache
+    path = profile_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    with _lock:
+        if _cache[0] != mtime:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    _cache = (mtime, json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Whisper 設定檔讀取失敗: {e}")
+                _cache = (mtime, {})
+        return _cache[1]
+
+
+def load_profile(device: Optional[str] = None, **defaults) -> dict:
+    """
+    取得本機的建議設定
+
+    Args:
+        device: cpu / cuda，None 表示自動判斷
+        defaults: 沒有實測結果時使用的設定 (覆蓋 DEFAULT_PROFILE)
+
+    Returns:
+        {"device", "model_size", "compute_type", "beam_size", "cpu_threads", "tuned"}
+    """
+    device = device or default_device()
+    profile = {**DEFAULT_PROFILE, **defaults}
+    tuned = _read().get("hosts", {}).get(host_id(device))
+    if tuned:
+        profile.update({k: tuned[k] for k in PROFILE_KEYS if k in tuned})
+    return {**profile, "device": device, "tuned": bool(tuned)}
+
+
+def save_profile(profile: Dict, device: str, metrics: Optional[Dict] = None) -> str:
+    """
+    寫入本機的建議設定 (保留其他主機的設定)
+
+    Returns:
+        設定檔路徑
+    """
+    path = profile_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+
+    data.setdefault("hosts", {})[host_id(device)] = {
+        **{k: profile[k] for k in PROFILE_KEYS if k in profile},
+        "cpu_count": os.cpu_count(),
+        "metrics": metrics or {},
+        "measured_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp, path)
+    return path
@@ -0,0 +1,207 @@
+import asyncio
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from yt_dlp import YoutubeDL
+
+# yt-dlp 影片資訊快取
+# extract_info 每次都要連線並解析播放頁，同一部影片在一次流程中常被查好幾次。
+# 以影片 ID 為鍵把 info 存成 gzip JSON (只保留常用欄位)，TTL 內直接取回；
+# 記憶體另有一層，同一個行程內重複查詢不讀檔。async 版本在專用執行緒池執行，不阻塞事件迴圈
+
+# 保留的欄位 (formats / thumbnails / heatmap 等大型欄位不存)
+DEFAULT_FIELDS = (
+    "id",
+    "title",
+    "fulltitle",
+    "uploader",
+    "uploader_id",
+    "channel",
+    "channel_id",
+    "upload_date",
+    "view_count",
+    "like_count",
+    "duration",
+    "webpage_url",
+    "thumbnail",
+    "description",
+    "categories",
+    "tags",
+    "language",
+    "ext",
+    "format",
+    "format_id",
+    "abr",
+    "acodec",
+    "live_status",
+)
+# 只保留語言代碼的欄位 ({語言: []})
+KEYS_ONLY_FIELDS = ("subtitles", "automatic_captions")
+
+_ID_RE = re.compile(r"^[\w-]{11}$")
+
+
+def video_id_from_url(url: str) -> Optional[str]:
+    """由影片網址或 ID 取得影片 ID，播放清單等無法判斷時回傳 None"""
+    if _ID_RE.match(url):
+        return url
+    parsed = urlparse(url)
+    host = parsed.hostname or ""
+    if host.endswith("youtu.be"):
+        candidate = parsed.path.strip("/").split("/")[0]
+    elif "v" in parse_qs(parsed.query):
+        candidate = parse_qs(parsed.query)["v"][0]
+    else:
+        match = re.search(r"/(?:shorts|embed|live)/([\w-]{11})", parsed.path)
+        candidate = match.group(1) if match else ""
+    return candidate if _ID_RE.match(candidate) else None
+
+
+def project(info: dict, fields: Iterable[str] = DEFAULT_FIELDS) -> dict:
+    """只留下需要的欄位"""
+    result = {k: info[k] for k in fields if k in info}
+    for key in KEYS_ONLY_FIELDS:
+        if key in info:
+            result[key] = {lang: [] for lang in info.get(key) or {}}
+    return result
+
+
+class CInfoCache:
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        ttl: float = 24 * 3600,
+        fields: Iterable[str] = DEFAULT_FIELDS,
+        workers: int = 4,
+    ):
+        """
+        Args:
+            cache_dir: 快取目錄，None 時使用環境變數 YT_INFO_CACHE_DIR 或 ~/.cache/yt_info
+            ttl: 有效秒數 (觀看次數等欄位會變動)
+            fields: 保留的欄位
+            workers: async 查詢使用的執行緒數
+        """
+        self.cache_dir = cache_dir or os.environ.get(
+            "YT_INFO_CACHE_DIR",
+            os.path.join(os.path.expanduser("~"), ".cache", "yt_info"),
+        )
+        self.ttl = ttl
+        self.fields = tuple(fields)
+        self._memory: Dict[str, Tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+        # 同一部影片同時只查一次
+        self._fetching: Dict[str, threading.Lock] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _path(self, video_id: str) -> str:
+        return os.path.join(self.cache_dir, video_id[:2], f"{video_id}.json.gz")
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """取回未過期的資訊，沒有時回傳 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(video_id)
+        if entry and now - entry[0] < self.ttl:
+            return entry[1]
+
+        try:
+            with gzip.open(self._path(video_id), "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if now - data["fetched_at"] >= self.ttl:
+            return None
+        with self._lock:
+            self._memory[video_id] = (data["fetched_at"], data["info"])
+        return data["info"]
+
+    def put(self, info: dict) -> dict:
+        """存入資訊 (先投影欄位)，回傳存入的內容"""
+        video_id = info.get("id")
+        info = project(info, self.fields)
+        if not video_id:
+            return info
+        fetched_at = time.time()
+        with self._lock:
+            self._memory[video_id] = (fetched_at, info)
+
+        path = self._path(video_id)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = {"fetched_at": fetched_at, "info": info}
+            with gzip.open(temp, "wt", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp, path)
+        except OSError as e:
+            print(f"⚠️ 影片資訊快取寫入失敗: {e}")
+        return info
+
+    def invalidate(self, video_id: str):
+        with self._lock:
+            self._memory.pop(video_id, None)
+        try:
+            os.remove(self._path(video_id))
+        except OSError:
+            pass
+
+    @staticmethod
+    def extract(url: str) -> dict:
+        with YoutubeDL({"quiet": True, "skip_download": True}) as ydl:
+            return ydl.extract_info(url, download=False)
+
+    def fetch(self, url: str, refresh: bool = False) -> dict:
+        """
+        取得影片資訊，快取有效時不連線
+
+        Args:
+            url: 影片網址或 ID (無法判斷 ID 的網址不快取)
+            refresh: 忽略快取重新取得
+        """
+        video_id = video_id_from_url(url)
+        if video_id is None:
+            return self.extract(url)
+        if not refresh:
+            info = self.get(video_id)
+            if info is not None:
+                return info
+
+        with self._lock:
+            lock = self._fetching.setdefault(video_id, threading.Lock())
+        with lock:
+            # 等待期間其他執行緒可能已經取得
+            if not refresh:
+                info = self.get(video_id)
+                if info is not None:
+                    return info
+            if _ID_RE.match(url):
+                url = f"https://www.youtube.com/watch?v={url}"
+            return self.put(self.extract(url))
+
+    async def fetch_async(self, url: str, refresh: bool = False) -> dict:
+        """fetch 的 async 版本，命中記憶體快取時不切換執行緒"""
+        video_id = video_id_from_url(url)
+        if video_id and not refresh:
+            with self._lock:
+                entry = self._memory.get(video_id)
+            if entry and time.time() - entry[0] < self.ttl:
+                return entry[1]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.fetch, url, refresh)
+
+
+_default_cache: Optional[CInfoCache] = None
+
+
+def default_info_cache() -> CInfoCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = CInfoCache()
+    return _default_cache
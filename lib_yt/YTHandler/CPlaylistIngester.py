@@ -0,0 +1,285 @@
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from yt_dlp import YoutubeDL
+
+# Add the project root to Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CArtifactManifest import CArtifactManifest
+from lib_util.CHttpClient import close_client, download
+from lib_yt.YTHandler.CInfoCache import default_info_cache
+from lib_yt.YTHandler.YTAudio import download_asr_audio
+from lib_yt.YTHandler.YTInfo import query_existing_ids, save_videos_to_db
+
+# 播放清單並行匯入
+# 1. 以 extract_flat 一次展開清單 (不逐部抓資訊)，去除重複 ID
+# 2. 一個 SQL 查出哪些 ID 已在 videos
+# 3. 新影片交給 async worker：資訊 / 音訊 / 縮圖各自依主機限制並行數，失敗時指數退避重試
+# 4. 資訊全部取得後一次寫入資料庫
+
+# 每個主機同時進行的請求數
+HOST_LIMITS = {
+    "youtube.com": 4,  # extract_info
+    "googlevideo.com": 3,  # 音訊串流
+    "ytimg.com": 8,  # 縮圖
+}
+
+WATCH_URL = "https://www.youtube.com/watch?v="
+
+
+def host_key(url: str) -> str:
+    """網址對應到 HOST_LIMITS 的鍵，沒有對應時使用主機名稱"""
+    host = urlparse(url).hostname or url
+    for suffix in HOST_LIMITS:
+        if host == suffix or host.endswith("." + suffix):
+            return suffix
+    return host
+
+
+def expand_playlist(url: str) -> List[dict]:
+    """
+    展開播放清單 (只取清單項目，不抓每部影片的完整資訊)
+
+    Returns:
+        [{"id", "title", "url"}]，依清單順序且 ID 不重複
+    """
+    ydl_opts = {"quiet": True, "extract_flat": "in_playlist", "skip_download": True}
+    with YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    entries = info.get("entries") or [info]
+    seen = set()
+    result = []
+    for entry in entries:
+        video_id = (entry or {}).get("id")
+        if not video_id or video_id in seen:
+            continue
+        seen.add(video_id)
+        result.append(
+            {
+                "id": video_id,
+                "title": entry.get("title"),
+                "url": entry.get("url") or f"{WATCH_URL}{video_id}",
+            }
+        )
+    return result
+
+
+def fetch_info_sync(url: str) -> dict:
+    return default_info_cache().fetch(url)
+
+
+class CPlaylistIngester:
+    def __init__(
+        self,
+        output_dir: str,
+        workers: int = 8,
+        host_limits: Optional[Dict[str, int]] = None,
+        retries: int = 3,
+        backoff: float = 2.0,
+        download_audio: bool = True,
+        download_thumbnail: bool = True,
+        user_id: Optional[int] = None,
+        db_batch_size: int = 10,
+    ):
+        """
+        Args:
+            output_dir: 下載目錄，每部影片一個子目錄
+            workers: 同時處理的影片數
+            host_limits: 各主機的並行上限，預設 HOST_LIMITS
+            retries: 每個請求失敗後的重試次數
+            backoff: 第一次重試前等待秒數，之後每次加倍 (另加隨機抖動)
+            download_audio: 是否下載轉錄用音訊
+            download_thumbnail: 是否下載縮圖
+            user_id: 寫入 videos 的 user_id
+            db_batch_size: 每完成幾部影片寫入一次資料庫 (中斷時已寫入的不會遺失)
+        """
+        self.output_dir = output_dir
+        self.workers = workers
+        self.host_limits = {**HOST_LIMITS, **(host_limits or {})}
+        self.retries = retries
+        self.backoff = backoff
+        self.download_audio = download_audio
+        self.download_thumbnail = download_thumbnail
+        self.user_id = user_id
+        self.db_batch_size = db_batch_size
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.host_limits.get(host, 4))
+        return self._semaphores[host]
+
+    async def _call(self, host: str, func: Callable, *args):
+        """
+        在主機並行限制內執行 func (同步函式放到執行緒)，失敗時退避重試
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore(host):
+                    if asyncio.iscoroutinefunction(func):
+                        return await func(*args)
+                    return await asyncio.to_thread(func, *args)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * (2**attempt) * random.uniform(0.8, 1.2)
+                print(f"⚠️ {host} 請求失敗 ({e})，{delay:.1f} 秒後重試")
+                await asyncio.sleep(delay)
+
+    async def plan(self, playlist_url: str) -> Tuple[List[dict], List[dict]]:
+        """
+        展開清單並查出需要匯入的影片
+
+        Returns:
+            (新影片, 已存在的影片)
+        """
+        host = host_key(playlist_url)
+        entries = await self._call(host, expand_playlist, playlist_url)
+        existing = await query_existing_ids([e["id"] for e in entries])
+        new = [e for e in entries if e["id"] not in existing]
+        old = [e for e in entries if e["id"] in existing]
+        print(f"📋 清單共 {len(entries)} 部：新影片 {len(new)}，已存在 {len(old)}")
+        return new, old
+
+    async def _process(self, entry: dict) -> dict:
+        video_id = entry["id"]
+        video_dir = os.path.join(self.output_dir, video_id)
+        os.makedirs(video_dir, exist_ok=True)
+
+        url = f"{WATCH_URL}{video_id}"
+        info = await self._call(host_key(url), fetch_info_sync, url)
+        # 與 /admin/download 共用 manifest，已完成的下載不重做
+        manifest = CArtifactManifest(video_dir, video_id)
+
+        async def audio():
+            path = await self._call(
+                "googlevideo.com", download_asr_audio, url, video_dir, video_id
+            )
+            if path:
+                await asyncio.to_thread(
+                    manifest.record, "audio", path, mode="transcribe"
+                )
+
+        async def thumbnail(thumbnail_url: str):
+            path = os.path.join(video_dir, f"{video_id}.jpg")
+            # 縮圖走共用的 async HTTP client
+            await self._call(host_key(thumbnail_url), download, thumbnail_url, path)
+            manifest.record("thumbnail", path, url=thumbnail_url)
+
+        tasks = []
+        if self.download_audio and not await asyncio.to_thread(
+            manifest.valid, "audio"
+        ):
+            tasks.append(audio())
+        thumbnail_url = info.get("thumbnail")
+        if (
+            self.download_thumbnail
+            and thumbnail_url
+            and not manifest.valid("thumbnail")
+        ):
+            tasks.append(thumbnail(thumbnail_url))
+        # 音訊與縮圖在不同主機，同時下載
+        await asyncio.gather(*tasks)
+        return info
+
+    async def run(self, entries: Sequence[dict]) -> dict:
+        """
+        並行處理影片並寫入資料庫
+
+        Returns:
+            {"done": [ID], "failed": {ID: 錯誤訊息}, "elapsed": 秒}
+        """
+        t0 = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue()
+        for entry in entries:
+            queue.put_nowait(entry)
+
+        infos: List[dict] = []
+        failed: Dict[str, str] = {}
+        pending: List[dict] = []
+        saved = 0
+        db_lock = asyncio.Lock()
+
+        async def flush():
+            # 已完成的影片分批寫入，不等全部下載完
+            nonlocal saved
+            async with db_lock:
+                batch = pending[:]
+                if not batch:
+                    return
+                try:
+                    saved += len(await save_videos_to_db(batch, self.user_id))
+                    # 寫入期間其他 worker 可能又加入新的影片
+                    del pending[: len(batch)]
+                except Exception as e:
+                    # 留在 pending，下一批 (或結束時) 再寫一次；已存在的 ID 會略過
+                    print(f"⚠️ 寫入資料庫失敗：{e}")
+
+        async def worker():
+            while True:
+                try:
+                    entry = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    info = await self._process(entry)
+                    infos.append(info)
+                    pending.append(info)
+                    print(f"✅ {entry['id']} 完成 ({len(infos)}/{len(entries)})")
+                except Exception as e:
+                    failed[entry["id"]] = str(e)
+                    print(f"❌ {entry['id']} 失敗：{e}")
+                if len(pending) >= self.db_batch_size:
+                    await flush()
+
+        await asyncio.gather(
+            *(worker() for _ in range(max(1, min(self.workers, len(entries)))))
+        )
+
+        await flush()
+        if infos:
+            print(f"💾 已寫入 {saved} 部影片到資料庫 (已存在的略過)")
+
+        elapsed = time.perf_counter() - t0
+        print(
+            f"🎉 匯入完成：成功 {len(infos)}，失敗 {len(failed)}，耗時 {elapsed:.1f} 秒"
+        )
+        return {
+            "done": [info.get("id") for info in infos],
+            "failed": failed,
+            "elapsed": elapsed,
+        }
+
+    async def ingest(self, playlist_url: str) -> dict:
+        """展開清單、略過已存在的影片、並行匯入其餘影片"""
+        new, old = await self.plan(playlist_url)
+        result = await self.run(new)
+        result["skipped"] = [e["id"] for e in old]
+        return result
+
+
+if __name__ == "__main__":
+    # 用法: python lib_yt/YTHandler/CPlaylistIngester.py <播放清單網址> [輸出目錄]
+    if len(sys.argv) < 2:
+        print("用法: python CPlaylistIngester.py <播放清單網址> [輸出目錄]")
+        sys.exit(1)
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else "C:/temp/playlist"
+
+    async def main():
+        try:
+            await CPlaylistIngester(out_dir).ingest(sys.argv[1])
+        finally:
+            await close_client()
+
+    asyncio.run(main())
@@ -0,0 +1,151 @@
+import asyncio
+import glob
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+from yt_dlp import YoutubeDL
+
+# Add the project root to Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_util.CFFmpeg import CFFmpeg
+
+# 轉錄用音訊下載
+# Whisper 只需要 16 kHz 單聲道，下載 bestaudio 再轉成 192 kbps MP3 只是浪費頻寬與 CPU。
+# 這裡下載最小但足夠辨識的音訊串流 (約 48~70 kbps 的 opus / m4a)，原檔直接交給轉錄，
+# 收聽用的 MP3 等到使用者需要時才由本機檔案轉出 (不必再從 YouTube 下載)；
+# 來源只有 50~70 kbps，MP3 用 128 kbps 已足夠
+
+# 優先挑 40 kbps 以上最小的 opus，其次任何 40 kbps 以上最小的音訊，最後才退回 bestaudio
+TRANSCRIBE_FORMAT = (
+    "worstaudio[acodec=opus][abr>=40]/worstaudio[abr>=40]/bestaudio/best"
+)
+# 轉錄用音訊檔名：<video_id>.asr.<ext>
+ASR_TAG = "asr"
+
+_mp3_jobs: Dict[str, threading.Lock] = {}
+_jobs_lock = threading.Lock()
+
+
+def find_asr_audio(output_dir: str, video_id: str) -> str:
+    """找出已下載的轉錄用音訊，沒有時回傳空字串"""
+    for path in glob.glob(os.path.join(output_dir, f"{video_id}.{ASR_TAG}.*")):
+        # 略過下載中的暫存檔與 CAudioStore 產生的 PCM
+        if not path.endswith((".part", ".ytdl", ".tmp", ".pcm")):
+            return path
+    return ""
+
+
+def audio_complete(
+    path: str, expected_duration: Optional[float] = None, tolerance: float = 2.0
+) -> bool:
+    """
+    以 ffprobe 確認音訊檔可讀且長度與影片相符 (中斷的轉檔通常長度不足)
+
+    Args:
+        expected_duration: 影片長度 (秒)，None 時只確認可讀且有長度
+        tolerance: 允許的誤差秒數
+    """
+    try:
+        duration = CFFmpeg.probe(path)["duration"]
+    except Exception:
+        return False
+    if duration <= 0:
+        return False
+    return expected_duration is None or duration >= expected_duration - tolerance
+
+
+def download_asr_audio(url: str, output_dir: str, video_id: str) -> str:
+    """
+    下載轉錄用的音訊串流 (不轉檔)
+
+    Returns:
+        下載後的檔案路徑，例如 <output_dir>/<video_id>.asr.webm
+    """
+    existing = find_asr_audio(output_dir, video_id)
+    if existing:
+        print(f"✅ 已有轉錄用音訊：{existing}")
+        return existing
+
+    ydl_opts = {
+        "format": TRANSCRIBE_FORMAT,
+        "outtmpl": os.path.join(output_dir, f"{video_id}.{ASR_TAG}.%(ext)s"),
+        # 下載中寫入 .part，中斷後由已下載的位置續傳，完成才改名
+        "continuedl": True,
+        "quiet": True,
+    }
+    try:
+        with YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+    except Exception as e:
+        print(f"❌ 下載轉錄用音訊錯誤: {e}")
+        raise
+
+    path = find_asr_audio(output_dir, video_id)
+    if not path:
+        print("❌ 找不到下載的音訊檔案")
+        return ""
+    abr = info.get("abr") if isinstance(info, dict) else None
+    size = os.path.getsize(path) / 1024 / 1024
+    print(f"✅ 轉錄用音訊已下載：{path} ({abr or '?'} kbps, {size:.1f} MB)")
+    return path
+
+
+async def download_asr_audio_from_info(info: dict, output_dir: str) -> str:
+    """根據已取得的 info 字典下載轉錄用音訊，下載放到執行緒不阻塞事件迴圈"""
+    return await asyncio.to_thread(
+        download_asr_audio, info["webpage_url"], output_dir, info.get("id", "audio")
+    )
+
+
+def encode_mp3(source: str, mp3_path: str, bitrate: str = "128k") -> bool:
+    """由本機音訊轉出收聽用 MP3 (先寫暫存檔，完成後才改名)"""
+    temp = f"{mp3_path}.tmp.mp3"
+    ok = CFFmpeg.run(
+        ["-i", source, "-vn", "-codec:a", "libmp3lame", "-b:a", bitrate, temp]
+    )
+    if not ok:
+        if os.path.exists(temp):
+            os.remove(temp)
+        return False
+    os.replace(temp, mp3_path)
+    return True
+
+
+def ensure_mp3(output_dir: str, video_id: str, bitrate: str = "128k") -> str:
+    """
+    取得收聽用 MP3，尚未產生時由轉錄用音訊轉出
+
+    同一部影片同時只轉一次，其他呼叫會等待並直接取得結果
+
+    Returns:
+        MP3 路徑，沒有來源音訊或轉檔失敗時回傳空字串
+    """
+    mp3_path = os.path.join(output_dir, f"{video_id}.mp3")
+    with _jobs_lock:
+        job = _mp3_jobs.setdefault(mp3_path, threading.Lock())
+    with job:
+        if os.path.exists(mp3_path):
+            return mp3_path
+        source = find_asr_audio(output_dir, video_id)
+        if not source:
+            print(f"❌ 找不到 {video_id} 的來源音訊")
+            return ""
+        print(f"🎵 產生收聽用 MP3：{mp3_path}")
+        if not encode_mp3(source, mp3_path, bitrate):
+            return ""
+        print(f"✅ MP3 已產生：{mp3_path}")
+        return mp3_path
+
+
+async def ensure_mp3_async(
+    output_dir: str, video_id: str, bitrate: str = "128k"
+) -> str:
+    return await asyncio.to_thread(ensure_mp3, output_dir, video_id, bitrate)
+
@@ -1,21 +1,15 @@
 from datetime import datetime
 from sqlalchemy import select
-from yt_dlp import YoutubeDL
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from lib_db.models.Video import Video
 from lib_db.db.database import AsyncSessionLocal
+from lib_yt.YTHandler.CInfoCache import default_info_cache
 
 
-# 取得影片資訊
-async def fetch_info(url: str):
-    ydl_opts = {
-        "quiet": True,
-        "skip_download": True,
-    }
-    with YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=False)
-
-    return info
+# 取得影片資訊 (先查快取，未命中時在執行緒池呼叫 yt-dlp，不阻塞事件迴圈)
+async def fetch_info(url: str, refresh: bool = False):
+    return await default_info_cache().fetch_async(url, refresh)
 
 
 # 資料欄位定義不一致需要資料
@@ -57,3 +51,43 @@ async def query_video_byid(video_id: str) -> Video:
         stmt = select(Video).where(Video.id == video_id)
         result = await db.execute(stmt)
         return result.scalar_one_or_none()
+
+
+async def query_existing_ids(video_ids: list) -> set:
+    """一次查詢多個影片 ID，回傳已存在於 videos 的 ID"""
+    if not video_ids:
+        return set()
+    async with AsyncSessionLocal() as db:
+        stmt = select(Video.id).where(Video.id.in_(list(video_ids)))
+        result = await db.execute(stmt)
+        return set(result.scalars().all())
+
+
+async def save_videos_to_db(
+    infos: list, user_id: int = None, batch_size: int = 50
+) -> list:
+    """
+    多部影片分批新增，每批 commit 一次；已存在的 ID 直接略過 (ON CONFLICT DO NOTHING)，
+    重複的影片不會讓整批失敗
+
+    Returns:
+        實際新增的影片 ID
+    """
+    columns = [c.name for c in Video.__table__.columns]
+    inserted = []
+    async with AsyncSessionLocal() as db:
+        for i in range(0, len(infos), batch_size):
+            rows = []
+            for info in infos[i : i + batch_size]:
+                entry = map_info_to_video(info, user_id)
+                rows.append({name: getattr(entry, name) for name in columns})
+            stmt = (
+                pg_insert(Video)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[Video.id])
+                .returning(Video.id)
+            )
+            result = await db.execute(stmt)
+            await db.commit()
+            inserted.extend(result.scalars().all())
+    return inserted
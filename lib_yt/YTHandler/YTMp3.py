@@ -1,10 +1,13 @@
-from datetime import timedelta
 import os
-import re
 from googletrans import Translator
-import requests
+import httpx
 from yt_dlp import YoutubeDL
 
+from lib_srt.CCueTrack import CCueTrack, format_srt_time, parse_time_ms
+from lib_srt.CSentenceSegmenter import CSentenceSegmenter, is_sentence_end
+from lib_util.CHttpClient import download
+from lib_yt.YTHandler.YTAudio import audio_complete
+
 
 async def download_mp3_from_info(info: dict, output_dir: str) -> str:
     """根據已取得的 info 字典下載 MP3 音訊"""
@@ -22,23 +25,35 @@ async def download_mp3_from_info(info: dict, output_dir: str) -> str:
             }
         ],
         "outtmpl": os.path.join(output_dir, f"temp_{video_id}.%(ext)s"),
+        # 來源串流寫入 .part，中斷後續傳
+        "continuedl": True,
         "quiet": True,
     }
+    temp_path = os.path.join(output_dir, f"temp_{video_id}.mp3")
+    duration = info.get("duration")
+    if os.path.exists(output_path) and audio_complete(output_path, duration):
+        print(f"✅ 已有完整的 MP3：{output_path}")
+        return output_path
+    # 上次中斷留下的轉檔結果不可信，重新轉檔 (來源串流的 .part 保留續傳)
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
 
     try:
         with YoutubeDL(ydl_opts) as ydl:
             # 用原始 URL 再下載音訊
             ydl.download([info["webpage_url"]])
 
-        # 找出實際的下載檔案
-        temp_path = os.path.join(output_dir, f"temp_{video_id}.mp3")
-        if os.path.exists(temp_path):
-            os.rename(temp_path, output_path)
-            print(f"✅ 音訊已下載並儲存為：{output_path}")
-            return output_path
-
-        print("❌ 找不到 mp3 檔案")
-        return ""
+        # 找出實際的下載檔案，確認完整後才改名
+        if not os.path.exists(temp_path):
+            print("❌ 找不到 mp3 檔案")
+            return ""
+        if not audio_complete(temp_path, duration):
+            os.remove(temp_path)
+            print("❌ MP3 不完整 (長度與影片不符)")
+            return ""
+        os.replace(temp_path, output_path)
+        print(f"✅ 音訊已下載並儲存為：{output_path}")
+        return output_path
     except Exception as e:
         print(f"❌ 下載 MP3 錯誤: {e}")
         raise
@@ -70,17 +85,13 @@ async def download_thumbnail_from_info(
 
     try:
         print(f"🖼 下載縮圖中：{thumbnail_url}")
-        response = requests.get(thumbnail_url, stream=True, timeout=30)
-        response.raise_for_status()
-
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(8192):
-                f.write(chunk)
+        # 共用連線池串流下載，不阻塞事件迴圈
+        await download(thumbnail_url, output_path)
 
         print(f"✅ 縮圖已儲存至：{output_path}")
         return output_path
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ 網路錯誤: {e}")
         return ""
     except Exception as e:
@@ -90,68 +101,50 @@ async def download_thumbnail_from_info(
 
 def parse_timestamp(timestamp: str) -> float:
     """將 SRT 時間格式轉為秒數"""
-    h, m, s_ms = timestamp.split(":")
-    s, ms = s_ms.split(",")
-    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000
+    return parse_time_ms(timestamp) / 1000
 
 
 def format_timestamp(seconds: float) -> str:
     """將秒數轉回 SRT 時間格式"""
-    td = timedelta(seconds=seconds)
-    total_seconds = int(td.total_seconds())
-    ms = int((td.total_seconds() - total_seconds) * 1000)
-    h = total_seconds // 3600
-    m = (total_seconds % 3600) // 60
-    s = total_seconds % 60
-    return f"{h:02}:{m:02}:{s:02},{ms:03}"
+    return format_srt_time(round(seconds * 1000))
 
 
-# 英文使用 ? 可以先不用
+# 給沒有逐字時間的舊字幕使用，新轉錄的字幕已由 CSentenceSegmenter 切句
 def merge_srt_to_sentence_srt(input_srt_path: str, output_srt_path: str):
-    with open(input_srt_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    blocks = re.split(r"\n\s*\n", content.strip())
+    track = CCueTrack.from_file(input_srt_path)
 
-    merged_segments = []
+    starts, ends, texts = [], [], []
     buffer_text = ""
     buffer_start = None
     buffer_end = None
 
-    for block in blocks:
-        lines = block.strip().splitlines()
-        if len(lines) < 3:
+    for start_ms, end_ms, text in track:
+        text = " ".join(text.splitlines()).strip()
+        if not text:
             continue
 
-        time_range = lines[1]
-        text = " ".join(lines[2:]).strip()
-
-        start_str, end_str = time_range.split(" --> ")
-        start_sec = parse_timestamp(start_str)
-        end_sec = parse_timestamp(end_str)
-
         if buffer_text == "":
-            buffer_start = start_sec
+            buffer_start = start_ms
 
         buffer_text += (" " if buffer_text else "") + text
-        buffer_end = end_sec
+        buffer_end = end_ms
 
-        if re.search(r'[.!?]["”]?$|\w\.\s*$', text):
-            merged_segments.append((buffer_start, buffer_end, buffer_text.strip()))
+        if is_sentence_end(text):
+            starts.append(buffer_start)
+            ends.append(buffer_end)
+            texts.append(buffer_text.strip())
             buffer_text = ""
             buffer_start = None
             buffer_end = None
 
     # 殘留最後一句
     if buffer_text:
-        merged_segments.append((buffer_start, buffer_end, buffer_text.strip()))
+        starts.append(buffer_start)
+        ends.append(buffer_end)
+        texts.append(buffer_text.strip())
 
     # 寫入新的 SRT 檔案
-    with open(output_srt_path, "w", encoding="utf-8") as f:
-        for idx, (start, end, text) in enumerate(merged_segments, start=1):
-            f.write(f"{idx}\n")
-            f.write(f"{format_timestamp(start)} --> {format_timestamp(end)}\n")
-            f.write(f"{text}\n\n")
+    CCueTrack(starts, ends, texts).save(output_srt_path, fmt="srt")
 
     print(f"[輸出完成] 新的合併字幕已寫入：{output_srt_path}")
 
@@ -170,89 +163,80 @@ def translate_text(text, target_lang):
 
 # 翻譯字幕
 async def process_srt(input_path, output_path, target_lang):
-    with open(input_path, "r", encoding="utf-8") as infile:
-        lines = infile.readlines()
-
-    output_lines = []
-    buffer = []
-    blocks = []
-    for line in lines:
-        if re.match(r"^\d+$", line.strip()):
-            if buffer:
-                blocks.append(list(buffer))
-                buffer.clear()
-        buffer.append(line)
-    if buffer:
-        blocks.append(list(buffer))
-
-    total = len(blocks)
-    for i, block in enumerate(blocks, start=1):
-        output_lines.extend(process_block(block, target_lang))
+    track = CCueTrack.from_file(input_path)
+
+    texts = []
+    total = len(track)
+    for i, text in enumerate(track.texts, start=1):
+        full_text = " ".join(text.splitlines()).strip()
+        if full_text:
+            # 合併為「原文\n譯文」雙行字幕
+            full_text = f"{full_text}\n{translate_text(full_text, target_lang)}"
+        texts.append(full_text)
         print(f"⏳ 處理進度: {i}/{total} ({(i/total)*100:.1f}%)", end="\r")
 
-    with open(output_path, "w", encoding="utf-8") as outfile:
-        outfile.writelines(output_lines)
-
-
-def process_block(block_lines, target_lang):
-    result = []
-    text_lines = []
-    block_number = ""
-    timecode_line = ""
-
-    for line in block_lines:
-        if line.strip().isdigit():
-            block_number = line
-        elif "-->" in line:
-            timecode_line = line
-        else:
-            text_lines.append(line.strip())
-
-    if text_lines:
-        full_text = " ".join(text_lines)
-        translated = translate_text(full_text, target_lang)
-        # 合併為單行字幕
-        merged_line = f"{full_text}\n{translated}\n"
-        result.extend([block_number, timecode_line, merged_line, "\n"])
-    else:
-        result.extend(block_lines)
-        result.append("\n")
-
-    return result
+    track.texts = texts
+    track.save(output_path, fmt="srt")
 
 
+import asyncio
 import torch
-from faster_whisper import WhisperModel
 
-
-def format_timestamp(seconds: float) -> str:
-    h = int(seconds // 3600)
-    m = int((seconds % 3600) // 60)
-    s = int(seconds % 60)
-    ms = int((seconds - int(seconds)) * 1000)
-    return f"{h:02}:{m:02}:{s:02},{ms:03}"
+from lib_yt.Whisper.CChunkedTranscriber import transcribe_shared
+from lib_yt.Whisper.CTranscriptCache import transcribe_cached
+from lib_yt.Whisper.model_pool import get_model
+from lib_yt.Whisper.whisper_profile import load_profile
 
 
 # medium
 async def transcribe_mp3_to_srt(
-    mp3_path: str, output_srt_path: str, model_size="small"
+    mp3_path: str, output_srt_path: str, model_size=None
 ) -> dict:
-    """使用 FasterWhisper 將 MP3 轉為 SRT 字幕"""
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    print(f"[FasterWhisper] 初始化模型 {model_size} on {device}")
+    """
+    使用 FasterWhisper 將 MP3 轉為 SRT 字幕
 
-    model = WhisperModel(model_size, device=device, compute_type="int8")
-    print(f"[FasterWhisper] 開始轉錄：{mp3_path}")
-    segments, info = model.transcribe(mp3_path, beam_size=5)
-    print(f"[FasterWhisper] 偵測語言：{info.language}")
-
-    with open(output_srt_path, "w", encoding="utf-8") as f:
-        for i, segment in enumerate(segments, start=1):
-            f.write(f"{i}\n")
-            f.write(
-                f"{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}\n"
-            )
-            f.write(f"{segment.text.strip()}\n\n")
+    model_size 為 None 時使用本機的建議設定 (模型、計算型別、beam 寬度)
+    """
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    profile = load_profile(device, compute_type="int8")
+    model_size = model_size or profile["model_size"]
+    compute_type = profile["compute_type"]
+    beam_size = profile["beam_size"]
+    # 0 表示自動 (CChunkedTranscriber 依核心數分配)
+    cpu_threads = profile["cpu_threads"] or None
+    if device == "cpu":
+        # CPU：依靜音切塊後多行程平行轉錄，放到執行緒避免阻塞事件迴圈；
+        # 行程池整個服務共用一個，第一次轉錄時才啟動
+        result = await asyncio.to_thread(
+            transcribe_shared,
+            mp3_path,
+            output_srt_path,
+            model_size=model_size,
+            compute_type=compute_type,
+            beam_size=beam_size,
+            cpu_threads=cpu_threads,
+        )
+        if result["lan"] is not None:
+            print(f"✅ SRT 已儲存：{output_srt_path}")
+            return {"srt_path": output_srt_path, "lan": result["lan"]}
+        # VAD 沒有找到說話區段 (沒有區塊可轉錄，也偵測不到語言)，改以整檔轉錄
+        print("⚠️ 沒有偵測到說話區段，改以單一模型轉錄整個音檔")
+
+    print(f"[FasterWhisper] 開始轉錄：{mp3_path} ({model_size} on {device})")
+    # 保留逐字時間，直接依字詞邊界切成句子字幕，不需要再另外 refine
+    # 同一音檔以相同設定轉錄過時直接取回快取，不載入模型
+    transcript = await asyncio.to_thread(
+        transcribe_cached,
+        lambda: get_model(model_size, device, compute_type),
+        mp3_path,
+        model_size,
+        compute_type,
+        beam_size=beam_size,
+        word_timestamps=True,
+    )
+
+    track = CSentenceSegmenter().segment(transcript["words"])
+    track.save(output_srt_path, fmt="srt")
 
     print(f"✅ SRT 已儲存：{output_srt_path}")
-    return {"srt_path": output_srt_path, "lan": info.language}
+    return {"srt_path": output_srt_path, "lan": transcript["language"]}
@@ -6,6 +6,16 @@ from yt_dlp import YoutubeDL
 from urllib.parse import urlparse, parse_qs
 from dataclasses import dataclass
 
+# Add the project root to Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_yt.YTHandler.CInfoCache import default_info_cache
+from lib_yt.YTHandler.YTAudio import download_asr_audio
+
 
 @dataclass
 class YTInfo:
@@ -54,17 +64,11 @@ class YouTubeHandler:
             return ""
 
     def fetch_video_info(self) -> YTInfo:
-        """擷取影片資訊"""
-        ydl_opts = {
-            "quiet": True,
-            "skip_download": True,
-        }
-
+        """擷取影片資訊 (經由影片資訊快取)"""
         video_id = self.extract_video_id()
 
         try:
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.url, download=False)
+            info = default_info_cache().fetch(self.url)
 
             # 安全地取得分類資訊
             categories = info.get("categories", [])
@@ -112,9 +116,18 @@ class YouTubeHandler:
         print("⏱ 時長（秒）:", ytinfo.duration)
         print("⏱ 時長（分:秒）:", f"{ytinfo.duration // 60}:{ytinfo.duration % 60:02d}")
 
-    def download_audio(self, use_video_id: bool = True) -> str:
-        """下載音訊為 MP3 格式"""
+    def download_audio(
+        self, use_video_id: bool = True, for_transcription: bool = False
+    ) -> str:
+        """
+        下載音訊為 MP3 格式
+
+        for_transcription=True 時只下載轉錄用的小音訊串流，不轉成 MP3
+        (收聽用 MP3 可之後以 YTAudio.ensure_mp3 產生)
+        """
         video_id = self.extract_video_id()
+        if for_transcription:
+            return download_asr_audio(self.url, self.output_dir, video_id or "audio")
 
         if use_video_id and video_id:
             output_filename = f"{video_id}.mp3"
@@ -169,14 +182,8 @@ class YouTubeHandler:
         video_id = self.extract_video_id()
 
         try:
-            # 先取得影片資訊以獲得縮圖 URL
-            ydl_opts = {
-                "quiet": True,
-                "skip_download": True,
-            }
-
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.url, download=False)
+            # 縮圖 URL 取自影片資訊快取，不再另外呼叫 yt-dlp
+            info = default_info_cache().fetch(self.url)
 
             thumbnail_url = info.get("thumbnail", "")
             if not thumbnail_url:
@@ -223,7 +230,10 @@ class YouTubeHandler:
             return ""
 
     def process_video(
-        self, download_audio: bool = True, download_thumbnail: bool = True
+        self,
+        download_audio: bool = True,
+        download_thumbnail: bool = True,
+        for_transcription: bool = False,
     ) -> tuple[YTInfo, str, str]:
         """完整處理流程：取得資訊 + 下載音訊 + 下載封面"""
         print("🚀 開始處理 YouTube 影片...")
@@ -236,7 +246,7 @@ class YouTubeHandler:
 
         if download_audio:
             print("\n🎵 開始下載音訊...")
-            audio_path = self.download_audio()
+            audio_path = self.download_audio(for_transcription=for_transcription)
 
         if download_thumbnail:
             print("\n🖼 開始下載封面...")
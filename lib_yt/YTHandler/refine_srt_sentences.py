@@ -1,51 +1,29 @@
-import re
-import nltk
-from datetime import timedelta
+from lib_srt.CCueTrack import CCueTrack, format_srt_time, parse_time_ms
+from lib_srt.CSentenceSegmenter import split_sentences
 
-nltk.download("punkt_tab")
+# 只給沒有逐字時間的舊字幕使用；新轉錄的字幕已由 CSentenceSegmenter 依字詞邊界切句
 
 
 def srt_time_to_seconds(srt_time: str) -> float:
-    h, m, s_ms = srt_time.split(":")
-    s, ms = s_ms.split(",")
-    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000
+    return parse_time_ms(srt_time) / 1000
 
 
 def seconds_to_srt_time(seconds: float) -> str:
-    # 修正：直接处理秒数，不使用timedelta
-    total_seconds = int(seconds)
-    ms = int((seconds - total_seconds) * 1000)
-
-    hours = total_seconds // 3600
-    minutes = (total_seconds % 3600) // 60
-    secs = total_seconds % 60
-
-    return f"{hours:02}:{minutes:02}:{secs:02},{ms:03}"
+    return format_srt_time(round(seconds * 1000))
 
 
 def parse_srt(srt_text: str):
-    pattern = re.compile(
-        r"(\d+)\s+(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})\s+(.*?)(?=\n\d+\s+\d{2}:\d{2}:\d{2},\d{3}|\Z)",
-        re.DOTALL,
-    )
-    entries = []
-    for match in pattern.finditer(srt_text):
-        index, start, end, text = match.groups()
-        entries.append(
-            {
-                "start": srt_time_to_seconds(start),
-                "end": srt_time_to_seconds(end),
-                "text": text.replace("\n", " ").strip(),
-            }
-        )
-    return entries
+    return [
+        {"start": start, "end": end, "text": text.replace("\n", " ").strip()}
+        for start, end, text in CCueTrack.from_string(srt_text).seconds()
+    ]
 
 
 def split_and_rescale(segments):
     new_entries = []
     counter = 1
     for seg in segments:
-        sentences = nltk.sent_tokenize(seg["text"])
+        sentences = split_sentences(seg["text"])
         if not sentences:
             continue
 
@@ -1,8 +1,32 @@
+import asyncio
+import os
+import sys
 import time
 import random
+from urllib.parse import parse_qs, urlparse
 from tqdm import tqdm
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
 from lib_db.services.CYouTubeVideo import YouTubeVideo
 from lib_db.services.CVideoManager import VideoManager
+from lib_yt.YTHandler.CInfoCache import video_id_from_url
+from lib_yt.YTHandler.CPlaylistIngester import CPlaylistIngester, expand_playlist
+
+
+def expand_line(line: str) -> list:
+    """清單的一行可以是影片 ID、影片網址或播放清單網址，回傳影片 ID"""
+    query = parse_qs(urlparse(line).query)
+    if "list" in query and "v" not in query:
+        return [e["id"] for e in expand_playlist(line)]
+    video_id = video_id_from_url(line)
+    if video_id is None:
+        print(f"⚠️ 無法取得影片 ID，略過：{line}")
+        return []
+    return [video_id]
 
 
 def main():
@@ -15,11 +39,14 @@ def main():
 
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            video_ids = [line.strip() for line in f if line.strip()]
+            lines = [line.strip() for line in f if line.strip()]
     except FileNotFoundError:
         print(f"❌ 找不到檔案：{file_path}")
         return
 
+    # 展開播放清單並去除重複
+    video_ids = list(dict.fromkeys(vid for line in lines for vid in expand_line(line)))
+
     if not video_ids:
         print("⚠️ 清單為空，請檢查檔案內容")
         return
@@ -31,20 +58,36 @@ def main():
     # 設定路徑
     thumbnail_dir = "c:/ytdb/thumbnails"
     srt_dir = "c:/ytdb/srt"
+    ingest_dir = "c:/ytdb/ingest"
 
     # 初始化資料庫管理器
     db_manager = VideoManager()
 
+    # 一次查出已存在的影片，不再逐部抓資訊後才發現重複
+    existing = db_manager.existing_ids(video_ids)
+    video_ids = [vid for vid in video_ids if vid not in existing]
+    print(f"⏭️ 已存在 {len(existing)} 部，略過")
+    if not video_ids:
+        print("✅ 沒有需要處理的影片")
+        return
+
+    # 並行匯入只在選擇時使用 (產出與下方逐部處理不同)：
+    # 不下載 YouTube 字幕與影片，轉錄用音訊與縮圖放在 ingest_dir/<影片 ID>/，
+    # 不存 srt_dir / thumbnail_dir
+    if not download_video:
+        print(f"並行匯入：音訊與縮圖存到 {ingest_dir}/<影片 ID>/，不下載 YouTube 字幕")
+        fast_input = input("使用並行匯入？(y/N)：").strip().lower()
+        if fast_input == "y":
+            ingester = CPlaylistIngester(ingest_dir)
+            asyncio.run(ingester.run([{"id": vid} for vid in video_ids]))
+            return
+
     # 開始處理
     print(f"📥 開始處理 {len(video_ids)} 部影片...\n")
 
     for video_id in tqdm(video_ids, desc="處理進度", unit="部影片"):
         try:
-            # 支援 ID 或完整網址
-            if "http" not in video_id:
-                video_url = f"https://www.youtube.com/watch?v={video_id}"
-            else:
-                video_url = video_id
+            video_url = f"https://www.youtube.com/watch?v={video_id}"
 
             youtube_video = YouTubeVideo(video_url)
             youtube_video.thumbnail_dir = thumbnail_dir
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCueTrack import CCueTrack
+
+# 長度為 0 與同時開始的字幕
+STARTS = [0, 1000, 1000, 3000]
+ENDS = [900, 1000, 2000, 4000]
+TEXTS = ["a", "b", "c", "d"]
+
+
+def test_timing_repair_keeps_every_cue():
+    track = CCueTrack(STARTS, ENDS, TEXTS).sort()
+    track.clip(0, drop_empty=False)
+    track.close_gaps(None)
+    track.fix_overlaps(drop_empty=False)
+    assert track.texts == TEXTS
+    assert track.ends.tolist() == [1000, 1000, 3000, 4000]
+    assert (track.ends >= track.starts).all()
+
+
+def test_drop_empty_default_still_filters():
+    track = CCueTrack(STARTS, ENDS, TEXTS)
+    assert track.clip(0).texts == ["a", "c", "d"]
+
+
+def test_adj_srt_keeps_cue_count(tmp_path):
+    pytest.importorskip("aiofiles")
+    from lib_srt.CAdjSrt import CAdjSrt
+
+    adj = CAdjSrt(str(tmp_path / "in.srt"), str(tmp_path / "out.srt"))
+    adj.track = CCueTrack(STARTS, ENDS, TEXTS)
+    adj.adjust_end_times()
+    assert len(adj.track) == len(TEXTS)
+    assert adj.track.texts == TEXTS
+
+
+def test_normalize_repair_timing_keeps_covered_cue():
+    from Auto.normalize_srt_C import SubtitleEntry, ms_to_time, repair_timing
+
+    cues = [(1000, 2000, "a"), (1000, 3000, "b"), (2500, 4000, "c")]
+    subs = [
+        SubtitleEntry(i, ms_to_time(s), ms_to_time(e), text)
+        for i, (s, e, text) in enumerate(cues, start=1)
+    ]
+    repaired = repair_timing(subs, min_duration=None, max_gap=None)
+    assert [sub.text for sub in repaired] == ["a", "b", "c"]
+
+
+def test_normalize_parse_srt_keeps_cue_numbers(tmp_path):
+    from Auto.normalize_srt_C import parse_srt, repair_timing
+
+    path = tmp_path / "in.srt"
+    path.write_text(
+        "5\n00:00:03,000 --> 00:00:04,000\nb\n\n"
+        "9\n00:00:01,000 --> 00:00:02,000\na\n",
+        encoding="utf-8",
+    )
+    subs = parse_srt(str(path))
+    assert [sub.index for sub in subs] == [5, 9]
+    assert [sub.index for sub in repair_timing(subs)] == [9, 5]
@@ -0,0 +1,55 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CCaptionDedup import CCaptionDedup
+from lib_srt.CCueTrack import CCueTrack
+
+
+def dedupe(texts, rolling=True, step=2000):
+    # 前後相接、時間不重疊的字幕
+    starts = [i * step for i in range(len(texts))]
+    ends = [s + step for s in starts]
+    return CCaptionDedup(rolling=rolling).dedupe(CCueTrack(starts, ends, texts)).texts
+
+
+def test_short_boundary_match_is_not_a_repeat():
+    assert dedupe(["我們今天要講的是眾生", "眾生平等的道理"]) == [
+        "我們今天要講的是眾生",
+        "眾生平等的道理",
+    ]
+    assert dedupe(["we stop at the end of the", "end of the day we rest"]) == [
+        "we stop at the end of the",
+        "end of the day we rest",
+    ]
+
+
+def test_rolling_caption_line_is_removed():
+    texts = [
+        "so today we are going to talk about",
+        "so today we are going to talk about\nhow the model learns from data",
+    ]
+    assert dedupe(texts) == [texts[0], "how the model learns from data"]
+
+
+def test_time_overlap_counts_as_rolling():
+    track = CCueTrack([0, 1500], [2000, 4000], ["我們今天要講的是眾生", "眾生平等的道理"])
+    assert CCaptionDedup().dedupe(track).texts == ["我們今天要講的是眾生", "平等的道理"]
+
+
+def test_non_rolling_only_drops_identical_cues():
+    texts = [
+        "so today we are going to talk about",
+        "so today we are going to talk about\nhow the model learns from data",
+        "how the model learns from data",
+        "how the model learns from data",
+    ]
+    assert dedupe(texts, rolling=False) == [
+        texts[0],
+        "so today we are going to talk about how the model learns from data",
+        "how the model learns from data",
+    ]
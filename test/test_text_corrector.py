@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from lib_srt.CTextCorrector import AhoCorasick, CTextCorrector
+
+
+def test_find_all_follows_output_links():
+    # 'ab' 結束後 'bcd' 與其後綴 'cd' 都要找得到
+    automaton = AhoCorasick(["ab", "bcd", "cd"])
+    assert automaton.find_all("abcd") == [(0, 2), (2, 2)]
+
+
+def test_find_all_overlapping_and_nested():
+    automaton = AhoCorasick(["he", "she", "hers", "his", "e"])
+    assert sorted(automaton.matches("ushers")) == [
+        (1, 3),
+        (2, 2),
+        (2, 4),
+        (3, 1),
+    ]
+    # 最左最長、不重疊
+    assert automaton.find_all("ushers") == [(1, 3)]
+    assert automaton.find_all("hishers") == [(0, 3), (3, 4)]
+
+
+def test_find_all_prefers_longest_at_same_start():
+    automaton = AhoCorasick(["a", "ab", "abc", "c"])
+    assert automaton.find_all("abcc") == [(0, 3), (3, 1)]
+
+
+def test_replace_errors_fixes_every_non_overlapping_match():
+    corrector = CTextCorrector({"ab": "AB", "bcd": "BCD", "cd": "CD"})
+    text, applied = corrector.replace_errors("abcd")
+    assert text == "ABCD"
+    assert applied == [("ab", "AB"), ("cd", "CD")]
+
+
+def test_srt_corrector_applies_error_map_once():
+    from Back.srtCheck import SRTCorrector
+
+    corrector = SRTCorrector()
+    # 校正結果包含自己的錯誤字串
+    corrector.common_errors = {"ab": "abc"}
+    srt = "1\n00:00:01,000 --> 00:00:02,000\nab\n"
+    corrected, corrections = corrector.correct_srt(srt)
+    assert corrector.parse_srt(corrected)[0]["text"] == "abc"
+    assert corrections == ["第1段: 'ab' → 'abc'"]